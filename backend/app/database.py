@@ -1,36 +1,146 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from fastapi import Request, Response
 from dotenv import load_dotenv
+from app.utils.query_metrics import instrument_engine
+from app.utils.pool_metrics import InstrumentedAsyncPool
 import os
+import time
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,  # Log SQL queries (disable in production)
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
 
-async_session_maker = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False
+def compute_pool_sizes(pools: int, max_connections: int, reserved: int = 10) -> tuple[int, int]:
+    """
+    Repartir max_connections de MySQL entre los pools de todos los workers.
+    Se reservan conexiones para admin/migraciones; cada pool recibe
+    ~2/3 de su cuota como pool fijo (máx. 10) y el resto como overflow (máx. 20).
+    """
+    per_pool = max(2, (max_connections - reserved) // max(pools, 1))
+    pool_size = max(1, min(10, per_pool * 2 // 3))
+    max_overflow = max(0, min(20, per_pool - pool_size))
+    return pool_size, max_overflow
+
+
+# Pool: valores explícitos por env, o derivados de WEB_CONCURRENCY y DB_MAX_CONNECTIONS.
+# Cada worker abre dos pools contra el primario (lectura-escritura y solo lectura).
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+_default_pool_size, _default_max_overflow = compute_pool_sizes(
+    WEB_CONCURRENCY * 2,
+    int(os.getenv("DB_MAX_CONNECTIONS", 151)),  # max_connections de MySQL (default 151)
 )
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", _default_pool_size))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", _default_max_overflow))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # < wait_timeout de MySQL
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+
+
+def _create_engine(url: str, read_only: bool = False):
+    options = {}
+    if read_only:
+        # Sin transacción explícita: cada SELECT se ejecuta solo y no hay COMMIT.
+        # El pool no hace rollback-on-return, pero al cerrar la sesión
+        # SQLAlchemy igual llama a rollback() del driver (aiomysql envía un
+        # ROLLBACK): un round trip por request, que X-Round-Trips cuenta
+        options = {"isolation_level": "AUTOCOMMIT", "pool_reset_on_return": None}
+
+    engine = create_async_engine(
+        url,
+        echo=os.getenv("SQL_ECHO", "false").lower() == "true",  # Solo para depuración local
+        poolclass=InstrumentedAsyncPool,
+        pool_pre_ping=True,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_timeout=DB_POOL_TIMEOUT,
+        **options
+    )
+
+    # Métricas de consultas (tiempos, slow log, fingerprints)
+    instrument_engine(engine.sync_engine, pool_resets=not read_only)
+    return engine
+
+
+def _session_maker(engine):
+    return async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+
+
+engine = _create_engine(DATABASE_URL)
+async_session_maker = _session_maker(engine)
+
+# Solo lectura contra el primario (autocommit)
+read_engine = _create_engine(DATABASE_URL, read_only=True)
+read_session_maker = _session_maker(read_engine)
+
+# Réplica de lectura (opcional). Sin DATABASE_REPLICA_URL se lee del primario.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+REPLICA_STALENESS_SECONDS = float(os.getenv("REPLICA_STALENESS_SECONDS", 5))
+READ_AFTER_WRITE_COOKIE = "rw_until"
+
+replica_engine = _create_engine(DATABASE_REPLICA_URL, read_only=True) if DATABASE_REPLICA_URL else None
+replica_session_maker = _session_maker(replica_engine) if replica_engine else read_session_maker
 
 Base = declarative_base()
 
 async def get_db():
-    """Dependency for getting async database session"""
+    """
+    Dependency read-write (primario).
+    Hace commit al final solo si el handler dejó una transacción abierta.
+    """
     async with async_session_maker() as session:
         try:
             yield session
-            await session.commit()
+            if session.in_transaction():
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
+
+
+def mark_recent_write(response: Response) -> None:
+    """
+    Marcar al cliente como recién escrito: durante REPLICA_STALENESS_SECONDS
+    sus lecturas van al primario (read-your-writes).
+    """
+    response.set_cookie(
+        READ_AFTER_WRITE_COOKIE,
+        str(time.time() + REPLICA_STALENESS_SECONDS),
+        max_age=int(REPLICA_STALENESS_SECONDS) + 1,
+        httponly=True,
+        samesite="lax"
+    )
+
+
+def read_after_write_pending(request: Request) -> bool:
+    """True si el cliente escribió hace menos de REPLICA_STALENESS_SECONDS"""
+    rw_until = request.cookies.get(READ_AFTER_WRITE_COOKIE)
+    if not rw_until:
+        return False
+    try:
+        return float(rw_until) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request):
+    """
+    Dependency de solo lectura (autocommit, sin commit final).
+    Usa la réplica salvo que el cliente tenga una escritura reciente.
+    """
+    session_maker = replica_session_maker
+    if replica_engine is not None and read_after_write_pending(request):
+        session_maker = read_session_maker
+
+    async with session_maker() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -1,20 +1,31 @@
-from sqlalchemy import Column, BigInteger, String, JSON, TIMESTAMP, ForeignKey, text
+from sqlalchemy import Column, BigInteger, String, JSON, TIMESTAMP, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class AuditLog(Base):
+    """
+    Registro de auditoría (escrito por AuditService). En MySQL la tabla está
+    particionada por mes sobre created_at: la clave primaria real es
+    (id, created_at) y user_id no tiene FOREIGN KEY (no se permiten en tablas
+    particionadas). id sigue siendo único por AUTO_INCREMENT.
+    """
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Historial por entidad y feed por tipo de acción, ordenados por (created_at, id)
+        Index('idx_audit_action_entity_created', 'action_type', 'entity_id', 'created_at'),
+        Index('idx_audit_action_created', 'action_type', 'created_at'),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    user_id = Column(BigInteger, ForeignKey('users.id', ondelete='SET NULL'), nullable=True, index=True)
-    action_type = Column(String(100), nullable=False, index=True)
+    user_id = Column(BigInteger, nullable=True, index=True)
+    action_type = Column(String(100), nullable=False)
     entity_type = Column(String(100), nullable=False)
     entity_id = Column(BigInteger, nullable=True, index=True)
-    old_value = Column(JSON, nullable=True)
+    old_value = Column(JSON, nullable=True)  # dict, sin json.dumps
     new_value = Column(JSON, nullable=True)
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(String(500), nullable=True)
-    created_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+    created_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'), index=True)
 
     # Relationships
-    user = relationship("User", backref="audit_logs")
+    user = relationship("User", primaryjoin="foreign(AuditLog.user_id) == User.id", backref="audit_logs")
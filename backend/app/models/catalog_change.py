@@ -0,0 +1,90 @@
+from sqlalchemy import Column, BigInteger, SmallInteger, String, event
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+import random
+
+from app.database import Base
+
+# Tablas del catálogo cuyos cambios invalidan ETags, caché de respuestas y snapshot
+TRACKED_TABLES = frozenset({"products", "categories", "product_images"})
+
+# Filas por tabla: cada commit incrementa una al azar y la versión es la suma,
+# así los commits concurrentes no se bloquean en la misma fila
+CATALOG_CHANGE_SLOTS = 16
+
+_PENDING = "catalog_changes"
+
+
+class CatalogChange(Base):
+    """
+    Contador de cambios del catálogo por tabla. Lo incrementa, al hacer commit,
+    cualquier sesión que haya insertado, modificado o borrado filas del catálogo.
+    table_name es la tabla ('products') o la tabla con sufijo '.deleted' para
+    las bajas físicas (el snapshot necesita distinguirlas).
+    """
+    __tablename__ = "catalog_changes"
+
+    table_name = Column(String(40), primary_key=True)
+    slot = Column(SmallInteger, primary_key=True, autoincrement=False)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CatalogChange(table_name='{self.table_name}', slot={self.slot}, version={self.version})>"
+
+
+def mark_catalog_changed(session: Session, *keys: str) -> None:
+    """Registrar cambios que no pasan por el ORM (p. ej. SQL en texto) para el próximo commit"""
+    session.info.setdefault(_PENDING, set()).update(keys)
+
+
+def _bump_statement(dialect: str, key: str):
+    values = {"table_name": key, "slot": random.randrange(CATALOG_CHANGE_SLOTS), "version": 1}
+    if dialect == "mysql":
+        stmt = mysql_insert(CatalogChange).values(**values)
+        return stmt.on_duplicate_key_update(version=CatalogChange.version + 1)
+    # SQLite (desarrollo local)
+    stmt = sqlite_insert(CatalogChange).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=["table_name", "slot"],
+        set_={"version": CatalogChange.version + 1}
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    for instances, deleted in ((session.new, False), (session.dirty, False), (session.deleted, True)):
+        for instance in instances:
+            table = getattr(instance, "__tablename__", None)
+            if table in TRACKED_TABLES:
+                mark_catalog_changed(session, table + ".deleted" if deleted else table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dml(orm_execute_state):
+    # insert()/update()/delete() ORM-enabled (sin pasar por el flush)
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    table = mapper.local_table.name if mapper is not None else None
+    if table in TRACKED_TABLES:
+        key = table + ".deleted" if orm_execute_state.is_delete else table
+        mark_catalog_changed(orm_execute_state.session, key)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session):
+    # Los incrementos van en la misma transacción que los cambios: se publican juntos
+    session.flush()
+    keys = session.info.pop(_PENDING, None)
+    if not keys:
+        return
+    dialect = session.get_bind().dialect.name
+    for key in sorted(keys):
+        session.execute(_bump_statement(dialect, key))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING, None)
@@ -1,5 +1,6 @@
 from sqlalchemy import Column, BigInteger, String, Boolean, TIMESTAMP, text
 from app.database import Base
+from app.models import catalog_change  # noqa: F401 (registra el contador de cambios del catálogo)
 
 class Category(Base):
     __tablename__ = "categories"
@@ -11,7 +12,7 @@ class Category(Base):
     image_url = Column(String(500), nullable=True)
     is_active = Column(Boolean, nullable=False, default=True, index=True)
     created_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'))
-    updated_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'))
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), index=True)
     
     def __repr__(self):
         return f"<Category(id={self.id}, name='{self.name}', slug='{self.slug}')>"
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, BigInteger, String, Integer, JSON, TIMESTAMP, UniqueConstraint, text
+from app.database import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint('scope', 'idempotency_key', name='uk_idempotency_scope_key'),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    idempotency_key = Column(String(255), nullable=False)
+    scope = Column(String(100), nullable=False)  # Ej: 'create_order', 'upload_receipt'
+    request_fingerprint = Column(String(64), nullable=False)  # sha256 del request
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(JSON, nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'), index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey(scope='{self.scope}', key='{self.idempotency_key}', status={self.status_code})>"
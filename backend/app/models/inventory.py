@@ -0,0 +1,50 @@
+from sqlalchemy import Column, BigInteger, String, Integer, TIMESTAMP, ForeignKey, UniqueConstraint, Index, text
+from app.database import Base
+import enum
+
+
+class MovementReason(str, enum.Enum):
+    INITIAL = "INITIAL"                # Stock al crear el producto (o al instalar el ledger)
+    ORDER = "ORDER"                    # Venta (reference_id = order_id)
+    CANCELLATION = "CANCELLATION"      # Reposición por pedido cancelado (reference_id = order_id)
+    ADJUSTMENT = "ADJUSTMENT"          # Ajuste manual en /admin/stock
+    EDIT = "EDIT"                      # Stock cambiado al editar el producto
+    RECONCILIATION = "RECONCILIATION"  # Corrección de diferencias ledger vs products.stock
+
+
+class InventoryMovement(Base):
+    """Ledger de inventario: solo inserciones, una fila por cambio de stock de un producto"""
+    __tablename__ = "inventory_movements"
+    __table_args__ = (
+        Index('idx_inventory_movements_product', 'product_id', 'id'),
+        Index('idx_inventory_movements_created', 'created_at'),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    product_id = Column(BigInteger, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    quantity = Column(Integer, nullable=False)  # Positivo = entrada, negativo = salida
+    stock_after = Column(Integer, nullable=False)  # products.stock tras el movimiento
+    reason = Column(String(20), nullable=False)
+    reference_id = Column(BigInteger, nullable=True)  # order_id para ORDER/CANCELLATION
+    user_id = Column(BigInteger, nullable=True)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+
+    def __repr__(self):
+        return f"<InventoryMovement(id={self.id}, product_id={self.product_id}, quantity={self.quantity}, reason='{self.reason}')>"
+
+
+class InventorySnapshot(Base):
+    """Stock de cada producto en un instante: snapshot anterior + movimientos hasta last_movement_id"""
+    __tablename__ = "inventory_snapshots"
+    __table_args__ = (
+        UniqueConstraint('snapshot_at', 'product_id', name='uk_inventory_snapshot'),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    product_id = Column(BigInteger, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    snapshot_at = Column(TIMESTAMP, nullable=False)
+    stock = Column(Integer, nullable=False)
+    last_movement_id = Column(BigInteger, nullable=False)  # Movimientos con id <= este ya están incluidos
+
+    def __repr__(self):
+        return f"<InventorySnapshot(product_id={self.product_id}, snapshot_at={self.snapshot_at}, stock={self.stock})>"
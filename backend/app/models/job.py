@@ -0,0 +1,33 @@
+from sqlalchemy import Column, BigInteger, String, Integer, JSON, Text, TIMESTAMP, Index, text
+from app.database import Base
+import enum
+
+
+class JobStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index('idx_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False)  # Handler registrado, ej: 'delete_image_files'
+    payload = Column(JSON, nullable=True)
+    status = Column(String(20), nullable=False, default=JobStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'))  # Próximo intento
+    locked_by = Column(String(100), nullable=True)  # Worker que lo está ejecutando
+    locked_at = Column(TIMESTAMP, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+    finished_at = Column(TIMESTAMP, nullable=True)
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, name='{self.name}', status='{self.status}', attempts={self.attempts})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, DECIMAL, Enum, Text, TIMESTAMP, ForeignKey, Integer
+from sqlalchemy import Column, BigInteger, String, DECIMAL, Enum, Text, TIMESTAMP, ForeignKey, Integer, Index
 from sqlalchemy.dialects.mysql import BIGINT
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -17,6 +17,10 @@ class OrderStatus(str, enum.Enum):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Barrido de pedidos PENDING_PAYMENT vencidos (rango por fecha dentro del estado)
+        Index('idx_orders_status_created', 'status', 'created_at'),
+    )
 
     id = Column(BIGINT(unsigned=True), primary_key=True, index=True, autoincrement=True)
     order_number = Column(String(50), unique=True, nullable=False, index=True)
@@ -40,8 +44,7 @@ class Order(Base):
     status = Column(
         Enum(OrderStatus),
         nullable=False,
-        default=OrderStatus.PENDING_PAYMENT,
-        index=True
+        default=OrderStatus.PENDING_PAYMENT
     )
     payment_method = Column(String(20), nullable=True)  # 'yape', 'card', etc.
     receipt_url = Column(String(500), nullable=True)  # URL del comprobante de pago
@@ -51,6 +54,13 @@ class Order(Base):
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
     
+    # Fecha de cada transición de estado (métricas de SLA)
+    waiting_contact_at = Column(TIMESTAMP, nullable=True)
+    paid_at = Column(TIMESTAMP, nullable=True)
+    shipped_at = Column(TIMESTAMP, nullable=True)
+    delivered_at = Column(TIMESTAMP, nullable=True)
+    cancelled_at = Column(TIMESTAMP, nullable=True)
+    
     # Relationships
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, BigInteger, String, DECIMAL, Integer, Boolean, TIMESTAMP, ForeignKey, text
+from sqlalchemy import Column, BigInteger, String, DECIMAL, Integer, Boolean, TIMESTAMP, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models import catalog_change  # noqa: F401 (registra el contador de cambios del catálogo)
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index('idx_products_active_stock', 'is_active', 'stock'),
+    )
     
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     category_id = Column(BigInteger, ForeignKey('categories.id', ondelete='RESTRICT'), nullable=False, index=True)
@@ -12,9 +16,10 @@ class Product(Base):
     description = Column(String(1000), nullable=True)
     price = Column(DECIMAL(10, 2), nullable=False, index=True)
     stock = Column(Integer, nullable=False, default=0)
+    low_stock_threshold = Column(Integer, nullable=True)  # NULL = LOW_STOCK_DEFAULT_THRESHOLD
     is_active = Column(Boolean, nullable=False, default=True, index=True)
     created_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'))
-    updated_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'))
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), index=True)
     
     # Relationships
     category = relationship("Category", backref="products")
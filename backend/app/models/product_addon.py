@@ -0,0 +1,21 @@
+from sqlalchemy import Column, BigInteger, String, Integer, Float, TIMESTAMP, ForeignKey, UniqueConstraint, Index, text
+from app.database import Base
+
+class ProductAddon(Base):
+    """Add-ons precalculados por producto (top-K), los recalcula RecommendationService"""
+    __tablename__ = "product_addons"
+    __table_args__ = (
+        UniqueConstraint('product_id', 'addon_product_id', name='uk_product_addon'),
+        Index('idx_product_addons_rank', 'product_id', 'rank'),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    product_id = Column(BigInteger, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    addon_product_id = Column(BigInteger, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    rank = Column(Integer, nullable=False)  # 0 = mejor candidato
+    score = Column(Float, nullable=False)
+    source = Column(String(20), nullable=False)  # 'co_purchase' o 'category'
+    computed_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+
+    def __repr__(self):
+        return f"<ProductAddon(product_id={self.product_id}, addon_product_id={self.addon_product_id}, rank={self.rank})>"
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, BigInteger, String, Integer, Float, TIMESTAMP, ForeignKey, UniqueConstraint, text
+from app.database import Base
+
+class ProductFeed(Base):
+    """Feeds rankeados precalculados (más vendidos, novedades, por precio), los recalcula FeedService"""
+    __tablename__ = "product_feeds"
+    __table_args__ = (
+        UniqueConstraint('feed', 'category_id', 'rank', name='uk_product_feed_rank'),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    feed = Column(String(30), nullable=False)  # Ej: 'bestsellers_7d', 'newest', 'price_asc'
+    category_id = Column(BigInteger, nullable=False, default=0)  # 0 = todo el catálogo
+    rank = Column(Integer, nullable=False)  # 0 = primero
+    product_id = Column(BigInteger, ForeignKey('products.id', ondelete='CASCADE'), nullable=False, index=True)
+    score = Column(Float, nullable=False, default=0)
+    computed_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+
+    def __repr__(self):
+        return f"<ProductFeed(feed='{self.feed}', category_id={self.category_id}, rank={self.rank}, product_id={self.product_id})>"
+
+
+class ProductFeedRefresh(Base):
+    """Firma de las fuentes con que se calculó por última vez cada grupo de feeds"""
+    __tablename__ = "product_feed_refreshes"
+
+    group_name = Column(String(30), primary_key=True)  # 'bestsellers' o 'catalog'
+    signature = Column(String(255), nullable=False, default="")
+    refreshed_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+
+    def __repr__(self):
+        return f"<ProductFeedRefresh(group_name='{self.group_name}', signature='{self.signature}')>"
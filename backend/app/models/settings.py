@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, DateTime, Numeric, String
+from sqlalchemy import Column, Integer, Boolean, DateTime, Numeric, String, text
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -9,11 +9,14 @@ class Settings(Base):
     email_notifications = Column(Boolean, default=True)
     low_stock_alerts = Column(Boolean, default=True)
     auto_confirmations = Column(Boolean, default=False)
+    pending_payment_ttl_minutes = Column(Integer, nullable=False, default=1440, server_default=text('1440'))  # 0 = no vencen
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default=text('1'))  # Se incrementa en cada cambio (caché de settings)
     
     # New fields
     shipping_base_cost = Column(Numeric(10, 2), default=0.0)
     free_shipping_threshold = Column(Numeric(10, 2), default=0.0)
+    tax_rate = Column(Numeric(5, 4), nullable=False, default=0, server_default=text('0'))  # 0.18 = 18%; 0 si los precios ya lo incluyen
     business_hours = Column(String, nullable=True)
     social_facebook = Column(String, nullable=True)
     social_instagram = Column(String, nullable=True)
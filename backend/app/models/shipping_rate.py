@@ -0,0 +1,20 @@
+from sqlalchemy import Column, BigInteger, String, DECIMAL, TIMESTAMP, UniqueConstraint, text
+from app.database import Base
+
+
+class ShippingRate(Base):
+    """
+    Costo de envío por ciudad y distrito. district NULL = resto de la ciudad.
+    Sin tarifa para la ciudad se usa settings.shipping_base_cost.
+    """
+    __tablename__ = "shipping_rates"
+    __table_args__ = (
+        UniqueConstraint('city', 'district', name='uk_shipping_rates_city_district'),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    city = Column(String(100), nullable=False)
+    district = Column(String(100), nullable=True)
+    cost = Column(DECIMAL(10, 2), nullable=False)
+    free_shipping_threshold = Column(DECIMAL(10, 2), nullable=True)  # NULL = el de settings
+    created_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'))
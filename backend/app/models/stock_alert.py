@@ -0,0 +1,33 @@
+from sqlalchemy import Column, BigInteger, String, Integer, TIMESTAMP, ForeignKey, Index, text
+from sqlalchemy.orm import relationship
+from app.database import Base
+import enum
+
+
+class StockAlertLevel(str, enum.Enum):
+    LOW = "LOW"  # stock <= umbral del producto
+    OUT = "OUT"  # stock = 0
+
+
+class StockAlert(Base):
+    """Cruce del umbral de stock bajo, lo registra StockAlertService"""
+    __tablename__ = "stock_alerts"
+    __table_args__ = (
+        Index('idx_stock_alerts_product_resolved', 'product_id', 'resolved_at'),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    product_id = Column(BigInteger, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    level = Column(String(10), nullable=False)
+    stock = Column(Integer, nullable=False)  # Stock después del cambio
+    threshold = Column(Integer, nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+    acknowledged_at = Column(TIMESTAMP, nullable=True)
+    acknowledged_by = Column(BigInteger, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    resolved_at = Column(TIMESTAMP, nullable=True)  # El stock volvió a superar el umbral
+
+    # Relationships
+    product = relationship("Product")
+
+    def __repr__(self):
+        return f"<StockAlert(id={self.id}, product_id={self.product_id}, level='{self.level}', stock={self.stock})>"
@@ -5,10 +5,11 @@ from datetime import datetime, timedelta
 from typing import Optional
 from decimal import Decimal
 
-from app.database import get_db
+from app.database import get_read_db
 from app.models.order import Order, OrderItem, OrderStatus
-from app.models.product import Product
+from app.models.product import Product, ProductImage
 from app.models.category import Category
+from app.services.stock_alert_service import LOW_STOCK_DEFAULT_THRESHOLD
 from app.utils.dependencies import get_current_admin_user
 
 router = APIRouter(prefix="/admin/analytics", tags=["Admin - Analytics"])
@@ -18,7 +19,7 @@ router = APIRouter(prefix="/admin/analytics", tags=["Admin - Analytics"])
 async def get_analytics_summary(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_admin = Depends(get_current_admin_user)
 ):
     """
@@ -73,7 +74,7 @@ async def get_revenue_chart(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     period: str = Query(default="day", regex="^(day|week|month)$"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_admin = Depends(get_current_admin_user)
 ):
     """
@@ -129,7 +130,7 @@ async def get_top_products(
     limit: int = Query(default=10, ge=1, le=50),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_admin = Depends(get_current_admin_user)
 ):
     """
@@ -181,7 +182,7 @@ async def get_top_products(
 async def get_sales_by_category(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_admin = Depends(get_current_admin_user)
 ):
     """
@@ -230,31 +231,48 @@ async def get_sales_by_category(
 
 @router.get("/low-stock")
 async def get_low_stock_products(
-    threshold: int = Query(default=5, ge=1),
+    threshold: Optional[int] = Query(default=None, ge=1, description="Umbral fijo; sin valor se usa el umbral de cada producto"),
     limit: int = Query(default=10, ge=1, le=50),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_admin = Depends(get_current_admin_user)
 ):
     """
     Obtener productos con stock bajo (crítico).
+    Una sola consulta: recorre idx_products_active_stock en orden de stock y
+    trae el thumbnail de la imagen principal con una subconsulta.
     """
+    product_threshold = func.coalesce(Product.low_stock_threshold, LOW_STOCK_DEFAULT_THRESHOLD)
+    image = (
+        select(func.coalesce(ProductImage.thumbnail_url, ProductImage.image_url))
+        .where(ProductImage.product_id == Product.id)
+        .order_by(ProductImage.is_primary.desc(), ProductImage.display_order, ProductImage.id)
+        .limit(1)
+        .correlate(Product)
+        .scalar_subquery()
+    )
     query = (
-        select(Product)
-        .where(and_(Product.stock <= threshold, Product.is_active == True))
-        .order_by(Product.stock.asc())
+        select(
+            Product.id, Product.name, Product.stock, Product.price,
+            product_threshold.label("threshold"), image.label("image")
+        )
+        .where(and_(
+            Product.is_active == True,
+            Product.stock <= (threshold if threshold is not None else product_threshold)
+        ))
+        .order_by(Product.stock.asc(), Product.id)
         .limit(limit)
     )
     
     result = await db.execute(query)
-    products = result.scalars().all()
     
     return [
         {
-            "id": p.id,
-            "name": p.name,
-            "stock": p.stock,
-            "price": p.price,
-            "image": p.images[0].thumbnail_url if p.images else None
+            "id": row.id,
+            "name": row.name,
+            "stock": row.stock,
+            "price": row.price,
+            "threshold": threshold if threshold is not None else row.threshold,
+            "image": row.image
         }
-        for p in products
+        for row in result.all()
     ]
@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.category import Category
 from app.schemas.category import (
     CategoryCreate, CategoryUpdate, CategoryResponse, CategoryListResponse
 )
+from app.services.job_queue import JobQueue
 from app.utils.dependencies import get_current_admin_user
 from app.utils.helpers import slugify
-from app.utils.image_upload import save_upload_file, delete_image_files
+from app.utils.image_upload import save_upload_file
 from typing import Optional
 import math
 
@@ -20,7 +21,7 @@ async def list_categories(
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
     search: Optional[str] = Query(None, description="Search by name"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_admin = Depends(get_current_admin_user)
 ):
     """
@@ -103,7 +104,7 @@ async def create_category(
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(
     category_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_admin = Depends(get_current_admin_user)
 ):
     """
@@ -224,15 +225,12 @@ async def upload_category_image(
             detail="Category not found"
         )
     
-    # Delete old image if exists
+    # Delete old image after commit (background job)
     if category.image_url:
-        try:
-            delete_image_files(category.image_url)
-        except Exception as e:
-            print(f"Error deleting old image: {e}")
+        JobQueue.enqueue(db, "delete_image_files", {"image_url": category.image_url})
             
-    # Save new image
-    image_url, _ = await save_upload_file(file)
+    # Save new image (categories don't use the thumbnail)
+    image_url, _ = await save_upload_file(file, defer_thumbnail=True)
     
     # Update category
     category.image_url = image_url
@@ -0,0 +1,119 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from datetime import datetime
+from typing import Optional
+
+from app.database import get_read_db
+from app.models.category import Category
+from app.models.inventory import InventoryMovement
+from app.services.inventory_service import InventoryService
+from app.utils.dependencies import get_current_admin_user
+
+router = APIRouter(prefix="/admin/inventory", tags=["Admin - Inventory"])
+
+
+@router.get("/movements")
+async def get_inventory_movements(
+    product_id: Optional[int] = Query(default=None),
+    reason: Optional[str] = Query(default=None, description="INITIAL, ORDER, CANCELLATION, ADJUSTMENT, EDIT, RECONCILIATION"),
+    before_id: Optional[int] = Query(default=None, description="Cursor: id del último movimiento recibido"),
+    limit: int = Query(default=50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Movimientos del ledger de inventario, del más reciente al más antiguo.
+    """
+    query = select(InventoryMovement).order_by(InventoryMovement.id.desc()).limit(limit)
+    if product_id is not None:
+        query = query.where(InventoryMovement.product_id == product_id)
+    if reason:
+        query = query.where(InventoryMovement.reason == reason.upper())
+    if before_id is not None:
+        query = query.where(InventoryMovement.id < before_id)
+
+    result = await db.execute(query)
+    return [
+        {
+            "id": movement.id,
+            "product_id": movement.product_id,
+            "quantity": movement.quantity,
+            "stock_after": movement.stock_after,
+            "reason": movement.reason,
+            "reference_id": movement.reference_id,
+            "user_id": movement.user_id,
+            "created_at": movement.created_at,
+        }
+        for movement in result.scalars().all()
+    ]
+
+
+@router.get("/stock-at")
+async def get_stock_at(
+    at: datetime = Query(..., description="Fecha y hora del stock a consultar"),
+    product_id: Optional[int] = Query(default=None),
+    category_id: Optional[int] = Query(default=None),
+    db: AsyncSession = Depends(get_read_db),
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Stock de los productos en una fecha: último snapshot anterior + movimientos posteriores.
+    """
+    query = await InventoryService.stock_query(db, at, product_id=product_id, category_id=category_id)
+    result = await db.execute(query.order_by(query.selected_columns.id))
+    return [
+        {"product_id": row.id, "name": row.name, "stock": row.stock}
+        for row in result.all()
+    ]
+
+
+@router.get("/valuation")
+async def get_inventory_valuation(
+    at: Optional[datetime] = Query(default=None, description="Fecha de la valorización (por defecto, ahora)"),
+    db: AsyncSession = Depends(get_read_db),
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Valorización del inventario por categoría: stock a la fecha x precio actual
+    (no se guarda el costo histórico de los productos).
+    """
+    stock = (await InventoryService.stock_query(db, at)).subquery()
+    result = await db.execute(
+        select(
+            Category.id, Category.name,
+            func.sum(stock.c.stock).label("units"),
+            func.sum(stock.c.stock * stock.c.price).label("value")
+        )
+        .join(stock, stock.c.category_id == Category.id)
+        .group_by(Category.id, Category.name)
+        .order_by(func.sum(stock.c.stock * stock.c.price).desc())
+    )
+    categories = [
+        {
+            "category_id": row.id,
+            "category_name": row.name,
+            "units": int(row.units or 0),
+            "value": round(float(row.value or 0), 2)
+        }
+        for row in result.all()
+    ]
+    return {
+        "at": at,
+        "total_units": sum(category["units"] for category in categories),
+        "total_value": round(sum(category["value"] for category in categories), 2),
+        "categories": categories
+    }
+
+
+@router.get("/reconciliation")
+async def get_inventory_reconciliation(
+    db: AsyncSession = Depends(get_read_db),
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Productos cuyo stock no coincide con el ledger (corregir con
+    `python inventory_snapshot.py --fix`).
+    """
+    drifts = await InventoryService.reconcile(db)
+    return {"drifts": drifts, "count": len(drifts)}
@@ -0,0 +1,96 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_read_db, engine, DB_POOL_SIZE, DB_MAX_OVERFLOW, WEB_CONCURRENCY
+from app.services.audit_service import audit_writer
+from app.services.job_queue import JobQueue
+from app.services.order_expiry import order_expiry_sweeper
+from app.utils.dependencies import get_current_admin_user
+from app.utils.pool_metrics import pool_wait_metrics
+from app.utils.query_metrics import query_metrics
+from app.utils.response_cache import catalog_cache
+
+router = APIRouter(prefix="/admin/metrics", tags=["Admin - Metrics"])
+
+
+@router.get("/queries")
+async def get_query_metrics(
+    top: int = Query(default=20, ge=1, le=200),
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Métricas de consultas SQL del proceso actual.
+    Agrupadas por fingerprint (SQL normalizado) y ordenadas por tiempo total.
+    """
+    return query_metrics.snapshot(top=top)
+
+
+@router.delete("/queries")
+async def reset_query_metrics(
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Reiniciar los contadores de consultas del proceso actual.
+    """
+    query_metrics.reset()
+    return {"message": "Métricas reiniciadas"}
+
+
+@router.get("/pool")
+async def get_pool_metrics(
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Estado del pool de conexiones y tiempos de espera de checkout del proceso actual.
+    """
+    pool = engine.pool
+    return {
+        "workers": WEB_CONCURRENCY,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "wait": pool_wait_metrics.snapshot()
+    }
+
+
+@router.get("/cache")
+async def get_cache_metrics(
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Estado del caché de respuestas del catálogo del proceso actual.
+    """
+    return catalog_cache.stats()
+
+
+@router.get("/jobs")
+async def get_job_metrics(
+    db: AsyncSession = Depends(get_read_db),
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Jobs en segundo plano por estado y últimos fallos definitivos.
+    """
+    return await JobQueue.stats(db)
+
+
+@router.get("/audit")
+async def get_audit_metrics(
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Estado del writer de auditoría del proceso actual (buffer y lotes escritos).
+    """
+    return audit_writer.stats()
+
+
+@router.get("/order-expiry")
+async def get_order_expiry_metrics(
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Barrido de pedidos sin pago vencidos del proceso actual: pedidos
+    cancelados y unidades devueltas al stock.
+    """
+    return order_expiry_sweeper.stats()
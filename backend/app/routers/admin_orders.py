@@ -1,17 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, or_
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import flag_modified
 from typing import List, Optional
+from datetime import timedelta
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.order import Order, OrderItem
 from app.models.user import User
 from app.schemas.order_schemas import (
     OrderResponse,
     OrderListResponse,
-    OrderStatusUpdate
+    OrderStatusUpdate,
+    OrderBulkStatusUpdate,
+    OrderBulkStatusResponse,
+    OrderBulkStatusResult
 )
+from app.services.order_service import OrderService, db_now
 from app.utils.dependencies import get_current_admin_user
+from app.utils.responses import ORJSONResponse
+from app.utils.serializers import order_list_item
 
 router = APIRouter(prefix="/admin/orders", tags=["Admin Orders"])
 
@@ -22,7 +31,7 @@ async def list_orders(
     limit: int = Query(20, ge=1, le=100),
     status: Optional[str] = None,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """
@@ -53,13 +62,87 @@ async def list_orders(
     result = await db.execute(stmt)
     orders = result.scalars().all()
     
-    return orders
+    return ORJSONResponse([order_list_item(o) for o in orders])
+
+
+# Etapas del SLA: (nombre, fecha de inicio, fecha de fin)
+SLA_STAGES = [
+    ("payment", "created_at", "paid_at"),
+    ("fulfillment", "paid_at", "shipped_at"),
+    ("delivery", "shipped_at", "delivered_at"),
+    ("end_to_end", "created_at", "delivered_at"),
+    ("cancellation", "created_at", "cancelled_at"),
+]
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+@router.get("/sla")
+async def get_orders_sla(
+    days: int = Query(30, ge=1, le=365, description="Pedidos creados en los últimos N días"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Tiempos entre transiciones de estado (horas) de los pedidos recientes:
+    promedio, p50 y p90 por etapa. Solo cuentan los pedidos que llegaron al
+    estado final de la etapa.
+    """
+    # Ventana con el reloj de la base, el mismo de created_at
+    since = (await db.execute(select(db_now()))).scalar_one() - timedelta(days=days)
+    columns = sorted({column for _, start, end in SLA_STAGES for column in (start, end)})
+    result = await db.execute(
+        select(*(getattr(Order, column) for column in columns))
+        .where(Order.created_at >= since)
+    )
+    rows = result.all()
+    
+    stages = {}
+    for name, start, end in SLA_STAGES:
+        hours = sorted(
+            (getattr(row, end) - getattr(row, start)).total_seconds() / 3600
+            for row in rows
+            if getattr(row, start) is not None and getattr(row, end) is not None
+        )
+        stages[name] = {
+            "orders": len(hours),
+            "avg_hours": round(sum(hours) / len(hours), 2) if hours else None,
+            "p50_hours": round(_percentile(hours, 0.5), 2) if hours else None,
+            "p90_hours": round(_percentile(hours, 0.9), 2) if hours else None,
+        }
+    
+    return {"days": days, "orders": len(rows), "stages": stages}
+
+
+@router.post("/bulk-status", response_model=OrderBulkStatusResponse)
+async def bulk_update_order_status(
+    bulk_update: OrderBulkStatusUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Cambiar el estado de varios pedidos en una sola transacción (solo admin).
+    
+    - Los pedidos cuya transición no está permitida se reportan y no se cambian
+    - Al cancelar se repone el stock de todos los pedidos en un solo UPDATE
+    """
+    results = await OrderService.transition(db, bulk_update.order_ids, bulk_update.status, current_user.id)
+    await db.commit()
+    
+    return OrderBulkStatusResponse(
+        updated=sum(1 for item in results if item["status"] == "updated"),
+        failed=sum(1 for item in results if item["status"] == "error"),
+        results=[OrderBulkStatusResult(**item) for item in results]
+    )
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order_detail(
     order_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """
@@ -67,8 +150,6 @@ async def get_order_detail(
     
     - Incluye todos los items del pedido
     """
-    from sqlalchemy.orm import selectinload
-    
     result = await db.execute(
         select(Order)
         .options(selectinload(Order.items))
@@ -95,39 +176,45 @@ async def update_order_status(
     """
     Actualizar el estado de un pedido (solo admin).
     
-    - Cambia el estado del pedido
+    - Cambia el estado del pedido si la transición está permitida
+    - Al cancelar se repone el stock de sus productos
     - Opcionalmente actualiza las notas
     """
     
-    result = await db.execute(select(Order).where(Order.id == order_id))
-    order = result.scalar_one_or_none()
+    # Cargar el pedido con sus items una sola vez (se usan en la respuesta)
+    result = await db.execute(
+        select(Order, db_now())
+        .options(selectinload(Order.items))
+        .where(Order.id == order_id)
+    )
+    row = result.one_or_none()
     
-    if not order:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Pedido no encontrado"
         )
+    order, now = row
     
-    # Actualizar estado
-    order.status = status_update.status
+    # Actualizar estado (sincroniza status y fechas del pedido ya cargado)
+    [transition] = await OrderService.transition(db, [order.id], status_update.status, current_user.id)
+    if transition["status"] == "error":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=transition["error"]
+        )
     
     # Actualizar notas si se proporcionan
     if status_update.notes:
         order.notes = status_update.notes
+        # updated_at con la fecha de la base ya leída: no hay que recargar el pedido tras el commit.
+        # flag_modified: aunque sea el mismo valor que fijó transition(), va en el UPDATE
+        # (si no, el onupdate=func.now() del modelo lo dejaría expirado)
+        order.updated_at = now
+        flag_modified(order, "updated_at")
     
     try:
         await db.commit()
-        await db.refresh(order)
-        
-        # Recargar con items para la respuesta
-        from sqlalchemy.orm import selectinload
-        result = await db.execute(
-            select(Order)
-            .options(selectinload(Order.items))
-            .where(Order.id == order_id)
-        )
-        order = result.scalar_one()
-        
         return order
     except Exception as e:
         await db.rollback()
@@ -135,4 +222,3 @@ async def update_order_status(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al actualizar estado: {str(e)}"
         )
-
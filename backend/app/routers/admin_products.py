@@ -2,16 +2,23 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, or_
 from sqlalchemy.orm import selectinload
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.product import Product, ProductImage
 from app.models.category import Category
 from app.schemas.product import (
     ProductCreate, ProductUpdate, ProductResponse, 
-    ProductListResponse, ProductListItem, ProductImageResponse
+    ProductListResponse, ProductImageResponse
 )
+from app.services.job_queue import JobQueue
+from app.services.slug_service import SlugService
+from app.models.inventory import MovementReason
+from app.services.inventory_service import InventoryService
+from app.services.stock_alert_service import StockChange
 from app.utils.dependencies import get_current_admin_user
 from app.utils.helpers import slugify
-from app.utils.image_upload import save_upload_file, delete_image_files
+from app.utils.image_upload import save_upload_file
+from app.utils.responses import ORJSONResponse
+from app.utils.serializers import product_list_item_with_thumbnail
 from typing import Optional
 import math
 
@@ -24,7 +31,7 @@ async def list_products(
     search: Optional[str] = Query(None),
     category_id: Optional[int] = Query(None),
     is_active: Optional[bool] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_admin = Depends(get_current_admin_user)
 ):
     """List all products with pagination and filters. Admin only."""
@@ -63,35 +70,18 @@ async def list_products(
     result = await db.execute(query)
     products = result.scalars().all()
     
-    # Build response items
-    items = []
-    for product in products:
-        # Get primary image if exists
-        primary_image = next((img for img in product.images if img.is_primary), None)
-        if not primary_image and product.images:
-            primary_image = product.images[0]
-        
-        items.append(ProductListItem(
-            id=product.id,
-            name=product.name,
-            slug=product.slug,
-            category_id=product.category_id,
-            price=product.price,
-            stock=product.stock,
-            is_active=product.is_active,
-            image_url=primary_image.thumbnail_url if primary_image else None,
-            category=product.category
-        ))
+    # Build response items (same shape as ProductListItem, no double validation)
+    items = [product_list_item_with_thumbnail(product) for product in products]
     
     pages = math.ceil(total / limit) if total > 0 else 0
     
-    return ProductListResponse(
-        items=items,
-        total=total,
-        page=page,
-        pages=pages,
-        limit=limit
-    )
+    return ORJSONResponse({
+        "items": items,
+        "total": total,
+        "page": page,
+        "pages": pages,
+        "limit": limit
+    })
 
 @router.post("", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def create_product(
@@ -112,19 +102,8 @@ async def create_product(
             detail="Category not found"
         )
     
-    # Generate initial slug
-    base_slug = slugify(product_data.name)
-    slug = base_slug
-    counter = 1
-    
-    # Check slug uniqueness and increment if necessary
-    while True:
-        stmt = select(Product).where(Product.slug == slug)
-        result = await db.execute(stmt)
-        if not result.scalar_one_or_none():
-            break
-        counter += 1
-        slug = f"{base_slug}-{counter}"
+    # Generate unique slug (base or base-N, in a single query)
+    slug = await SlugService.allocate(db, Product, slugify(product_data.name))
     
     # Create product
     new_product = Product(
@@ -134,10 +113,15 @@ async def create_product(
         category_id=product_data.category_id,
         price=product_data.price,
         stock=product_data.stock,
+        low_stock_threshold=product_data.low_stock_threshold,
         is_active=product_data.is_active
     )
     
     db.add(new_product)
+    await db.flush()
+    await InventoryService.record(db, [
+        StockChange(new_product.id, 0, new_product.stock)
+    ], MovementReason.INITIAL, user_id=current_admin.id)
     await db.commit()
     
     # Reload product with images eagerly loaded
@@ -150,7 +134,7 @@ async def create_product(
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_admin = Depends(get_current_admin_user)
 ):
     """Get product by ID with images. Admin only."""
@@ -205,28 +189,23 @@ async def update_product(
         
         # If name changed, regenerate slug
         if 'name' in update_data:
-            base_slug = slugify(update_data['name'])
-            new_slug = base_slug
-            counter = 1
-            
-            # Check uniqueness loop
-            while True:
-                stmt = select(Product).where(
-                    Product.slug == new_slug,
-                    Product.id != product_id
-                )
-                result = await db.execute(stmt)
-                if not result.scalar_one_or_none():
-                    break
-                counter += 1
-                new_slug = f"{base_slug}-{counter}"
-            
-            update_data['slug'] = new_slug
+            update_data['slug'] = await SlugService.allocate(
+                db, Product, slugify(update_data['name']), exclude_id=product_id
+            )
+            if update_data['slug'] != product.slug:
+                SlugService.forget(product.slug)
+        
+        old_stock = product.stock
         
         # Apply updates
         for field, value in update_data.items():
             setattr(product, field, value)
         
+        if product.stock != old_stock:
+            await InventoryService.record(db, [
+                StockChange(product.id, old_stock, product.stock, product.low_stock_threshold)
+            ], MovementReason.EDIT, user_id=current_admin.id)
+        
         await db.commit()
         await db.refresh(product)
         
@@ -268,6 +247,7 @@ async def delete_product(
     
     product.is_active = False
     await db.commit()
+    SlugService.forget(product.slug)
     
     return None
 
@@ -300,8 +280,8 @@ async def upload_product_image(
         
         print(f"✓ Product found: {product.name}")
         
-        # Save image
-        image_url, thumbnail_url = await save_upload_file(file)
+        # Save image (the thumbnail is generated by a background job)
+        image_url, thumbnail_url = await save_upload_file(file, defer_thumbnail=True)
         print(f"✓ Image saved: {image_url}")
         
         # If is_primary, unmark other images
@@ -320,6 +300,12 @@ async def upload_product_image(
         )
         
         db.add(new_image)
+        await db.flush()
+        JobQueue.enqueue(db, "create_thumbnail", {
+            "image_id": new_image.id,
+            "product_id": product_id,
+            "image_url": image_url,
+        })
         await db.commit()
         await db.refresh(new_image)
         
@@ -363,10 +349,11 @@ async def delete_product_image(
             detail="Image not found"
         )
     
-    # Delete files
-    delete_image_files(image.image_url, image.thumbnail_url)
-    
-    # Delete record
+    # Delete record; files are removed by a background job after commit
+    JobQueue.enqueue(db, "delete_image_files", {
+        "image_url": image.image_url,
+        "thumbnail_url": image.thumbnail_url,
+    })
     await db.delete(image)
     await db.commit()
     
@@ -415,7 +402,7 @@ async def delete_product(
         print(f"⚠️ El producto tiene pedidos asociados. Haciendo SOFT DELETE...")
         product.is_active = False
         await db.commit()
-        await db.refresh(product)
+        SlugService.forget(product.slug)
         
         print(f"✅ Producto '{product_name}' marcado como INACTIVO (soft delete)")
         return {
@@ -428,19 +415,20 @@ async def delete_product(
     # HARD DELETE: Eliminar permanentemente
     print(f"🔥 El producto NO tiene pedidos. Eliminando PERMANENTEMENTE...")
     
-    # Eliminar imágenes físicas del servidor
-    image_urls = [img.image_url for img in product.images]
-    if image_urls:
-        print(f"📁 Eliminando {len(image_urls)} imágenes...")
-        for url in image_urls:
-            try:
-                delete_image_files(url)
-            except Exception as e:
-                print(f"⚠️ Error al eliminar imagen {url}: {e}")
+    # Eliminar imágenes físicas del servidor (job en segundo plano, solo si el commit ocurre)
+    if product.images:
+        print(f"📁 Encolando eliminación de {len(product.images)} imágenes...")
+        for img in product.images:
+            JobQueue.enqueue(db, "delete_image_files", {
+                "image_url": img.image_url,
+                "thumbnail_url": img.thumbnail_url,
+            })
     
     # Eliminar producto PERMANENTEMENTE de la base de datos
+    product_slug = product.slug
     await db.delete(product)
     await db.commit()
+    SlugService.forget(product_slug)
     
     print(f"✅ Producto '{product_name}' eliminado PERMANENTEMENTE")
     
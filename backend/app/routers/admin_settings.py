@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, delete, update
+from typing import List
 from app.database import get_db
 from app.models.settings import Settings
-from app.schemas.settings import SettingsUpdate, SettingsResponse
+from app.models.shipping_rate import ShippingRate
+from app.schemas.settings import SettingsUpdate, SettingsResponse, ShippingRateItem
+from app.services.pricing_service import zone_key
+from app.services.settings_cache import settings_cache
 from app.utils.dependencies import get_current_admin_user
 
 router = APIRouter(prefix="/admin/settings", tags=["Admin - Settings"])
@@ -14,18 +18,17 @@ async def get_settings(
     current_admin = Depends(get_current_admin_user)
 ):
     """
-    Get system settings. Creates default settings if none exist.
+    Get system settings (from the in-process cache). Creates default settings if none exist.
     """
-    stmt = select(Settings).limit(1)
-    result = await db.execute(stmt)
-    settings = result.scalar_one_or_none()
+    settings = await settings_cache.get(db)
     
-    if not settings:
+    if settings.id is None:
         # Create default settings
-        settings = Settings()
-        db.add(settings)
+        row = Settings()
+        db.add(row)
         await db.commit()
-        await db.refresh(settings)
+        await db.refresh(row)
+        settings = settings_cache.store(row)
     
     return settings
 
@@ -36,15 +39,17 @@ async def update_settings(
     current_admin = Depends(get_current_admin_user)
 ):
     """
-    Update system settings.
+    Update system settings. Other workers pick up the change when they see the new version.
     """
-    stmt = select(Settings).limit(1)
+    stmt = select(Settings).limit(1).with_for_update()
     result = await db.execute(stmt)
     settings = result.scalar_one_or_none()
     
     if not settings:
         settings = Settings()
         db.add(settings)
+    else:
+        settings.version = Settings.version + 1
     
     # Update fields
     for field, value in settings_data.model_dump().items():
@@ -53,4 +58,42 @@ async def update_settings(
     await db.commit()
     await db.refresh(settings)
     
-    return settings
+    return settings_cache.store(settings)
+
+@router.get("/shipping-rates", response_model=List[ShippingRateItem])
+async def get_shipping_rates(
+    db: AsyncSession = Depends(get_db),
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Shipping rates by city and district (district null = rest of the city).
+    """
+    result = await db.execute(select(ShippingRate).order_by(ShippingRate.city, ShippingRate.district))
+    return result.scalars().all()
+
+@router.put("/shipping-rates", response_model=List[ShippingRateItem])
+async def replace_shipping_rates(
+    rates: List[ShippingRateItem],
+    db: AsyncSession = Depends(get_db),
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Replace the whole shipping rate table in one transaction.
+    Bumps the settings version so every worker reloads the rates.
+    """
+    zones = [(zone_key(rate.city), zone_key(rate.district)) for rate in rates]
+    if len(set(zones)) != len(zones):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ciudad y distrito repetidos")
+    
+    await db.execute(delete(ShippingRate))
+    if rates:
+        await db.execute(insert(ShippingRate), [rate.model_dump() for rate in rates])
+    
+    bumped = await db.execute(update(Settings).values(version=Settings.version + 1))
+    if not bumped.rowcount:
+        db.add(Settings())
+    
+    await db.commit()
+    await settings_cache.load(db)
+    
+    return settings_cache.shipping_rates.rates
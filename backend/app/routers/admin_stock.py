@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from app.database import get_db
+from sqlalchemy import select, func
+from app.database import get_db, get_read_db
 from app.models.product import Product
 from app.models.audit_log import AuditLog
+from app.models.stock_alert import StockAlert
 from app.models.user import User
-from app.schemas.stock import StockAdjustmentRequest, StockHistoryItem
+from app.schemas.stock import (
+    StockAdjustmentRequest, StockHistoryItem, StockAlertItem,
+    StockBatchRequest, StockBatchResponse, StockBatchLineResult, StockHistoryResponse
+)
+from app.services.audit_service import AuditService
+from app.models.inventory import MovementReason
+from app.services.inventory_service import InventoryService
+from app.services.stock_alert_service import StockChange
+from app.services.stock_service import StockService, StockAdjustmentLine, StockConflictError, STOCK_BATCH_MAX_LINES
 from app.utils.dependencies import get_current_admin_user
-import json
+from app.utils.helpers import encode_cursor, decode_cursor
+from datetime import datetime
+from typing import Optional, List
+import csv
+import io
 
 router = APIRouter(prefix="/admin/stock", tags=["Admin - Stock"])
 
@@ -37,74 +50,227 @@ async def adjust_product_stock(
     # 2. Update Product
     product.stock = new_stock
     
-    # 3. Create Audit Log
-    log_entry = AuditLog(
-        user_id=current_admin.id,
-        action_type="ADJUST_STOCK",
-        entity_type="product",
-        entity_id=product.id,
-        old_value=json.dumps({"stock": old_stock}),
-        new_value=json.dumps({
-            "stock": new_stock,
-            "difference": adjustment_data.adjustment,
-            "reason": adjustment_data.reason
-        })
-    )
-    db.add(log_entry)
+    # 3. Audit log (written after commit by the audit writer)
+    await AuditService.log(db, [
+        AuditService.stock_adjustment(current_admin.id, product.id, old_stock, new_stock, adjustment_data.reason)
+    ])
+    
+    # 4. Inventory ledger and low-stock alert (only if the threshold is crossed)
+    await InventoryService.record(db, [
+        StockChange(product.id, old_stock, new_stock, product.low_stock_threshold)
+    ], MovementReason.ADJUSTMENT, user_id=current_admin.id)
     
     await db.commit()
-    await db.refresh(product)
     
     return {"message": "Stock actualizado", "current_stock": product.stock}
 
-@router.get("/history", response_model=list[StockHistoryItem])
-async def get_stock_history(
-    limit: int = 50,
+async def _apply_batch(
+    db: AsyncSession,
+    user_id: int,
+    lines: List[StockAdjustmentLine],
+    atomic: bool,
+    errors: Optional[List[dict]] = None
+) -> StockBatchResponse:
+    """Aplica el lote en una transacción y arma la respuesta por línea"""
+    errors = errors or []
+    if len(lines) + len(errors) > STOCK_BATCH_MAX_LINES:
+        raise HTTPException(status_code=413, detail=f"Máximo {STOCK_BATCH_MAX_LINES} líneas por lote")
+    
+    try:
+        results = await StockService.apply_adjustments(db, user_id, lines, atomic=atomic) if lines else []
+        if atomic and errors:
+            for item in results:
+                if item["status"] == "applied":
+                    item.update(status="skipped", new_stock=None)
+            await db.rollback()
+        else:
+            await db.commit()
+    except StockConflictError as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    results = sorted(results + errors, key=lambda item: item["line"])
+    applied = sum(1 for item in results if item["status"] == "applied")
+    return StockBatchResponse(
+        applied=applied,
+        failed=sum(1 for item in results if item["status"] == "error"),
+        results=[StockBatchLineResult(**item) for item in results]
+    )
+
+@router.post("/products/batch", response_model=StockBatchResponse)
+async def adjust_stock_batch(
+    batch: StockBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Ajustar el stock de varios productos en una sola transacción
+    (p. ej. la recepción de un envío del proveedor).
+    Retorna el resultado de cada línea; las líneas inválidas no se aplican.
+    """
+    lines = [
+        StockAdjustmentLine(number, item.product_id, item.adjustment, item.reason or batch.reason)
+        for number, item in enumerate(batch.items, start=1)
+    ]
+    return await _apply_batch(db, current_admin.id, lines, batch.atomic)
+
+@router.post("/products/batch/csv", response_model=StockBatchResponse)
+async def adjust_stock_batch_csv(
+    file: UploadFile = File(..., description="CSV con columnas product_id, adjustment y reason (opcional)"),
+    reason: str = Form(..., min_length=3),
+    atomic: bool = Form(False),
     db: AsyncSession = Depends(get_db),
     current_admin = Depends(get_current_admin_user)
 ):
     """
-    Get stock adjustment history from audit logs.
+    Ajuste de stock en lote desde un CSV. La línea de cada resultado es la
+    línea del archivo (1 = encabezado).
     """
-    # Join with User and Product (snapshot-ish via entity_id) if needed, 
-    # but for now we join User to get who did it.
-    # Note: Product name might be lost if deleted, but AuditLog assumes persistence usually.
-    # Ideally checking entity_type='product' and action_type='ADJUST_STOCK'
+    try:
+        content = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="El archivo debe estar en UTF-8")
     
-    # Simple query on AuditLogs
+    reader = csv.DictReader(io.StringIO(content))
+    columns = {name.strip().lower() for name in reader.fieldnames or []}
+    if not {"product_id", "adjustment"} <= columns:
+        raise HTTPException(status_code=400, detail="El CSV debe tener las columnas product_id y adjustment")
+    
+    lines, errors = [], []
+    for row in reader:
+        row = {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+        if not any(row.values()):
+            continue
+        try:
+            product_id, adjustment = int(row["product_id"]), int(row["adjustment"])
+        except ValueError:
+            errors.append({"line": reader.line_num, "status": "error", "error": "product_id y adjustment deben ser enteros"})
+            continue
+        line_reason = row.get("reason") or reason
+        if len(line_reason) < 3:
+            errors.append({"line": reader.line_num, "product_id": product_id, "adjustment": adjustment,
+                           "status": "error", "error": "La razón debe tener al menos 3 caracteres"})
+            continue
+        lines.append(StockAdjustmentLine(reader.line_num, product_id, adjustment, line_reason))
+    
+    if not lines and not errors:
+        raise HTTPException(status_code=400, detail="El CSV no tiene líneas")
+    
+    return await _apply_batch(db, current_admin.id, lines, atomic, errors)
+
+@router.get("/history", response_model=StockHistoryResponse)
+async def get_stock_history(
+    limit: int = Query(default=50, ge=1, le=500),
+    product_id: Optional[int] = Query(default=None, description="Ledger de un producto"),
+    user_id: Optional[int] = Query(default=None, description="Ajustes hechos por un admin"),
+    date_from: Optional[datetime] = Query(default=None, description="Desde (inclusive)"),
+    date_to: Optional[datetime] = Query(default=None, description="Hasta (exclusive)"),
+    action_type: str = Query(default="ADJUST_STOCK"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor de la página anterior"),
+    db: AsyncSession = Depends(get_read_db),
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Get stock adjustment history from audit logs, newest first.
+    Keyset pagination on (created_at, id): pass next_cursor to get the next page.
+    Stock values are read with typed JSON paths in SQL (no JSON parsing here).
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    
+    # Page of audit rows (one index range scan), then user/product lookups by PK
+    page = AuditService.history_query(
+        AuditLog.id, AuditLog.entity_id, AuditLog.user_id, AuditLog.created_at, *AuditService.stock_fields(),
+        action_type=action_type, entity_id=product_id, user_id=user_id,
+        date_from=date_from, date_to=date_to, after=after, limit=limit + 1
+    ).subquery()
     query = (
-        select(AuditLog, User.email, Product.name)
-        .join(User, AuditLog.user_id == User.id)
-        .outerjoin(Product, AuditLog.entity_id == Product.id) # Outer join in case product deleted
-        .where(AuditLog.action_type == "ADJUST_STOCK")
-        .order_by(desc(AuditLog.created_at))
-        .limit(limit)
+        select(page, User.email, Product.name)
+        .outerjoin(User, page.c.user_id == User.id)
+        .outerjoin(Product, page.c.entity_id == Product.id) # Outer join in case product deleted
+        .order_by(page.c.created_at.desc(), page.c.id.desc())
     )
     
     result = await db.execute(query)
     rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
     
-    history_items = []
-    for log, email, product_name in rows:
-        # Parse JSON
-        try:
-            old_val = json.loads(log.old_value) if log.old_value else {}
-            new_val = json.loads(log.new_value) if log.new_value else {}
-            
-            item = StockHistoryItem(
-                id=log.id,
-                product_name=product_name or f"Producto ID {log.entity_id}",
-                action_type=log.action_type,
-                old_stock=old_val.get("stock", 0),
-                new_stock=new_val.get("stock", 0),
-                difference=new_val.get("difference", 0),
-                reason=new_val.get("reason", "Sin razón"),
-                user_email=email,
-                created_at=log.created_at
+    return StockHistoryResponse(
+        items=[
+            StockHistoryItem(
+                id=row.id,
+                product_name=row.name or f"Producto ID {row.entity_id}",
+                action_type=action_type,
+                old_stock=row.old_stock or 0,
+                new_stock=row.new_stock or 0,
+                difference=row.difference or 0,
+                reason=row.reason or "Sin razón",
+                user_email=row.email or "Usuario eliminado",
+                created_at=row.created_at
             )
-            history_items.append(item)
-        except Exception as e:
-            print(f"Error parsing log {log.id}: {e}")
-            continue
-            
-    return history_items
+            for row in rows
+        ],
+        next_cursor=encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+    )
+
+@router.get("/alerts", response_model=list[StockAlertItem])
+async def get_stock_alerts(
+    open_only: bool = Query(default=True, description="Solo alertas sin resolver ni confirmar"),
+    before_id: Optional[int] = Query(default=None, description="Cursor: id de la última alerta recibida"),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Feed de alertas de stock bajo, de la más reciente a la más antigua.
+    """
+    query = (
+        select(StockAlert, Product.name, Product.stock)
+        .join(Product, StockAlert.product_id == Product.id)
+        .order_by(StockAlert.id.desc())
+        .limit(limit)
+    )
+    if open_only:
+        query = query.where(StockAlert.resolved_at.is_(None), StockAlert.acknowledged_at.is_(None))
+    if before_id is not None:
+        query = query.where(StockAlert.id < before_id)
+    
+    result = await db.execute(query)
+    return [
+        StockAlertItem(
+            id=alert.id,
+            product_id=alert.product_id,
+            product_name=product_name,
+            level=alert.level,
+            stock=alert.stock,
+            current_stock=current_stock,
+            threshold=alert.threshold,
+            created_at=alert.created_at,
+            acknowledged_at=alert.acknowledged_at,
+            resolved_at=alert.resolved_at
+        )
+        for alert, product_name, current_stock in result.all()
+    ]
+
+@router.post("/alerts/{alert_id}/acknowledge", status_code=status.HTTP_200_OK)
+async def acknowledge_stock_alert(
+    alert_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_admin = Depends(get_current_admin_user)
+):
+    """
+    Marcar una alerta como vista.
+    """
+    alert = await db.get(StockAlert, alert_id)
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alerta no encontrada")
+    
+    if alert.acknowledged_at is None:
+        alert.acknowledged_at = func.now()
+        alert.acknowledged_by = current_admin.id
+        await db.commit()
+    
+    return {"message": "Alerta confirmada", "id": alert_id}
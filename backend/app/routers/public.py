@@ -1,50 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, func
 from sqlalchemy.orm import selectinload
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import math
 
-from app.database import get_db
+from app.database import get_read_db
 from app.models.order import Order
-from app.models.product import Product
+from app.models.product import Product, ProductImage
 from app.models.category import Category
 from app.schemas.order_schemas import OrderResponse
-from app.schemas.product import ProductResponse, ProductListItem, ProductListResponse
+from app.schemas.product import ProductResponse, ProductListItem, ProductListResponse, ProductFeedResponse
 from app.schemas.category import CategoryResponse
+from app.services.catalog_snapshot import catalog_snapshot
+from app.services.facet_service import FacetService, search_filter
+from app.services.feed_service import FeedService, FEEDS, FEEDS_MAX_ITEMS, ALL_CATEGORIES
+from app.services.recommendation_service import RecommendationService
+from app.services.slug_service import SlugService
+from app.utils.http_cache import (
+    CATALOG_CACHE_CONTROL, ORDER_CACHE_CONTROL,
+    catalog_version, catalog_version_columns, make_etag, etag_matches, not_modified, set_cache_headers
+)
+from app.utils.response_cache import catalog_cache, cached_response
+from app.utils.responses import ORJSONResponse, dumps
+from app.utils.serializers import category_response, product_list_item, product_list_item_with_thumbnail
 
 router = APIRouter(prefix="/public", tags=["Public"])
 
 
 @router.get("/categories", response_model=List[CategoryResponse])
-async def get_active_categories(db: AsyncSession = Depends(get_db)):
+async def get_active_categories(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
+):
     """
     Obtener todas las categorías activas (público).
+    Soporta If-None-Match (304 si no hubo cambios).
     """
+    etag = make_etag("categories", *await catalog_version(db, Category))
+    if etag_matches(request, etag):
+        return not_modified(etag, CATALOG_CACHE_CONTROL)
+    
+    cache_headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    cached = catalog_cache.get("categories", etag)
+    if cached is not None:
+        return cached_response(request, cached, cache_headers)
+    
     result = await db.execute(
         select(Category)
         .where(Category.is_active == True)
         .order_by(Category.name)
     )
     categories = result.scalars().all()
-    return categories
+    cached = catalog_cache.put("categories", etag, dumps([category_response(c) for c in categories]))
+    return cached_response(request, cached, cache_headers)
 
 
-@router.get("/products", response_model=ProductListResponse)
-async def get_public_products(
-    limit: int = Query(default=8, ge=1, le=100),
-    page: int = Query(default=1, ge=1),
-    category_id: Optional[int] = None,
-    search: Optional[str] = None,
-    min_price: Optional[float] = None,
-    max_price: Optional[float] = None,
-    sort_by: str = Query(default="newest", pattern="^(newest|price_asc|price_desc|name)$"),
-    db: AsyncSession = Depends(get_db)
-):
-    """
-    Obtener productos públicos con filtros y paginación.
-    Solo muestra productos activos y con stock disponible.
-    """
+async def _query_products(
+    db: AsyncSession,
+    category_id: Optional[int],
+    search: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    sort_by: str,
+    limit: int,
+    offset: int
+) -> Tuple[list, int]:
+    """Página del listado público en SQL: (items serializados, total)"""
     # 1. Base query for active products with stock
     base_query = select(Product).where(
         Product.is_active == True,
@@ -62,29 +84,24 @@ async def get_public_products(
         base_query = base_query.where(Product.price <= max_price)
     
     if search:
-        search_filter = (
-            Product.name.ilike(f"%{search}%") | 
-            Product.description.ilike(f"%{search}%")
-        )
-        base_query = base_query.where(search_filter)
+        base_query = base_query.where(search_filter(search))
 
     # 3. Calculate total count (before pagination)
     count_query = select(func.count()).select_from(base_query.subquery())
     result_count = await db.execute(count_query)
     total = result_count.scalar() or 0
 
-    # 4. Apply sorting
+    # 4. Apply sorting (id desempata: páginas estables e iguales a las del snapshot)
     if sort_by == "newest":
-        base_query = base_query.order_by(desc(Product.created_at))
+        base_query = base_query.order_by(desc(Product.created_at), desc(Product.id))
     elif sort_by == "price_asc":
-        base_query = base_query.order_by(Product.price.asc())
+        base_query = base_query.order_by(Product.price.asc(), Product.id)
     elif sort_by == "price_desc":
-        base_query = base_query.order_by(Product.price.desc())
+        base_query = base_query.order_by(Product.price.desc(), Product.id)
     elif sort_by == "name":
-        base_query = base_query.order_by(Product.name.asc())
+        base_query = base_query.order_by(Product.name.asc(), Product.id)
     
     # 5. Apply pagination
-    offset = (page - 1) * limit
     final_query = base_query.limit(limit).offset(offset).options(
         selectinload(Product.images),
         selectinload(Product.category)
@@ -93,52 +110,197 @@ async def get_public_products(
     result = await db.execute(final_query)
     products = result.scalars().all()
     
-    # 6. Transform to ProductListItem (for response)
-    # Note: ProductListItem expects 'image_url' which is the thumbnail of the primary image
-    items = []
-    for p in products:
-        primary_image = next((img for img in p.images if img.is_primary), None)
-        if not primary_image and p.images:
-            primary_image = p.images[0]
-            
-        items.append(ProductListItem(
-            id=p.id,
-            name=p.name,
-            slug=p.slug,
-            category_id=p.category_id,
-            category=p.category, # Include category object
-            price=p.price,
-            stock=p.stock,
-            is_active=p.is_active,
-            image_url=primary_image.thumbnail_url if primary_image else None
-        ))
+    # 6. Serialize directly (same shape as ProductListItem, no double validation)
+    # Note: 'image_url' is the thumbnail of the primary image
+    return [product_list_item_with_thumbnail(p) for p in products], total
+
+
+@router.get("/products", response_model=ProductListResponse)
+async def get_public_products(
+    request: Request,
+    limit: int = Query(default=8, ge=1, le=100),
+    page: int = Query(default=1, ge=1),
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    sort_by: str = Query(default="newest", pattern="^(newest|price_asc|price_desc|name)$"),
+    include_facets: bool = True,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Obtener productos públicos con filtros y paginación.
+    Solo muestra productos activos y con stock disponible.
+    Incluye facetas para los filtros (por categoría, rangos de precio, stock).
+    Soporta If-None-Match (304 si el catálogo no cambió).
+    """
+    # 0. Conditional request: un solo sondeo antes de contar y paginar
+    version = await catalog_version(db, Product, Category, ProductImage)
+    etag = make_etag("products", request.url.query, *version)
+    if etag_matches(request, etag):
+        return not_modified(etag, CATALOG_CACHE_CONTROL)
+    
+    # Página ya serializada (y comprimida) para esta versión del catálogo
+    cache_key = f"products?{sorted(request.query_params.multi_items())}"
+    cache_headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    cached = catalog_cache.get(cache_key, etag)
+    if cached is not None:
+        return cached_response(request, cached, cache_headers)
+    
+    offset = (page - 1) * limit
+    if catalog_snapshot.is_fresh(version):
+        # Snapshot en memoria al día con el sondeo: filtros, orden y página sin SQL
+        items, total = catalog_snapshot.query(
+            category_id, search, min_price, max_price, sort_by, limit, offset
+        )
+    else:
+        items, total = await _query_products(
+            db, category_id, search, min_price, max_price, sort_by, limit, offset
+        )
 
     pages = math.ceil(total / limit) if total > 0 else 0
 
-    return ProductListResponse(
-        items=items,
-        total=total,
-        page=page,
-        pages=pages,
-        limit=limit
+    # 7. Facets (cacheadas por versión del catálogo, compartidas entre páginas y orden)
+    facets = None
+    if include_facets:
+        facets = await FacetService.compute(db, version, category_id, search, min_price, max_price)
+
+    cached = catalog_cache.put(cache_key, etag, dumps({
+        "items": items,
+        "total": total,
+        "page": page,
+        "pages": pages,
+        "limit": limit,
+        "facets": facets
+    }))
+    return cached_response(request, cached, cache_headers)
+
+
+@router.get("/feeds/{feed}", response_model=ProductFeedResponse)
+async def get_product_feed(
+    feed: str,
+    request: Request,
+    category_id: Optional[int] = None,
+    limit: int = Query(default=8, ge=1, le=50),
+    page: int = Query(default=1, ge=1),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Feed rankeado para el home (público): bestsellers_7d, bestsellers_30d,
+    newest, price_asc o price_desc, global o por categoría.
+    
+    Lee una página del feed precalculado (FeedService.refresh_feeds) en vez de
+    ordenar el catálogo. Soporta If-None-Match (304 si no hubo cambios).
+    """
+    if feed not in FEEDS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Feed no encontrado"
+        )
+    
+    offset = (page - 1) * limit
+    if offset >= FEEDS_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El feed tiene como máximo {FEEDS_MAX_ITEMS} productos"
+        )
+    limit = min(limit, FEEDS_MAX_ITEMS - offset)
+    
+    version = await catalog_version(
+        db, Product, Category, ProductImage,
+        extra=(FeedService.version_column(feed),)
+    )
+    etag = make_etag("feed", feed, category_id, page, limit, *version)
+    if etag_matches(request, etag):
+        return not_modified(etag, CATALOG_CACHE_CONTROL)
+    
+    cache_key = f"feed:{feed}:{category_id}:{page}:{limit}"
+    cache_headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    cached = catalog_cache.get(cache_key, etag)
+    if cached is not None:
+        return cached_response(request, cached, cache_headers)
+    
+    # version[0]: último cálculo del feed (None si aún no se calculó, se ordena en vivo)
+    products = await FeedService.get_page(
+        db, feed, category_id or ALL_CATEGORIES, limit, offset,
+        materialized=version[0] is not None
     )
+    
+    cached = catalog_cache.put(cache_key, etag, dumps({
+        "feed": feed,
+        "category_id": category_id,
+        "items": [product_list_item_with_thumbnail(p) for p in products[:limit]],
+        "page": page,
+        "limit": limit,
+        "has_more": len(products) > limit and offset + limit < FEEDS_MAX_ITEMS
+    }))
+    return cached_response(request, cached, cache_headers)
+
+
+async def _probe_product(db: AsyncSession, slug: str):
+    """
+    Versión del producto activo con ese slug (id, slug y los contadores de
+    cambios de productos, categorías e imágenes), o None. Si el id está en la
+    caché de slugs, busca por clave primaria y confirma que el slug no haya
+    cambiado en otro worker.
+    """
+    def probe(condition):
+        return (
+            select(Product.id, Product.slug, *catalog_version_columns(Product, Category, ProductImage))
+            .where(condition, Product.is_active == True)
+        )
+
+    product_id = SlugService.cached_product_id(slug)
+    if product_id is not None:
+        result = await db.execute(probe(Product.id == product_id))
+        version = result.one_or_none()
+        if version and version.slug == slug:
+            return version
+        SlugService.forget(slug)
+
+    result = await db.execute(probe(Product.slug == slug))
+    version = result.one_or_none()
+    if version:
+        SlugService.remember(slug, version.id)
+    return version
 
 
 @router.get("/products/{slug}", response_model=ProductResponse)
 async def get_product_by_slug(
     slug: str,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Obtener un producto por su slug (público).
+    Soporta If-None-Match (304 si el producto no cambió).
     """
+    # Sondeo: slug y versión del catálogo en una consulta
+    version = await _probe_product(db, slug)
+    
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Producto no encontrado"
+        )
+    
+    etag = make_etag("product", *version)
+    if etag_matches(request, etag):
+        return not_modified(etag, CATALOG_CACHE_CONTROL)
+    
+    cache_key = f"product:{slug}"
+    cache_headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    cached = catalog_cache.get(cache_key, etag)
+    if cached is not None:
+        return cached_response(request, cached, cache_headers)
+    
     result = await db.execute(
         select(Product)
         .options(
             selectinload(Product.images),
             selectinload(Product.category)
         )
-        .where(Product.slug == slug, Product.is_active == True)
+        .where(Product.id == version.id, Product.is_active == True)
     )
     product = result.scalar_one_or_none()
     
@@ -148,75 +310,42 @@ async def get_product_by_slug(
             detail="Producto no encontrado"
         )
     
-    return product
+    body = dumps(ProductResponse.model_validate(product).model_dump(mode="json"))
+    cached = catalog_cache.put(cache_key, etag, body)
+    return cached_response(request, cached, cache_headers)
 
 
 @router.get("/products/{product_id}/addons", response_model=List[ProductListItem])
 async def get_product_addons(
     product_id: int,
     limit: int = Query(default=3, ge=1, le=10),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Obtener productos complementarios (add-ons) para un producto.
     
-    Lógica:
-    1. Productos de precio menor o similar (complementos)
-    2. Categorías complementarias predefinidas (chocolates, vinos, tarjetas)
-    3. Excluye el producto actual
-    """
-    # Obtener producto actual
-    result = await db.execute(
-        select(Product).where(Product.id == product_id)
-    )
-    current_product = result.scalar_one_or_none()
-    
-    if not current_product:
-        return []
-    
-    # Definir categorías complementarias típicas (puedes ajustar según tu BD)
-    # Chocolates, Vinos, Tarjetas, Peluches pequeños, etc.
-    complementary_categories = ["Chocolates", "Vinos", "Tarjetas", "Dulces"]
-    
-    # Query para productos complementarios
-    query = (
-        select(Product)
-        .options(selectinload(Product.images), selectinload(Product.category))
-        .where(
-            Product.is_active == True,
-            Product.stock > 0,
-            Product.id != product_id,
-            # Precio menor o similar (hasta 50% del precio del producto principal)
-            Product.price <= (current_product.price * 0.5)
-        )
-        .order_by(func.random())  # Aleatorio para variedad
-        .limit(limit)
-    )
+    Lógica (precalculada por RecommendationService.refresh_addons):
+    1. Productos comprados en los mismos pedidos
+    2. Categorías complementarias (chocolates, vinos, tarjetas, dulces)
+    3. Hasta 50% del precio del producto; excluye el producto actual
     
-    result = await db.execute(query)
-    addons = result.scalars().all()
+    Se eligen `limit` al azar del top-K para dar variedad.
+    """
+    addons = await RecommendationService.get_addons(db, product_id, limit)
     
     # Mapear a ProductListItem
-    return [
-        ProductListItem(
-            id=p.id,
-            name=p.name,
-            slug=p.slug,
-            category_id=p.category_id,
-            category=p.category,
-            price=p.price,
-            stock=p.stock,
-            is_active=p.is_active,
-            image_url=p.images[0].image_url if p.images else None
-        )
+    return ORJSONResponse([
+        product_list_item(p, p.images[0].image_url if p.images else None)
         for p in addons
-    ]
+    ])
 
 
 @router.get("/orders/{order_number}", response_model=OrderResponse)
 async def get_order_by_number(
     order_number: str,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Obtener detalles de un pedido por su número de orden (público).
@@ -224,8 +353,26 @@ async def get_order_by_number(
     - No requiere autenticación
     - Retorna información completa del pedido
     - Incluye lista de items/productos
+    - Soporta If-None-Match (304 si el pedido no cambió)
     """
     
+    # Sondeo: los items no cambian tras crear el pedido, basta con el pedido
+    probe = await db.execute(
+        select(Order.id, Order.updated_at, Order.status, Order.receipt_url)
+        .where(Order.order_number == order_number)
+    )
+    version = probe.one_or_none()
+    
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pedido no encontrado"
+        )
+    
+    etag = make_etag("order", *version)
+    if etag_matches(request, etag):
+        return not_modified(etag, ORDER_CACHE_CONTROL)
+    
     result = await db.execute(
         select(Order)
         .options(selectinload(Order.items))
@@ -239,4 +386,5 @@ async def get_order_by_number(
             detail="Pedido no encontrado"
         )
     
+    set_cache_headers(response, etag, ORDER_CACHE_CONTROL)
     return order
@@ -1,24 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, insert, update, case, desc
+from sqlalchemy.exc import IntegrityError
 from typing import Optional, List
 from decimal import Decimal
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User
 from app.models.product import Product
-from app.models.order import Order, OrderItem
-from app.schemas.order_schemas import OrderCreate, OrderResponse, OrderItemResponse
+from app.models.order import Order, OrderItem, OrderStatus
+from app.schemas.order_schemas import OrderCreate, OrderResponse, OrderItemResponse, OrderQuoteRequest, OrderQuoteResponse
+from app.services.idempotency_service import IdempotencyService
+from app.services.order_service import db_now
+from app.services.pricing_service import PricingService
+from app.services.settings_cache import settings_cache
+from app.models.inventory import MovementReason
+from app.services.inventory_service import InventoryService
+from app.services.stock_alert_service import StockChange
 from app.utils.dependencies import get_optional_current_user
 
 router = APIRouter(prefix="/public/orders", tags=["Public Orders"])
 
 
+@router.post("/quote", response_model=OrderQuoteResponse)
+async def quote_order(
+    quote_data: OrderQuoteRequest,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Cotizar el carrito: subtotal, impuestos, envío y total.
+    
+    - Solo lectura (réplica, sin transacción): una consulta para los precios;
+      impuestos y tarifas salen de memoria
+    - Los montos coinciden con los que calcula create_order
+    """
+    quantities = {}
+    for item in quote_data.items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    
+    result = await db.execute(
+        select(Product.id, Product.price).where(
+            Product.id.in_(quantities),
+            Product.is_active == True
+        )
+    )
+    prices = result.all()
+    
+    if len(prices) != len(quantities):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uno o más productos no están disponibles"
+        )
+    
+    subtotal = sum((Decimal(str(price)) * quantities[product_id] for product_id, price in prices), Decimal("0.00"))
+    quote = PricingService.quote(
+        await settings_cache.get(db), settings_cache.shipping_rates, subtotal, quote_data.city, quote_data.district
+    )
+    
+    return OrderQuoteResponse(
+        **quote._asdict(),
+        amount_to_free_shipping=(
+            max(quote.free_shipping_threshold - quote.subtotal, Decimal("0.00"))
+            if quote.free_shipping_threshold is not None else None
+        )
+    )
+
+
 @router.post("", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: OrderCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
 ):
     """
     Crear un nuevo pedido desde el carrito.
@@ -27,20 +80,35 @@ async def create_order(
     - Crea el pedido y los items
     - Actualiza el stock de los productos
     - Retorna el pedido creado con order_number
+    - Con header Idempotency-Key, los reintentos retornan el pedido original
     """
     
     # Si no hay usuario autenticado, usar usuario predeterminado (ID 1)
     user_id = current_user.id if current_user else 1
     
+    # Reintento de un pedido ya creado: retornar la respuesta original
+    if idempotency_key:
+        fingerprint = IdempotencyService.fingerprint(user_id, order_data.model_dump(mode="json"))
+        replay = await IdempotencyService.lookup(db, "create_order", idempotency_key, fingerprint)
+        if replay:
+            return replay
+    
     # Validar que todos los productos existan y tengan stock
+    # (bloqueados hasta el commit: el stock validado es el que se descuenta)
     product_ids = [item.product_id for item in order_data.items]
     result = await db.execute(
-        select(Product).where(
+        select(
+            Product.id, Product.name, Product.price, Product.stock, Product.low_stock_threshold,
+            db_now().label("now")
+        )
+        .where(
             Product.id.in_(product_ids),
             Product.is_active == True
         )
+        .order_by(Product.id)
+        .with_for_update()
     )
-    products = result.scalars().all()
+    products = result.all()
     
     if len(products) != len(product_ids):
         raise HTTPException(
@@ -83,76 +151,97 @@ async def create_order(
             "subtotal": item_subtotal
         })
     
-    # Calcular total (por ahora sin impuestos ni costos de envío)
-    tax = Decimal("0.00")
-    shipping_cost = Decimal("0.00")
-    total = subtotal + tax + shipping_cost
+    # Impuestos y envío según settings y tarifas por zona (en memoria)
+    quote = PricingService.quote(
+        await settings_cache.get(db), settings_cache.shipping_rates, subtotal, order_data.city, order_data.district
+    )
     
     # Generar número de pedido único
     import time
     import random
     timestamp = int(time.time())
-    random_num = random.randint(1000, 9999)
+    random_num = random.randint(100000, 999999)
     order_number = f"ORD-{timestamp}-{random_num}"
     
-    # Crear el pedido
-    new_order = Order(
-        order_number=order_number,
-        user_id=user_id,
-        shipping_full_name=order_data.customer_name,
-        shipping_phone=order_data.customer_phone,
-        shipping_address=order_data.shipping_address,
-        shipping_district=order_data.district,
-        shipping_city=order_data.city,
-        shipping_reference=order_data.reference,
-        subtotal=subtotal,
-        tax=tax,
-        shipping_cost=shipping_cost,
-        total=total,
-        status="PENDING_PAYMENT",
-        payment_method=order_data.payment_method if hasattr(order_data, 'payment_method') else None,
-        notes=order_data.notes
-    )
-    
-    db.add(new_order)
-    await db.flush()  # Para obtener el ID del pedido
+    # Fecha de la base (leída con los productos) como valor literal: mismo reloj
+    # que el vencimiento y las fechas de estado, y la respuesta no relee el pedido
+    now = products[0].now.replace(microsecond=0)
+    order_values = {
+        "order_number": order_number,
+        "user_id": user_id,
+        "shipping_full_name": order_data.customer_name,
+        "shipping_phone": order_data.customer_phone,
+        "shipping_address": order_data.shipping_address,
+        "shipping_district": order_data.district,
+        "shipping_city": order_data.city,
+        "shipping_reference": order_data.reference,
+        "subtotal": subtotal,
+        "tax": quote.tax,
+        "shipping_cost": quote.shipping_cost,
+        "total": quote.total,
+        "status": OrderStatus.PENDING_PAYMENT.value,
+        "payment_method": order_data.payment_method,
+        "notes": order_data.notes,
+        "created_at": now,
+        "updated_at": now,
+    }
     
-    # Crear los items del pedido y actualizar stock
-    for item_data in order_items_data:
-        order_item = OrderItem(
-            order_id=new_order.id,
-            **item_data
+    # Guardar: INSERT del pedido, un INSERT multi-fila de items, un UPDATE de stock
+    try:
+        result = await db.execute(insert(Order).values(order_values))
+        order_id = result.inserted_primary_key[0]
+        
+        await db.execute(insert(OrderItem), [
+            {"order_id": order_id, **item_data} for item_data in order_items_data
+        ])
+        
+        quantities = {item_data["product_id"]: item_data["quantity"] for item_data in order_items_data}
+        quantity = case(quantities, value=Product.id)
+        updated = await db.execute(
+            update(Product)
+            .where(Product.id.in_(quantities), Product.stock >= quantity)
+            .values(stock=Product.stock - quantity)
+            .execution_options(synchronize_session=False)
         )
-        db.add(order_item)
+        if updated.rowcount != len(quantities):
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="El stock cambió durante el pedido, reintente"
+            )
+        
+        await InventoryService.record(db, [
+            StockChange(product.id, product.stock, product.stock - quantities[product.id], product.low_stock_threshold)
+            for product in products
+        ], MovementReason.ORDER, reference_id=order_id, user_id=user_id)
+        
+        response = OrderResponse(id=order_id, **order_values)
+        
+        # La key se guarda en la misma transacción que el pedido
+        if idempotency_key:
+            body = IdempotencyService.store(
+                db, "create_order", idempotency_key, fingerprint, status.HTTP_201_CREATED, response
+            )
         
-        # Actualizar stock del producto
-        product = products_dict[item_data["product_id"]]
-        product.stock -= item_data["quantity"]
-    
-    # Guardar todos los cambios
-    try:
         await db.commit()
-        await db.refresh(new_order)
+        
+        if idempotency_key:
+            IdempotencyService.remember("create_order", idempotency_key, fingerprint, status.HTTP_201_CREATED, body)
         
         # Retornar el pedido creado
-        return OrderResponse(
-            id=new_order.id,
-            order_number=new_order.order_number,
-            user_id=new_order.user_id,
-            shipping_full_name=new_order.shipping_full_name,
-            shipping_phone=new_order.shipping_phone,
-            shipping_address=new_order.shipping_address,
-            shipping_district=new_order.shipping_district,
-            shipping_city=new_order.shipping_city,
-            shipping_reference=new_order.shipping_reference,
-            subtotal=new_order.subtotal,
-            tax=new_order.tax,
-            shipping_cost=new_order.shipping_cost,
-            total=new_order.total,
-            status=new_order.status,
-            notes=new_order.notes,
-            created_at=new_order.created_at,
-            updated_at=new_order.updated_at
+        return response
+    except HTTPException:
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        # Reintento concurrente con la misma key: el otro request ya creó el pedido
+        if idempotency_key:
+            replay = await IdempotencyService.lookup(db, "create_order", idempotency_key, fingerprint)
+            if replay:
+                return replay
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al crear el pedido: {str(e)}"
         )
     except Exception as e:
         await db.rollback()
@@ -160,4 +249,3 @@ async def create_order(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al crear el pedido: {str(e)}"
         )
-
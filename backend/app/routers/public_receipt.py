@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from pathlib import Path
+from typing import Optional
 import uuid
 
 from app.database import get_db
-from app.models.order import Order
+from app.models.order import Order, OrderStatus
+from app.services.idempotency_service import IdempotencyService
+from app.services.order_service import OrderService, can_transition
 from app.utils.dependencies import get_optional_current_user
 
 router = APIRouter(prefix="/public/orders", tags=["Public Orders - Receipt"])
@@ -19,11 +23,13 @@ async def upload_receipt(
     order_id: int,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-current_user = Depends(get_optional_current_user)
+current_user = Depends(get_optional_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
 ):
     """
     Subir comprobante de pago para un pedido.
     El pedido debe estar en estado PENDING_PAYMENT.
+    Con header Idempotency-Key, los reintentos no vuelven a escribir el archivo.
     """
     
     # Validar tipo de archivo
@@ -34,8 +40,18 @@ current_user = Depends(get_optional_current_user)
             detail="Solo se permiten imágenes (JPG, PNG, WEBP)"
         )
     
-    # Buscar el pedido
-    stmt = select(Order).where(Order.id == order_id)
+    content = await file.read()
+    
+    # Reintento de una subida ya procesada: retornar la respuesta original
+    if idempotency_key:
+        fingerprint = IdempotencyService.fingerprint(order_id, file.filename, content)
+        replay = await IdempotencyService.lookup(db, "upload_receipt", idempotency_key, fingerprint)
+        if replay:
+            return replay
+    
+    # Buscar el pedido, bloqueado hasta el commit: una cancelación (admin o
+    # vencimiento) no puede intercalarse entre la validación y el cambio de estado
+    stmt = select(Order).where(Order.id == order_id).with_for_update()
     result = await db.execute(stmt)
     order = result.scalar_one_or_none()
     
@@ -45,25 +61,51 @@ current_user = Depends(get_optional_current_user)
             detail="Pedido no encontrado"
         )
     
+    if order.status != OrderStatus.WAITING_CONTACT and not can_transition(order.status, OrderStatus.WAITING_CONTACT):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No se puede subir el comprobante de un pedido en estado {order.status.value}"
+        )
+    
     # Generar nombre único para el archivo
     ext = Path(file.filename).suffix.lower()
     filename = f"{order.order_number}_{uuid.uuid4()}{ext}"
     file_path = UPLOAD_DIR / filename
     
     # Guardar archivo
-    content = await file.read()
     with open(file_path, 'wb') as f:
         f.write(content)
     
     # Actualizar pedido
     order.receipt_url = f"/uploads/receipts/{filename}"
-    order.status = "WAITING_CONTACT"  # Cambiar estado a espera de contacto
-    
-    await db.commit()
-    await db.refresh(order)
+    if order.status != OrderStatus.WAITING_CONTACT:
+        # Cambiar estado a espera de contacto (misma máquina de estados que el admin)
+        await OrderService.transition(db, [order.id], OrderStatus.WAITING_CONTACT)
     
-    return {
+    response = {
         "message": "Comprobante subido exitosamente",
         "receipt_url": order.receipt_url,
-        "order_status": order.status
+        "order_status": order.status.value
     }
+    
+    if idempotency_key:
+        body = IdempotencyService.store(
+            db, "upload_receipt", idempotency_key, fingerprint, status.HTTP_200_OK, response
+        )
+    
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        file_path.unlink(missing_ok=True)
+        # Reintento concurrente con la misma key: retornar la respuesta del otro request
+        if idempotency_key:
+            replay = await IdempotencyService.lookup(db, "upload_receipt", idempotency_key, fingerprint)
+            if replay:
+                return replay
+        raise
+    
+    if idempotency_key:
+        IdempotencyService.remember("upload_receipt", idempotency_key, fingerprint, status.HTTP_200_OK, body)
+    
+    return response
@@ -49,6 +49,12 @@ class OrderCreate(BaseModel):
         from_attributes = True
 
 
+class OrderQuoteRequest(BaseModel):
+    items: List[OrderItemCreate] = Field(min_length=1)
+    district: str = Field(min_length=1, max_length=100)
+    city: str = Field(min_length=1, max_length=100)
+
+
 class OrderStatusUpdate(BaseModel):
     status: OrderStatus
     notes: Optional[str] = None
@@ -57,6 +63,11 @@ class OrderStatusUpdate(BaseModel):
         from_attributes = True
 
 
+class OrderBulkStatusUpdate(BaseModel):
+    order_ids: List[int] = Field(min_length=1, max_length=500)
+    status: OrderStatus
+
+
 # ==================== RESPONSE SCHEMAS ====================
 
 class OrderItemResponse(BaseModel):
@@ -100,11 +111,26 @@ class OrderResponse(BaseModel):
     # Fechas
     created_at: datetime
     updated_at: datetime
+    waiting_contact_at: Optional[datetime] = None
+    paid_at: Optional[datetime] = None
+    shipped_at: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
+    cancelled_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
 
 
+class OrderQuoteResponse(BaseModel):
+    subtotal: Decimal
+    tax: Decimal
+    shipping_cost: Decimal
+    total: Decimal
+    free_shipping_threshold: Optional[Decimal] = None
+    amount_to_free_shipping: Optional[Decimal] = None  # Falta para el envío gratis
+    zone: str  # Tarifa aplicada: district, city o default
+
+
 class OrderListResponse(BaseModel):
     id: int
     order_number: str
@@ -115,3 +141,17 @@ class OrderListResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class OrderBulkStatusResult(BaseModel):
+    order_id: int
+    status: str  # updated, unchanged, error
+    from_status: Optional[str] = None
+    restocked_units: Optional[int] = None  # Unidades devueltas al stock al cancelar
+    error: Optional[str] = None
+
+
+class OrderBulkStatusResponse(BaseModel):
+    updated: int
+    failed: int
+    results: List[OrderBulkStatusResult]
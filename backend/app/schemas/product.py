@@ -26,6 +26,7 @@ class ProductBase(BaseModel):
     category_id: int = Field(..., gt=0)
     price: Decimal = Field(..., gt=0)
     stock: int = Field(..., ge=0)
+    low_stock_threshold: Optional[int] = Field(None, ge=0, description="Umbral de alerta de stock bajo (None = default global)")
     is_active: bool = True
     
     @field_validator('price')
@@ -44,6 +45,7 @@ class ProductUpdate(BaseModel):
     category_id: Optional[int] = Field(None, gt=0)
     price: Optional[Decimal] = Field(None, gt=0)
     stock: Optional[int] = Field(None, ge=0)
+    low_stock_threshold: Optional[int] = Field(None, ge=0)
     is_active: Optional[bool] = None
 
 class ProductResponse(BaseModel):
@@ -55,6 +57,7 @@ class ProductResponse(BaseModel):
     category: Optional[CategoryBase] = None # Added field
     price: Decimal
     stock: int
+    low_stock_threshold: Optional[int] = None
     is_active: bool
     created_at: datetime
     updated_at: datetime
@@ -77,9 +80,34 @@ class ProductListItem(BaseModel):
     class Config:
         from_attributes = True
 
+class CategoryFacet(BaseModel):
+    category_id: int
+    name: str
+    count: int
+
+class PriceBucketFacet(BaseModel):
+    min: Decimal
+    max: Optional[Decimal] = None  # None = sin límite superior
+    count: int
+
+class ProductFacets(BaseModel):
+    categories: List[CategoryFacet]
+    price_buckets: List[PriceBucketFacet]
+    in_stock: int
+    out_of_stock: int
+
 class ProductListResponse(BaseModel):
     items: List[ProductListItem]
     total: int
     page: int
     pages: int
     limit: int
+    facets: Optional[ProductFacets] = None
+
+class ProductFeedResponse(BaseModel):
+    feed: str
+    category_id: Optional[int] = None
+    items: List[ProductListItem]
+    page: int
+    limit: int
+    has_more: bool
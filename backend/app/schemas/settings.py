@@ -1,15 +1,18 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
+from decimal import Decimal
 from datetime import datetime
 
 class SettingsBase(BaseModel):
     email_notifications: bool = True
     low_stock_alerts: bool = True
     auto_confirmations: bool = False
+    pending_payment_ttl_minutes: int = Field(default=1440, ge=0)  # 0 = los pedidos sin pago no vencen
     
     # New fields
     shipping_base_cost: float = 0.0
     free_shipping_threshold: float = 0.0
+    tax_rate: float = Field(default=0.0, ge=0, le=1)
     business_hours: Optional[str] = None
     social_facebook: Optional[str] = None
     social_instagram: Optional[str] = None
@@ -24,3 +27,12 @@ class SettingsResponse(SettingsBase):
 
     class Config:
         from_attributes = True
+
+class ShippingRateItem(BaseModel):
+    city: str = Field(min_length=1, max_length=100)
+    district: Optional[str] = Field(default=None, max_length=100)  # None = resto de la ciudad
+    cost: Decimal = Field(ge=0)
+    free_shipping_threshold: Optional[Decimal] = Field(default=None, ge=0)
+
+    class Config:
+        from_attributes = True
@@ -1,11 +1,35 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 class StockAdjustmentRequest(BaseModel):
     adjustment: int = Field(..., description="Cantidad a sumar (positivo) o restar (negativo)")
     reason: str = Field(..., min_length=3, description="Razón del ajuste de stock")
 
+class StockBatchLine(BaseModel):
+    product_id: int = Field(..., gt=0)
+    adjustment: int = Field(..., description="Cantidad a sumar (positivo) o restar (negativo)")
+    reason: Optional[str] = Field(None, min_length=3, description="Razón del ajuste (por defecto, la del lote)")
+
+class StockBatchRequest(BaseModel):
+    items: List[StockBatchLine] = Field(..., min_length=1)
+    reason: str = Field(..., min_length=3, description="Razón por defecto para las líneas sin razón propia")
+    atomic: bool = Field(False, description="Si alguna línea falla, no aplicar ninguna")
+
+class StockBatchLineResult(BaseModel):
+    line: int
+    product_id: Optional[int] = None
+    adjustment: Optional[int] = None
+    status: str  # applied, error, skipped
+    old_stock: Optional[int] = None
+    new_stock: Optional[int] = None
+    error: Optional[str] = None
+
+class StockBatchResponse(BaseModel):
+    applied: int
+    failed: int
+    results: List[StockBatchLineResult]
+
 class StockHistoryItem(BaseModel):
     id: int
     product_name: str
@@ -19,3 +43,19 @@ class StockHistoryItem(BaseModel):
 
     class Config:
         from_attributes = True
+
+class StockAlertItem(BaseModel):
+    id: int
+    product_id: int
+    product_name: str
+    level: str
+    stock: int
+    current_stock: int
+    threshold: int
+    created_at: datetime
+    acknowledged_at: Optional[datetime] = None
+    resolved_at: Optional[datetime] = None
+
+class StockHistoryResponse(BaseModel):
+    items: List[StockHistoryItem]
+    next_cursor: Optional[str] = None  # None = no hay más páginas
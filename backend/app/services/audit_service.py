@@ -0,0 +1,314 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, event, text, and_, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from datetime import date, datetime
+from dotenv import load_dotenv
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+import asyncio
+import gzip
+import logging
+import os
+import re
+
+import orjson
+
+from app.database import async_session_maker
+from app.models.audit_log import AuditLog
+
+load_dotenv()
+
+logger = logging.getLogger("app.audit")
+
+AUDIT_ASYNC_WRITES = os.getenv("AUDIT_ASYNC_WRITES", "true").lower() == "true"
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 500))
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", 1))
+AUDIT_BUFFER_MAX = int(os.getenv("AUDIT_BUFFER_MAX", 50000))
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", 12))
+AUDIT_ARCHIVE_DIR = Path(os.getenv("AUDIT_ARCHIVE_DIR", "archives/audit"))
+
+_MONTHLY_PARTITION = re.compile(r"^p(\d{4})(\d{2})$")
+
+
+class AuditWriter:
+    """
+    Buffer en memoria de registros de auditoría, escritos en lotes
+    (un INSERT executemany por lote) cada AUDIT_FLUSH_SECONDS o al juntar
+    AUDIT_BATCH_SIZE filas, fuera de la transacción del request.
+    """
+
+    def __init__(self, batch_size: int = AUDIT_BATCH_SIZE, flush_seconds: float = AUDIT_FLUSH_SECONDS):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._buffer: List[dict] = []
+        self._event: Optional[asyncio.Event] = None
+        self._running = False
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def submit(self, rows: List[dict]) -> None:
+        free = AUDIT_BUFFER_MAX - len(self._buffer)
+        if len(rows) > free:
+            # La base no responde hace rato: se descartan en vez de agotar la memoria
+            self.dropped += len(rows) - max(free, 0)
+            logger.error("buffer de auditoría lleno: %s registros descartados", len(rows) - max(free, 0))
+            rows = rows[:max(free, 0)]
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self.batch_size and self._event is not None:
+            self._event.set()
+
+    async def flush(self) -> None:
+        while self._buffer:
+            batch = self._buffer[:self.batch_size]
+            del self._buffer[:self.batch_size]
+            try:
+                async with async_session_maker() as db:
+                    await db.execute(insert(AuditLog), batch)
+                    await db.commit()
+            except Exception:
+                # Se reintenta en el próximo ciclo, conservando el orden
+                self._buffer[:0] = batch
+                self.failed_flushes += 1
+                raise
+            self.written += len(batch)
+
+    async def run(self) -> None:
+        self._running = True
+        self._event = asyncio.Event()
+        while self._running:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._event.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Error escribiendo auditoría (%s pendientes)", len(self._buffer))
+
+    async def stop(self) -> None:
+        """Dejar de aceptar registros en el buffer y escribir los pendientes"""
+        self._running = False
+        if self._event is not None:
+            self._event.set()
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "running": self._running,
+            "pending": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+audit_writer = AuditWriter()
+
+# Registros de la transacción en curso, en session.info: se entregan al writer
+# con el commit y se descartan con el rollback
+_PENDING_AUDIT = "audit_rows"
+
+
+@event.listens_for(Session, "after_commit")
+def _submit_pending(session):
+    rows = session.info.pop(_PENDING_AUDIT, None)
+    if rows:
+        audit_writer.submit(rows)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_AUDIT, None)
+
+
+class AuditService:
+    """
+    Registro de auditoría. Los valores se guardan como JSON nativo (dicts, sin
+    json.dumps) y se leen con rutas JSON tipadas en SQL (stock_fields).
+    """
+
+    @staticmethod
+    def entry(
+        user_id: Optional[int],
+        action_type: str,
+        entity_type: str,
+        entity_id: Optional[int],
+        old_value: Optional[dict] = None,
+        new_value: Optional[dict] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> dict:
+        return {
+            "user_id": user_id,
+            "action_type": action_type,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "old_value": old_value,
+            "new_value": new_value,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "created_at": datetime.now(),
+        }
+
+    @staticmethod
+    def stock_adjustment(user_id: int, product_id: int, old_stock: int, new_stock: int, reason: str) -> dict:
+        return AuditService.entry(
+            user_id, "ADJUST_STOCK", "product", product_id,
+            old_value={"stock": old_stock},
+            new_value={"stock": new_stock, "difference": new_stock - old_stock, "reason": reason}
+        )
+
+    @staticmethod
+    async def log(db: AsyncSession, rows: List[dict]) -> None:
+        """
+        Registrar entradas de auditoría de la transacción de `db`.
+        Con el writer activo se encolan tras el commit (si hay rollback no se
+        registran); si no (scripts, AUDIT_ASYNC_WRITES=false), se insertan en la
+        misma transacción con un executemany.
+        """
+        if not rows:
+            return
+        if audit_writer.running:
+            session = db.sync_session
+            if not session.in_transaction():
+                session.begin()  # Que el rollback de esta transacción los descarte
+            session.info.setdefault(_PENDING_AUDIT, []).extend(rows)
+        else:
+            await db.execute(insert(AuditLog), rows)
+
+    @staticmethod
+    def stock_fields() -> tuple:
+        """Columnas tipadas de un ajuste de stock: old_stock, new_stock, difference, reason"""
+        return (
+            AuditLog.old_value["stock"].as_integer().label("old_stock"),
+            AuditLog.new_value["stock"].as_integer().label("new_stock"),
+            AuditLog.new_value["difference"].as_integer().label("difference"),
+            AuditLog.new_value["reason"].as_string().label("reason"),
+        )
+
+    @staticmethod
+    def history_query(
+        *columns,
+        action_type: str,
+        entity_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 50
+    ) -> Select:
+        """
+        Página de auditoría ordenada por (created_at, id) descendente.
+        after: posición (created_at, id) de la última fila de la página anterior.
+        Con action_type (+ entity_id) se recorre idx_audit_action_entity_created /
+        idx_audit_action_created, sin ordenar la tabla.
+        """
+        query = select(*columns).where(AuditLog.action_type == action_type)
+        if entity_id is not None:
+            query = query.where(AuditLog.entity_id == entity_id)
+        if user_id is not None:
+            query = query.where(AuditLog.user_id == user_id)
+        if date_from is not None:
+            query = query.where(AuditLog.created_at >= date_from)
+        if date_to is not None:
+            query = query.where(AuditLog.created_at < date_to)
+        if after is not None:
+            created_at, row_id = after
+            query = query.where(or_(
+                AuditLog.created_at < created_at,
+                and_(AuditLog.created_at == created_at, AuditLog.id < row_id)
+            ))
+        return query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(limit)
+
+    # --- Particiones mensuales (solo MySQL, ver migrations/partition_audit_logs.sql) ---
+
+    @staticmethod
+    async def _partitions(db: AsyncSession) -> List[Any]:
+        result = await db.execute(text(
+            "SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS bound "
+            "FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'audit_logs' AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION"
+        ))
+        return result.all()
+
+    @staticmethod
+    async def ensure_partitions(db: AsyncSession, months_ahead: int = 3) -> List[str]:
+        """Crear las particiones del mes actual y los `months_ahead` siguientes (divide pmax)"""
+        if db.bind.dialect.name != "mysql":
+            return []
+        partitions = await AuditService._partitions(db)
+        if not partitions:
+            logger.warning("audit_logs no está particionada: aplicar migrations/partition_audit_logs.sql")
+            return []
+
+        existing = {row.name for row in partitions}
+        last = max((date(int(m.group(1)), int(m.group(2)), 1)
+                    for m in map(_MONTHLY_PARTITION.match, existing) if m), default=None)
+        month = _month_start(date.today())
+        created = []
+        for _ in range(months_ahead + 1):
+            following = _add_months(month, 1)
+            name = f"p{month:%Y%m}"
+            if name not in existing and (last is None or month > last):
+                await db.execute(text(
+                    f"ALTER TABLE audit_logs REORGANIZE PARTITION pmax INTO ("
+                    f"PARTITION {name} VALUES LESS THAN (UNIX_TIMESTAMP('{following:%Y-%m-%d} 00:00:00')), "
+                    f"PARTITION pmax VALUES LESS THAN MAXVALUE)"
+                ))
+                created.append(name)
+            month = following
+        return created
+
+    @staticmethod
+    async def archive_expired(
+        db: AsyncSession,
+        retention_months: int = AUDIT_RETENTION_MONTHS,
+        archive_dir: Path = AUDIT_ARCHIVE_DIR
+    ) -> List[dict]:
+        """
+        Archivar y eliminar las particiones anteriores a la retención: cada
+        partición se exporta a archive_dir/audit_logs_<partición>.jsonl.gz y luego
+        se hace DROP PARTITION (instantáneo, sin DELETE fila por fila).
+        """
+        if db.bind.dialect.name != "mysql":
+            return []
+        cutoff = _add_months(_month_start(date.today()), -retention_months)
+        result = await db.execute(text(f"SELECT UNIX_TIMESTAMP('{cutoff:%Y-%m-%d} 00:00:00')"))
+        cutoff_ts = int(result.scalar_one())
+
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        archived = []
+        for partition in await AuditService._partitions(db):
+            if partition.name == "pmax" or int(partition.bound) > cutoff_ts:
+                continue
+            path = archive_dir / f"audit_logs_{partition.name}.jsonl.gz"
+            tmp_path = path.with_suffix(".tmp")
+            rows = 0
+            stream = await db.stream(text(f"SELECT * FROM audit_logs PARTITION ({partition.name}) ORDER BY id"))
+            with gzip.open(tmp_path, "wb") as archive:
+                async for chunk in stream.partitions(1000):
+                    for row in chunk:
+                        archive.write(orjson.dumps(dict(row._mapping)) + b"\n")
+                    rows += len(chunk)
+            tmp_path.replace(path)
+            await db.execute(text(f"ALTER TABLE audit_logs DROP PARTITION {partition.name}"))
+            archived.append({"partition": partition.name, "rows": rows, "path": str(path)})
+        return archived
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
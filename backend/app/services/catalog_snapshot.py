@@ -0,0 +1,266 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, DateTime
+from sqlalchemy.orm import selectinload
+from dotenv import load_dotenv
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import re
+
+import orjson
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional; sin él el catálogo se consulta siempre en SQL
+    np = None
+
+from app.database import replica_session_maker
+from app.models.category import Category
+from app.models.product import Product, ProductImage
+from app.utils.helpers import fold
+from app.utils.http_cache import catalog_version
+from app.utils.responses import dumps
+from app.utils.serializers import product_list_item_with_thumbnail
+
+load_dotenv()
+
+logger = logging.getLogger("app.catalog_snapshot")
+
+CATALOG_SNAPSHOT_ENABLED = os.getenv("CATALOG_SNAPSHOT_ENABLED", "false").lower() == "true"
+CATALOG_SNAPSHOT_REFRESH_SECONDS = float(os.getenv("CATALOG_SNAPSHOT_REFRESH_SECONDS", 5))
+# Margen hacia atrás al buscar productos modificados: cubre transacciones que
+# hicieron commit después del refresco anterior con un updated_at anterior a él
+CATALOG_SNAPSHOT_OVERLAP_SECONDS = float(os.getenv("CATALOG_SNAPSHOT_OVERLAP_SECONDS", 60))
+
+SORTS = ("newest", "price_asc", "price_desc", "name")
+
+# Tablas cuyo sondeo define la versión del snapshot (el mismo que usa el ETag del listado).
+# catalog_version devuelve (cambios, bajas) por tabla: version[0] son los cambios de productos
+VERSION_TABLES = (Product, Category, ProductImage)
+
+
+class CatalogSnapshot:
+    """
+    Copia en memoria, en arrays, de los productos activos para resolver
+    filtros, orden y paginación de /public/products sin ir a MySQL.
+
+    - Columnas numpy (id, categoría, precio, stock, activo, created_at) para
+      máscaras vectorizadas; los items ya serializados se guardan como
+      orjson.Fragment y se insertan tal cual en la respuesta.
+    - Los órdenes (newest, price_asc, price_desc, name) son permutaciones
+      precalculadas: una página es filtrar la permutación con la máscara.
+    - La versión es el mismo sondeo del ETag: si no coincide con la del
+      request, el endpoint usa SQL (nunca se sirve un snapshot viejo).
+    - refresh() aplica incrementalmente los productos modificados desde el
+      refresco anterior (updated_at según el reloj de la base, con margen de
+      CATALOG_SNAPSHOT_OVERLAP_SECONDS); cambios en categorías, imágenes o
+      bajas físicas reconstruyen todo.
+    """
+
+    def __init__(self):
+        self.version: Optional[tuple] = None
+        self._synced_at: Optional[datetime] = None  # NOW() de la base al leer self.version
+        self._index: Dict[int, int] = {}
+        self.ids = self.category_ids = self.prices = self.stock = self.active = self.created = None
+        self.names: List[str] = []
+        self.search_text: List[str] = []
+        self.rows: List[Any] = []
+        self._orders: Dict[str, Any] = {}
+        self._haystack: Optional[str] = None  # search_text unido, se arma en la primera búsqueda
+        self._starts = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def available(self) -> bool:
+        return CATALOG_SNAPSHOT_ENABLED and np is not None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def is_fresh(self, version: tuple) -> bool:
+        return self.available and self.version is not None and self.version == tuple(version)
+
+    # --- Construcción ---------------------------------------------------
+
+    @staticmethod
+    def _row(product) -> tuple:
+        return (
+            product.id,
+            product.category_id,
+            float(product.price),
+            product.stock,
+            bool(product.is_active),
+            product.created_at.timestamp(),
+            fold(product.name),
+            fold(product.name) + "\n" + fold(product.description),
+            orjson.Fragment(dumps(product_list_item_with_thumbnail(product))),
+        )
+
+    def load(self, products: list, version: tuple) -> None:
+        """Reconstrucción completa a partir de productos (con images y category cargados)"""
+        rows = [self._row(p) for p in products if p.is_active]
+        self.ids = np.array([r[0] for r in rows], dtype=np.int64)
+        self.category_ids = np.array([r[1] for r in rows], dtype=np.int64)
+        self.prices = np.array([r[2] for r in rows], dtype=np.float64)
+        self.stock = np.array([r[3] for r in rows], dtype=np.int64)
+        self.active = np.array([r[4] for r in rows], dtype=bool)
+        self.created = np.array([r[5] for r in rows], dtype=np.float64)
+        self.names = [r[6] for r in rows]
+        self.search_text = [r[7] for r in rows]
+        self.rows = [r[8] for r in rows]
+        self._index = {int(product_id): i for i, product_id in enumerate(self.ids)}
+        self._haystack = None
+        self._sort()
+        self.version = tuple(version)
+
+    def apply(self, products: list, version: tuple) -> None:
+        """Actualización incremental: altas, cambios y desactivaciones"""
+        resort = False
+        appended = []
+        for product in products:
+            i = self._index.get(product.id)
+            if i is None:
+                if product.is_active:
+                    appended.append(self._row(product))
+                continue
+            row = self._row(product)
+            resort = resort or (
+                self.prices[i] != row[2] or self.created[i] != row[5] or self.names[i] != row[6]
+            )
+            self.category_ids[i] = row[1]
+            self.prices[i] = row[2]
+            self.stock[i] = row[3]
+            self.active[i] = row[4]
+            self.created[i] = row[5]
+            self.names[i] = row[6]
+            self.search_text[i] = row[7]
+            self.rows[i] = row[8]
+
+        if appended:
+            start = len(self.rows)
+            self.ids = np.concatenate([self.ids, np.array([r[0] for r in appended], dtype=np.int64)])
+            self.category_ids = np.concatenate([self.category_ids, np.array([r[1] for r in appended], dtype=np.int64)])
+            self.prices = np.concatenate([self.prices, np.array([r[2] for r in appended], dtype=np.float64)])
+            self.stock = np.concatenate([self.stock, np.array([r[3] for r in appended], dtype=np.int64)])
+            self.active = np.concatenate([self.active, np.array([r[4] for r in appended], dtype=bool)])
+            self.created = np.concatenate([self.created, np.array([r[5] for r in appended], dtype=np.float64)])
+            self.names.extend(r[6] for r in appended)
+            self.search_text.extend(r[7] for r in appended)
+            self.rows.extend(r[8] for r in appended)
+            for offset, row in enumerate(appended):
+                self._index[row[0]] = start + offset
+            resort = True
+
+        if products:
+            self._haystack = None
+        if resort:
+            self._sort()
+        self.version = tuple(version)
+
+    def _sort(self) -> None:
+        ids = self.ids
+        id_list = ids.tolist()
+        names = self.names
+        by_name = sorted(range(len(id_list)), key=lambda i: (names[i], id_list[i]))
+        self._orders = {
+            # lexsort: la última clave es la principal; id desempata
+            "newest": np.lexsort((-ids, -self.created)),
+            "price_asc": np.lexsort((ids, self.prices)),
+            "price_desc": np.lexsort((ids, -self.prices)),
+            "name": np.array(by_name, dtype=np.int64),
+        }
+
+    # --- Consulta -------------------------------------------------------
+
+    def _search_mask(self, needle: str):
+        """
+        Filas cuyo nombre o descripción contienen needle (como LIKE '%needle%').
+        Se busca en C sobre el texto de todas las filas unido y las posiciones
+        se convierten a filas con un solo searchsorted.
+        """
+        if self._haystack is None:
+            self._haystack = "\x00".join(self.search_text)
+            lengths = np.fromiter((len(t) + 1 for t in self.search_text), dtype=np.int64, count=len(self.search_text))
+            self._starts = np.cumsum(lengths) - lengths
+        positions = [match.start() for match in re.finditer(re.escape(needle), self._haystack)]
+        mask = np.zeros(len(self.rows), dtype=bool)
+        if positions:
+            mask[np.searchsorted(self._starts, positions, side="right") - 1] = True
+        return mask
+
+    def query(
+        self,
+        category_id: Optional[int],
+        search: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        sort_by: str,
+        limit: int,
+        offset: int
+    ) -> Tuple[List[Any], int]:
+        """(items de la página, total) con los mismos filtros que el listado SQL"""
+        mask = self.active & (self.stock > 0)
+        if category_id:
+            mask &= self.category_ids == category_id
+        if min_price is not None:
+            mask &= self.prices >= min_price
+        if max_price is not None:
+            mask &= self.prices <= max_price
+        if search:
+            mask &= self._search_mask(fold(search))
+
+        order = self._orders[sort_by]
+        matching = order[mask[order]]
+        page = matching[offset:offset + limit]
+        return [self.rows[i] for i in page], int(matching.size)
+
+    # --- Refresco -------------------------------------------------------
+
+    async def refresh(self, db: AsyncSession) -> str:
+        """Sincronizar con la base: 'unchanged', 'incremental' o 'full'"""
+        async with self._lock:
+            # La hora se lee antes que la versión: todo lo que esa versión
+            # incluye tiene un updated_at anterior (salvo el margen de solape)
+            synced_at = (await db.execute(select(func.now(type_=DateTime)))).scalar_one()
+            version = await catalog_version(db, *VERSION_TABLES)
+            if self.version == version:
+                self._synced_at = synced_at
+                return "unchanged"
+
+            query = select(Product).options(selectinload(Product.images), selectinload(Product.category))
+
+            # Solo cambiaron productos (sin bajas físicas): aplicar los modificados
+            incremental = (
+                self.version is not None
+                and self._synced_at is not None
+                and version[1:] == self.version[1:]
+            )
+            if incremental:
+                since = self._synced_at - timedelta(seconds=CATALOG_SNAPSHOT_OVERLAP_SECONDS)
+                result = await db.execute(query.where(Product.updated_at >= since))
+                self.apply(result.scalars().all(), version)
+                self._synced_at = synced_at
+                return "incremental"
+
+            result = await db.execute(query.where(Product.is_active == True))
+            self.load(result.scalars().all(), version)
+            self._synced_at = synced_at
+            return "full"
+
+    async def run(self, interval_seconds: float = CATALOG_SNAPSHOT_REFRESH_SECONDS) -> None:
+        """Tarea de fondo: carga inicial y refresco cada interval_seconds"""
+        while True:
+            try:
+                async with replica_session_maker() as session:
+                    outcome = await self.refresh(session)
+                if outcome != "unchanged":
+                    logger.info("snapshot del catálogo: %s (%s productos)", outcome, len(self))
+            except Exception:
+                self.version = None  # Forzar SQL y una recarga completa
+                logger.exception("Error refrescando el snapshot del catálogo")
+            await asyncio.sleep(interval_seconds)
+
+
+catalog_snapshot = CatalogSnapshot()
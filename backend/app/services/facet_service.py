@@ -0,0 +1,138 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case, literal, and_
+from collections import OrderedDict, defaultdict
+from decimal import Decimal
+from dotenv import load_dotenv
+from typing import Any, List, Optional
+import os
+
+from app.models.category import Category
+from app.models.product import Product
+
+load_dotenv()
+
+# Límites de los rangos de precio del histograma: [0, 50), [50, 100), ..., [500, ∞)
+PRICE_BUCKETS = [
+    Decimal(edge.strip())
+    for edge in os.getenv("FACET_PRICE_BUCKETS", "0,50,100,200,500").split(",")
+    if edge.strip()
+]
+FACET_CACHE_SIZE = int(os.getenv("FACET_CACHE_SIZE", 128))
+
+# LRU en memoria: (versión del catálogo, filtros) -> filas agrupadas
+_cache: "OrderedDict[tuple, List[tuple]]" = OrderedDict()
+
+
+def search_filter(search: str):
+    return Product.name.ilike(f"%{search}%") | Product.description.ilike(f"%{search}%")
+
+
+class FacetService:
+    """
+    Facetas del catálogo público (conteo por categoría, histograma de precios,
+    productos con y sin stock) en una sola consulta agrupada.
+
+    Cada faceta ignora su propio filtro: los conteos por categoría respetan el
+    rango de precio pero no category_id, y el histograma al revés. Las filas
+    agrupadas se cachean por versión del catálogo, así que se recalculan solo
+    cuando hay escrituras (o cambian los filtros).
+    """
+
+    @staticmethod
+    def _bucket_column():
+        whens = [
+            (Product.price < upper, index)
+            for index, upper in enumerate(PRICE_BUCKETS[1:])
+        ]
+        return case(*whens, else_=len(PRICE_BUCKETS) - 1) if whens else literal(0)
+
+    @staticmethod
+    async def _grouped_rows(
+        db: AsyncSession,
+        version: Any,
+        search: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float]
+    ) -> List[tuple]:
+        key = (version, search, min_price, max_price)
+        rows = _cache.get(key)
+        if rows is not None:
+            _cache.move_to_end(key)
+            return rows
+
+        price_conditions = []
+        if min_price is not None:
+            price_conditions.append(Product.price >= min_price)
+        if max_price is not None:
+            price_conditions.append(Product.price <= max_price)
+        price_ok = case((and_(*price_conditions), 1), else_=0) if price_conditions else literal(1)
+
+        bucket = FacetService._bucket_column().label("bucket")
+        in_stock = case((Product.stock > 0, 1), else_=0).label("in_stock")
+        price_ok = price_ok.label("price_ok")
+
+        query = (
+            select(Product.category_id, Category.name, bucket, in_stock, price_ok, func.count())
+            .join(Category, Product.category_id == Category.id)
+            .where(Product.is_active == True)
+            .group_by(Product.category_id, Category.name, bucket, in_stock, price_ok)
+        )
+        if search:
+            query = query.where(search_filter(search))
+
+        result = await db.execute(query)
+        rows = [tuple(row) for row in result.all()]
+
+        _cache[key] = rows
+        while len(_cache) > FACET_CACHE_SIZE:
+            _cache.popitem(last=False)
+        return rows
+
+    @staticmethod
+    async def compute(
+        db: AsyncSession,
+        version: Any,
+        category_id: Optional[int] = None,
+        search: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None
+    ) -> dict:
+        """Facetas para los filtros dados (forma de ProductFacets)"""
+        rows = await FacetService._grouped_rows(db, version, search, min_price, max_price)
+
+        category_counts = defaultdict(int)
+        category_names = {}
+        bucket_counts = [0] * len(PRICE_BUCKETS)
+        in_stock_total = 0
+        out_of_stock_total = 0
+
+        for row_category_id, name, bucket, in_stock, price_ok, count in rows:
+            category_match = not category_id or row_category_id == category_id
+            if not in_stock:
+                if price_ok and category_match:
+                    out_of_stock_total += count
+                continue
+            if price_ok:
+                category_counts[row_category_id] += count
+                category_names[row_category_id] = name
+                if category_match:
+                    in_stock_total += count
+            if category_match and bucket_counts:
+                bucket_counts[bucket] += count
+
+        return {
+            "categories": [
+                {"category_id": cid, "name": category_names[cid], "count": category_counts[cid]}
+                for cid in sorted(category_counts, key=lambda cid: (-category_counts[cid], category_names[cid]))
+            ],
+            "price_buckets": [
+                {
+                    "min": lower,
+                    "max": PRICE_BUCKETS[index + 1] if index + 1 < len(PRICE_BUCKETS) else None,
+                    "count": bucket_counts[index]
+                }
+                for index, lower in enumerate(PRICE_BUCKETS)
+            ],
+            "in_stock": in_stock_total,
+            "out_of_stock": out_of_stock_total,
+        }
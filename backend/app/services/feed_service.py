@@ -0,0 +1,251 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, func, desc
+from sqlalchemy.orm import selectinload
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from dotenv import load_dotenv
+from typing import Dict, List
+import asyncio
+import logging
+import os
+
+from app.database import async_session_maker
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.product import Product
+from app.models.product_feed import ProductFeed, ProductFeedRefresh
+from app.utils.http_cache import catalog_version
+
+load_dotenv()
+
+logger = logging.getLogger("app.feeds")
+
+FEEDS_MAX_ITEMS = int(os.getenv("FEEDS_MAX_ITEMS", 200))  # Posiciones guardadas por feed y categoría
+FEEDS_REFRESH_MINUTES = int(os.getenv("FEEDS_REFRESH_MINUTES", 0))  # 0 = solo por script/cron
+
+BESTSELLER_WINDOWS = {"bestsellers_7d": 7, "bestsellers_30d": 30}
+CATALOG_FEEDS = ("newest", "price_asc", "price_desc")
+FEEDS = tuple(BESTSELLER_WINDOWS) + CATALOG_FEEDS
+
+ALL_CATEGORIES = 0
+
+
+class FeedService:
+    """
+    Feeds rankeados del home (más vendidos 7/30 días, novedades, por precio),
+    globales y por categoría.
+
+    refresh_feeds() recalcula completo cada grupo cuyas fuentes cambiaron: los
+    más vendidos dependen de los pedidos (y del día, por la ventana móvil) y el
+    resto del catálogo. La firma del último cálculo se guarda en la base
+    (product_feed_refreshes), así que con varios workers recalcula uno solo.
+    get_page() lee una página por (feed, category_id, rank); activo y stock se
+    filtran al leer.
+    """
+
+    @staticmethod
+    async def _orders_signature(db: AsyncSession) -> str:
+        # Pedidos nuevos (MAX(id)) y cancelados (CANCELLED es final); el día mueve la ventana
+        cancelled = (
+            select(func.count()).select_from(Order)
+            .where(Order.status == OrderStatus.CANCELLED)
+            .scalar_subquery()
+        )
+        result = await db.execute(select(func.max(Order.id), cancelled))
+        return "|".join(str(part) for part in (date.today(), *result.one()))
+
+    @staticmethod
+    async def _catalog_signature(db: AsyncSession) -> str:
+        return "|".join(str(part) for part in await catalog_version(db, Product))
+
+    @staticmethod
+    async def _lock_refreshes(db: AsyncSession, groups: tuple) -> Dict[str, ProductFeedRefresh]:
+        """Filas de los grupos bloqueadas (FOR UPDATE): otro worker espera y luego ve la firma nueva"""
+        result = await db.execute(
+            select(ProductFeedRefresh)
+            .where(ProductFeedRefresh.group_name.in_(groups))
+            .order_by(ProductFeedRefresh.group_name)
+            .with_for_update()
+        )
+        refreshes = {refresh.group_name: refresh for refresh in result.scalars()}
+        for group in groups:
+            if group not in refreshes:
+                refreshes[group] = ProductFeedRefresh(group_name=group, signature="")
+                db.add(refreshes[group])
+        return refreshes
+
+    @staticmethod
+    def _ranked_rows(feed: str, ranked: list, now: datetime) -> List[dict]:
+        """
+        ranked: tuplas (product_id, category_id, score) ya ordenadas.
+        Genera las filas del feed global y del feed de cada categoría.
+        """
+        rows = []
+        positions: Dict[int, int] = defaultdict(int)
+        for product_id, category_id, score in ranked:
+            for key in (ALL_CATEGORIES, category_id):
+                if positions[key] < FEEDS_MAX_ITEMS:
+                    rows.append({
+                        "feed": feed,
+                        "category_id": key,
+                        "rank": positions[key],
+                        "product_id": product_id,
+                        "score": float(score),
+                        "computed_at": now,
+                    })
+                    positions[key] += 1
+        return rows
+
+    @staticmethod
+    async def _bestseller_rows(db: AsyncSession, now: datetime) -> List[dict]:
+        rows = []
+        for feed, days in BESTSELLER_WINDOWS.items():
+            units = func.sum(OrderItem.quantity)
+            result = await db.execute(
+                select(OrderItem.product_id, Product.category_id, units)
+                .join(Order, Order.id == OrderItem.order_id)
+                .join(Product, Product.id == OrderItem.product_id)
+                .where(
+                    Order.status != OrderStatus.CANCELLED,
+                    Order.created_at >= now - timedelta(days=days),
+                    Product.is_active == True
+                )
+                .group_by(OrderItem.product_id, Product.category_id)
+                .order_by(desc(units), OrderItem.product_id)
+            )
+            rows.extend(FeedService._ranked_rows(feed, result.all(), now))
+        return rows
+
+    @staticmethod
+    async def _catalog_rows(db: AsyncSession, now: datetime) -> List[dict]:
+        result = await db.execute(
+            select(Product.id, Product.category_id, Product.price, Product.created_at)
+            .where(Product.is_active == True)
+        )
+        products = result.all()
+
+        orderings = {
+            "newest": (sorted(products, key=lambda p: (p.created_at, p.id), reverse=True), lambda p: p.created_at.timestamp()),
+            "price_asc": (sorted(products, key=lambda p: (p.price, p.id)), lambda p: p.price),
+            "price_desc": (sorted(products, key=lambda p: (-p.price, p.id)), lambda p: p.price),
+        }
+        rows = []
+        for feed, (ranked, score) in orderings.items():
+            rows.extend(FeedService._ranked_rows(
+                feed, [(p.id, p.category_id, score(p)) for p in ranked], now
+            ))
+        return rows
+
+    @staticmethod
+    async def _replace(db: AsyncSession, feeds: tuple, rows: List[dict]) -> None:
+        await db.execute(delete(ProductFeed).where(ProductFeed.feed.in_(feeds)))
+        if rows:
+            await db.execute(insert(ProductFeed), rows)
+
+    @staticmethod
+    async def refresh_feeds(db: AsyncSession, force: bool = False) -> Dict[str, int]:
+        """
+        Recalcular los grupos de feeds cuyas fuentes cambiaron desde la firma
+        guardada en product_feed_refreshes (o todos con force=True).
+        Retorna las filas escritas por grupo. El commit lo hace quien llama.
+        """
+        now = datetime.now().replace(microsecond=0)
+        written: Dict[str, int] = {}
+        groups = (
+            ("bestsellers", FeedService._orders_signature, FeedService._bestseller_rows, tuple(BESTSELLER_WINDOWS)),
+            ("catalog", FeedService._catalog_signature, FeedService._catalog_rows, CATALOG_FEEDS),
+        )
+
+        # Primero el bloqueo y después las firmas, para leer lo que otro worker ya guardó
+        refreshes = await FeedService._lock_refreshes(db, tuple(group[0] for group in groups))
+        for group, signature_of, rows_of, feeds in groups:
+            refresh = refreshes[group]
+            signature = await signature_of(db)
+            if not force and refresh.signature == signature:
+                continue
+            rows = await rows_of(db, now)
+            await FeedService._replace(db, feeds, rows)
+            refresh.signature = signature
+            refresh.refreshed_at = now
+            written[group] = len(rows)
+
+        return written
+
+    @staticmethod
+    async def refresh_periodically(interval_minutes: int = FEEDS_REFRESH_MINUTES) -> None:
+        """Tarea de fondo: revisa los feeds cada interval_minutes"""
+        while True:
+            try:
+                async with async_session_maker() as session:
+                    written = await FeedService.refresh_feeds(session)
+                    await session.commit()
+                if written:
+                    logger.info("feeds recalculados: %s", written)
+            except Exception:
+                logger.exception("Error recalculando feeds")
+            await asyncio.sleep(interval_minutes * 60)
+
+    @staticmethod
+    def version_column(feed: str):
+        """Subconsulta escalar con la fecha del último cálculo del feed (para el ETag)"""
+        return (
+            select(func.max(ProductFeed.computed_at))
+            .where(ProductFeed.feed == feed)
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    async def get_page(
+        db: AsyncSession,
+        feed: str,
+        category_id: int,
+        limit: int,
+        offset: int,
+        materialized: bool = True
+    ) -> List[Product]:
+        """
+        Una página del feed (hasta limit + 1 productos, para saber si hay más).
+        Con materialized=False (feed aún no calculado) ordena en vivo.
+        """
+        query = (
+            select(Product)
+            .options(selectinload(Product.images), selectinload(Product.category))
+            .where(Product.is_active == True, Product.stock > 0)
+        )
+        if materialized:
+            query = (
+                query.join(ProductFeed, ProductFeed.product_id == Product.id)
+                .where(ProductFeed.feed == feed, ProductFeed.category_id == category_id)
+                .order_by(ProductFeed.rank)
+            )
+        else:
+            query = FeedService._live_order(query, feed)
+            if category_id != ALL_CATEGORIES:
+                query = query.where(Product.category_id == category_id)
+
+        result = await db.execute(query.limit(limit + 1).offset(offset))
+        return result.scalars().all()
+
+    @staticmethod
+    def _live_order(query, feed: str):
+        if feed == "newest":
+            return query.order_by(desc(Product.created_at), desc(Product.id))
+        if feed == "price_asc":
+            return query.order_by(Product.price.asc(), Product.id)
+        if feed == "price_desc":
+            return query.order_by(Product.price.desc(), Product.id)
+
+        units = func.sum(OrderItem.quantity).label("units")
+        sold = (
+            select(OrderItem.product_id, units)
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(
+                Order.status != OrderStatus.CANCELLED,
+                Order.created_at >= datetime.now() - timedelta(days=BESTSELLER_WINDOWS[feed])
+            )
+            .group_by(OrderItem.product_id)
+            .subquery()
+        )
+        return (
+            query.join(sold, sold.c.product_id == Product.id)
+            .order_by(desc(sold.c.units), Product.id)
+        )
@@ -0,0 +1,123 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from typing import Any, Optional
+import hashlib
+import json
+import os
+
+from app.models.idempotency_key import IdempotencyKey
+
+load_dotenv()
+
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", 24))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", 1024))
+
+# LRU en memoria: (scope, key) -> (fingerprint, status_code, body, created_at)
+_cache: "OrderedDict[tuple[str, str], tuple[str, int, Any, datetime]]" = OrderedDict()
+
+
+class IdempotencyService:
+    """
+    Soporte para el header Idempotency-Key.
+
+    La tabla idempotency_keys es la fuente de verdad (se escribe en la misma
+    transacción que el pedido/comprobante); el LRU en memoria evita la consulta
+    cuando el reintento llega al mismo worker.
+    """
+
+    @staticmethod
+    def fingerprint(*parts: Any) -> str:
+        """Hash sha256 estable de las partes del request"""
+        digest = hashlib.sha256()
+        for part in parts:
+            if isinstance(part, bytes):
+                digest.update(part)
+            else:
+                digest.update(json.dumps(jsonable_encoder(part), sort_keys=True, separators=(",", ":")).encode())
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    @staticmethod
+    def _remember(scope: str, key: str, fingerprint: str, status_code: int, body: Any, created_at: datetime) -> None:
+        _cache[(scope, key)] = (fingerprint, status_code, body, created_at)
+        _cache.move_to_end((scope, key))
+        while len(_cache) > IDEMPOTENCY_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    @staticmethod
+    def _replay(fingerprint: str, stored_fingerprint: str, status_code: int, body: Any) -> JSONResponse:
+        if stored_fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key ya fue usada con un request diferente"
+            )
+        return JSONResponse(
+            status_code=status_code,
+            content=body,
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    @staticmethod
+    async def lookup(db: AsyncSession, scope: str, key: str, fingerprint: str) -> Optional[JSONResponse]:
+        """
+        Retorna la respuesta original si la key ya fue procesada, o None.
+        Lanza 422 si la key se reutiliza con un request distinto.
+        """
+        expires_before = datetime.now() - timedelta(hours=IDEMPOTENCY_TTL_HOURS)
+
+        cached = _cache.get((scope, key))
+        if cached:
+            stored_fingerprint, status_code, body, created_at = cached
+            if created_at >= expires_before:
+                _cache.move_to_end((scope, key))
+                return IdempotencyService._replay(fingerprint, stored_fingerprint, status_code, body)
+            del _cache[(scope, key)]
+
+        result = await db.execute(
+            select(IdempotencyKey).where(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.idempotency_key == key
+            )
+        )
+        record = result.scalar_one_or_none()
+
+        if not record:
+            return None
+
+        if record.created_at < expires_before:
+            # Key expirada: liberarla para que el request se procese de nuevo
+            await db.delete(record)
+            await db.flush()
+            return None
+
+        IdempotencyService._remember(
+            scope, key, record.request_fingerprint, record.status_code, record.response_body, record.created_at
+        )
+        return IdempotencyService._replay(fingerprint, record.request_fingerprint, record.status_code, record.response_body)
+
+    @staticmethod
+    def store(db: AsyncSession, scope: str, key: str, fingerprint: str, status_code: int, response: Any) -> Any:
+        """
+        Agrega la respuesta a la sesión para que se guarde en el mismo commit
+        que el cambio de negocio. Retorna el body serializado.
+        """
+        body = jsonable_encoder(response)
+        db.add(IdempotencyKey(
+            idempotency_key=key,
+            scope=scope,
+            request_fingerprint=fingerprint,
+            status_code=status_code,
+            response_body=body
+        ))
+        return body
+
+    @staticmethod
+    def remember(scope: str, key: str, fingerprint: str, status_code: int, body: Any) -> None:
+        """Cachear en memoria una respuesta ya confirmada (llamar después del commit)"""
+        IdempotencyService._remember(scope, key, fingerprint, status_code, body, datetime.now())
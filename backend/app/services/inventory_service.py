@@ -0,0 +1,186 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, func, literal, or_, DateTime
+from sqlalchemy.sql import Select
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from typing import Iterable, List, Optional
+import os
+
+from app.models.inventory import InventoryMovement, InventorySnapshot, MovementReason
+from app.models.product import Product
+from app.services.stock_alert_service import StockAlertService, StockChange
+
+load_dotenv()
+
+# Los movimientos más recientes que esto quedan fuera del snapshot: una transacción
+# que obtuvo su id antes pero hace commit después no se pierde
+INVENTORY_SNAPSHOT_LAG_SECONDS = int(os.getenv("INVENTORY_SNAPSHOT_LAG_SECONDS", 60))
+
+
+class InventoryService:
+    """
+    Ledger de inventario (inventory_movements) y snapshots periódicos.
+
+    record() es el punto único por el que pasan los cambios de stock: agrega
+    los movimientos y evalúa las alertas de stock bajo. El stock a una fecha se
+    calcula como el último snapshot anterior + los movimientos posteriores.
+    """
+
+    @staticmethod
+    async def record(
+        db: AsyncSession,
+        changes: Iterable[StockChange],
+        reason: MovementReason,
+        reference_id: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> None:
+        """Registrar cambios de stock en la transacción de `db` (sin commit)"""
+        changes = [change for change in changes if change.new_stock != change.old_stock]
+        if not changes:
+            return
+        await db.execute(insert(InventoryMovement), [
+            {
+                "product_id": change.product_id,
+                "quantity": change.new_stock - change.old_stock,
+                "stock_after": change.new_stock,
+                "reason": reason.value,
+                "reference_id": reference_id if change.reference_id is None else change.reference_id,
+                "user_id": user_id,
+            }
+            for change in changes
+        ])
+        if reason != MovementReason.INITIAL:
+            await StockAlertService.record(db, changes)
+
+    @staticmethod
+    async def _latest_snapshot(db: AsyncSession, at: Optional[datetime] = None):
+        """(snapshot_at, last_movement_id) del último snapshot <= at, o (None, 0)"""
+        query = select(InventorySnapshot.snapshot_at, InventorySnapshot.last_movement_id)
+        if at is not None:
+            query = query.where(InventorySnapshot.snapshot_at <= at)
+        result = await db.execute(query.order_by(InventorySnapshot.snapshot_at.desc()).limit(1))
+        row = result.first()
+        return (row.snapshot_at, row.last_movement_id) if row else (None, 0)
+
+    @staticmethod
+    async def stock_query(
+        db: AsyncSession,
+        at: Optional[datetime] = None,
+        product_id: Optional[int] = None,
+        category_id: Optional[int] = None
+    ) -> Select:
+        """
+        SELECT de (id, name, category_id, price, stock) con el stock de cada
+        producto en `at` (None = según el ledger, ahora): snapshot + delta.
+        """
+        snapshot_at, boundary = await InventoryService._latest_snapshot(db, at)
+
+        delta = (
+            select(InventoryMovement.product_id, func.sum(InventoryMovement.quantity).label("quantity"))
+            .where(InventoryMovement.id > boundary)
+            .group_by(InventoryMovement.product_id)
+        )
+        if at is not None:
+            delta = delta.where(InventoryMovement.created_at <= at)
+        if product_id is not None:
+            delta = delta.where(InventoryMovement.product_id == product_id)
+        delta = delta.subquery()
+
+        base = (
+            select(InventorySnapshot.product_id, InventorySnapshot.stock)
+            .where(InventorySnapshot.snapshot_at == snapshot_at)
+            .subquery()
+        )
+
+        query = (
+            select(
+                Product.id, Product.name, Product.category_id, Product.price,
+                (func.coalesce(base.c.stock, 0) + func.coalesce(delta.c.quantity, 0)).label("stock")
+            )
+            .outerjoin(base, base.c.product_id == Product.id)
+            .outerjoin(delta, delta.c.product_id == Product.id)
+            # Productos que aún no existían en `at`
+            .where(or_(base.c.stock.isnot(None), delta.c.quantity.isnot(None)))
+        )
+        if product_id is not None:
+            query = query.where(Product.id == product_id)
+        if category_id is not None:
+            query = query.where(Product.category_id == category_id)
+        return query
+
+    @staticmethod
+    async def take_snapshot(db: AsyncSession) -> Optional[dict]:
+        """
+        Guardar el stock de todos los productos (un INSERT ... SELECT): snapshot
+        anterior + movimientos nuevos. None si no hubo movimientos desde el anterior.
+        """
+        result = await db.execute(select(func.now(type_=DateTime)))
+        snapshot_at = result.scalar_one().replace(microsecond=0) - timedelta(seconds=INVENTORY_SNAPSHOT_LAG_SECONDS)
+
+        result = await db.execute(
+            select(func.max(InventoryMovement.id)).where(InventoryMovement.created_at <= snapshot_at)
+        )
+        boundary = result.scalar_one() or 0
+        previous_at, previous_boundary = await InventoryService._latest_snapshot(db)
+        if boundary <= previous_boundary:
+            return None
+
+        delta = (
+            select(InventoryMovement.product_id, func.sum(InventoryMovement.quantity).label("quantity"))
+            .where(InventoryMovement.id > previous_boundary, InventoryMovement.id <= boundary)
+            .group_by(InventoryMovement.product_id)
+            .subquery()
+        )
+        base = (
+            select(InventorySnapshot.product_id, InventorySnapshot.stock)
+            .where(InventorySnapshot.snapshot_at == previous_at)
+            .subquery()
+        )
+        source = (
+            select(
+                Product.id,
+                literal(snapshot_at, DateTime),
+                func.coalesce(base.c.stock, 0) + func.coalesce(delta.c.quantity, 0),
+                literal(boundary)
+            )
+            .outerjoin(base, base.c.product_id == Product.id)
+            .outerjoin(delta, delta.c.product_id == Product.id)
+            .where(or_(base.c.stock.isnot(None), delta.c.quantity.isnot(None)))
+        )
+        result = await db.execute(
+            insert(InventorySnapshot).from_select(
+                ["product_id", "snapshot_at", "stock", "last_movement_id"], source
+            )
+        )
+        return {"snapshot_at": snapshot_at, "last_movement_id": boundary, "products": result.rowcount}
+
+    @staticmethod
+    async def reconcile(db: AsyncSession, fix: bool = False, user_id: Optional[int] = None) -> List[dict]:
+        """
+        Productos cuyo products.stock no coincide con el ledger. Con fix=True se
+        agrega un movimiento RECONCILIATION por diferencia (sin commit).
+        """
+        ledger = (await InventoryService.stock_query(db)).subquery()
+        result = await db.execute(
+            select(Product.id, Product.name, Product.stock, func.coalesce(ledger.c.stock, 0).label("ledger_stock"))
+            .outerjoin(ledger, ledger.c.id == Product.id)
+            .where(Product.stock != func.coalesce(ledger.c.stock, 0))
+            .order_by(Product.id)
+        )
+        drifts = [
+            {"product_id": row.id, "name": row.name, "stock": row.stock,
+             "ledger_stock": row.ledger_stock, "difference": row.stock - row.ledger_stock}
+            for row in result.all()
+        ]
+        if fix and drifts:
+            await db.execute(insert(InventoryMovement), [
+                {
+                    "product_id": drift["product_id"],
+                    "quantity": drift["difference"],
+                    "stock_after": drift["stock"],
+                    "reason": MovementReason.RECONCILIATION.value,
+                    "user_id": user_id,
+                }
+                for drift in drifts
+            ])
+        return drifts
@@ -0,0 +1,45 @@
+"""
+Handlers de jobs en segundo plano (ver app/services/job_queue.py).
+Importar este módulo registra los handlers: lo hacen main.py y worker.py.
+"""
+from sqlalchemy import update, func
+from pathlib import Path
+import asyncio
+
+from app.database import async_session_maker
+from app.models.product import Product, ProductImage
+from app.services.job_queue import job_handler
+from app.utils.image_upload import create_thumbnail, delete_image_files
+
+
+@job_handler("delete_image_files")
+def delete_image_files_job(payload: dict) -> None:
+    """payload: image_url, thumbnail_url (opcional)"""
+    delete_image_files(payload["image_url"], payload.get("thumbnail_url"))
+
+
+@job_handler("create_thumbnail")
+async def create_thumbnail_job(payload: dict) -> None:
+    """
+    payload: image_id, product_id, image_url.
+    Genera el thumbnail, lo asigna a la imagen y toca updated_at del producto
+    para que cambie la versión del catálogo (ETag y cachés).
+    """
+    thumbnail_url = await asyncio.to_thread(create_thumbnail, Path(payload["image_url"]).name)
+
+    async with async_session_maker() as db:
+        result = await db.execute(
+            update(ProductImage)
+            .where(ProductImage.id == payload["image_id"])
+            .values(thumbnail_url=thumbnail_url)
+        )
+        if result.rowcount == 0:
+            # La imagen se eliminó antes de procesarla
+            await asyncio.to_thread(delete_image_files, payload["image_url"], thumbnail_url)
+            return
+        await db.execute(
+            update(Product)
+            .where(Product.id == payload["product_id"])
+            .values(updated_at=func.now())
+        )
+        await db.commit()
@@ -0,0 +1,222 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, event, func
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import inspect
+import logging
+import os
+import random
+import socket
+import traceback
+
+from app.database import async_session_maker
+from app.models.job import Job, JobStatus
+
+load_dotenv()
+
+logger = logging.getLogger("app.jobs")
+
+JOBS_INPROCESS_WORKERS = int(os.getenv("JOBS_INPROCESS_WORKERS", 2))  # 0 = solo worker.py
+JOBS_POLL_SECONDS = float(os.getenv("JOBS_POLL_SECONDS", 2))
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", 5))
+JOBS_BACKOFF_BASE_SECONDS = float(os.getenv("JOBS_BACKOFF_BASE_SECONDS", 5))
+JOBS_BACKOFF_MAX_SECONDS = float(os.getenv("JOBS_BACKOFF_MAX_SECONDS", 3600))
+JOBS_LOCK_TIMEOUT_SECONDS = int(os.getenv("JOBS_LOCK_TIMEOUT_SECONDS", 600))  # RUNNING más tiempo = worker caído
+
+# name -> handler(payload). Los handlers síncronos corren en un thread.
+JOB_HANDLERS: Dict[str, Callable[[dict], Any]] = {}
+
+# Se activa tras el commit de un request que encoló jobs (worker del mismo proceso)
+_wakeup: Optional[asyncio.Event] = None
+
+
+def job_handler(name: str):
+    """Registrar una función como handler del job `name`"""
+    def decorator(fn: Callable[[dict], Any]):
+        JOB_HANDLERS[name] = fn
+        return fn
+    return decorator
+
+
+def _wake(*_) -> None:
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Espera exponencial con jitter antes del reintento número `attempts`"""
+    delay = min(JOBS_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), JOBS_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class JobQueue:
+    """
+    Cola de jobs persistente (tabla jobs).
+
+    enqueue() agrega el job a la sesión del request: se guarda en la misma
+    transacción, así que solo se ejecuta si el commit ocurre. Tras el commit
+    se despierta al worker del proceso; los demás workers lo ven al hacer poll.
+    """
+
+    @staticmethod
+    def enqueue(
+        db: AsyncSession,
+        name: str,
+        payload: Optional[dict] = None,
+        delay_seconds: float = 0,
+        max_attempts: int = JOBS_MAX_ATTEMPTS
+    ) -> Job:
+        if name not in JOB_HANDLERS:
+            raise ValueError(f"Job desconocido: {name}")
+        job = Job(
+            name=name,
+            payload=payload or {},
+            status=JobStatus.PENDING.value,
+            attempts=0,
+            max_attempts=max_attempts,
+            run_at=datetime.now() + timedelta(seconds=delay_seconds)
+        )
+        db.add(job)
+        event.listen(db.sync_session, "after_commit", _wake, once=True)
+        return job
+
+    @staticmethod
+    async def stats(db: AsyncSession) -> dict:
+        result = await db.execute(select(Job.status, func.count()).group_by(Job.status))
+        counts = {status.value: 0 for status in JobStatus}
+        counts.update({status: count for status, count in result.all()})
+        result = await db.execute(
+            select(Job.id, Job.name, Job.attempts, Job.last_error, Job.finished_at)
+            .where(Job.status == JobStatus.FAILED.value)
+            .order_by(Job.id.desc())
+            .limit(10)
+        )
+        return {
+            "counts": counts,
+            "recent_failures": [dict(row._mapping) for row in result.all()],
+        }
+
+
+class JobWorker:
+    """
+    Pool de `concurrency` tareas asyncio que ejecutan jobs de la tabla.
+
+    Cada ciclo reclama jobs PENDING con run_at vencido (SELECT ... FOR UPDATE
+    SKIP LOCKED, así varios procesos no toman el mismo), los marca RUNNING y
+    los reparte a las tareas. Un fallo reprograma el job con backoff
+    exponencial hasta max_attempts; después queda FAILED.
+    """
+
+    def __init__(self, concurrency: int = JOBS_INPROCESS_WORKERS, poll_seconds: float = JOBS_POLL_SECONDS):
+        self.concurrency = max(concurrency, 1)
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._queue: Optional[asyncio.Queue] = None
+        self._in_flight = 0
+        self._backlog = False
+        self._stopping = False
+
+    async def _claim(self, limit: int) -> list:
+        now = datetime.now()
+        async with async_session_maker() as db:
+            # Jobs de un worker caído: volver a la cola
+            await db.execute(
+                update(Job)
+                .where(
+                    Job.status == JobStatus.RUNNING.value,
+                    Job.locked_at < now - timedelta(seconds=JOBS_LOCK_TIMEOUT_SECONDS)
+                )
+                .values(status=JobStatus.PENDING.value, locked_by=None, locked_at=None)
+            )
+            result = await db.execute(
+                select(Job)
+                .where(Job.status == JobStatus.PENDING.value, Job.run_at <= now)
+                .order_by(Job.run_at, Job.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            jobs = result.scalars().all()
+            for job in jobs:
+                job.status = JobStatus.RUNNING.value
+                job.locked_by = self.worker_id
+                job.locked_at = now
+                job.attempts += 1
+            await db.commit()
+            return [(job.id, job.name, dict(job.payload or {}), job.attempts, job.max_attempts) for job in jobs]
+
+    async def _execute(self, job_id: int, name: str, payload: dict, attempts: int, max_attempts: int) -> None:
+        handler = JOB_HANDLERS.get(name)
+        values: Dict[str, Any] = {"locked_by": None, "locked_at": None}
+        try:
+            if handler is None:
+                raise LookupError(f"Sin handler para el job '{name}'")
+            if inspect.iscoroutinefunction(handler):
+                await handler(payload)
+            else:
+                await asyncio.to_thread(handler, payload)
+            values.update(status=JobStatus.DONE.value, finished_at=datetime.now(), last_error=None)
+        except Exception as e:
+            error = "".join(traceback.format_exception_only(type(e), e)).strip()
+            if attempts >= max_attempts:
+                logger.error("job %s (%s) falló definitivamente: %s", job_id, name, error)
+                values.update(status=JobStatus.FAILED.value, finished_at=datetime.now(), last_error=error)
+            else:
+                delay = backoff_seconds(attempts)
+                logger.warning("job %s (%s) falló (intento %s), reintento en %.0fs: %s", job_id, name, attempts, delay, error)
+                values.update(
+                    status=JobStatus.PENDING.value,
+                    run_at=datetime.now() + timedelta(seconds=delay),
+                    last_error=error
+                )
+
+        async with async_session_maker() as db:
+            await db.execute(update(Job).where(Job.id == job_id).values(**values))
+            await db.commit()
+
+    async def _consume(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._execute(*job)
+            except Exception:
+                logger.exception("Error registrando el resultado del job %s", job[0])
+            finally:
+                self._in_flight -= 1
+                self._queue.task_done()
+                if self._backlog:
+                    _wake()  # El último reclamo vino lleno: puede haber más pendientes
+
+    async def run(self) -> None:
+        global _wakeup
+        _wakeup = asyncio.Event()
+        self._queue = asyncio.Queue()
+        consumers = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+        logger.info("worker de jobs %s iniciado (%s tareas)", self.worker_id, self.concurrency)
+        try:
+            while not self._stopping:
+                _wakeup.clear()
+                free = self.concurrency - self._in_flight
+                if free > 0:
+                    try:
+                        claimed = await self._claim(free)
+                    except Exception:
+                        logger.exception("Error reclamando jobs")
+                        claimed = []
+                    for job in claimed:
+                        self._in_flight += 1
+                        self._queue.put_nowait(job)
+                    self._backlog = len(claimed) == free
+                try:
+                    await asyncio.wait_for(_wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+            await self._queue.join()
+        finally:
+            for consumer in consumers:
+                consumer.cancel()
+
+    def stop(self) -> None:
+        self._stopping = True
+        _wake()
@@ -0,0 +1,112 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from typing import Optional
+import asyncio
+import logging
+import os
+
+from app.database import async_session_maker
+from app.models.order import Order, OrderStatus
+from app.services.order_service import OrderService, db_now
+from app.services.settings_cache import settings_cache
+
+load_dotenv()
+
+logger = logging.getLogger("app.orders")
+
+ORDERS_EXPIRY_SWEEP_MINUTES = float(os.getenv("ORDERS_EXPIRY_SWEEP_MINUTES", 5))  # 0 = solo expire_orders.py
+ORDERS_EXPIRY_BATCH_SIZE = int(os.getenv("ORDERS_EXPIRY_BATCH_SIZE", 200))
+
+
+class OrderExpirySweeper:
+    """
+    Cancela los pedidos PENDING_PAYMENT más antiguos que
+    settings.pending_payment_ttl_minutes y repone su stock.
+
+    Cada lote es una transacción: los pedidos se leen por idx_orders_status_created
+    con FOR UPDATE SKIP LOCKED (varios workers pueden barrer a la vez sin
+    esperarse) y se cancelan con OrderService.transition (un UPDATE de pedidos
+    y un UPDATE de stock por lote).
+    """
+
+    def __init__(self, batch_size: int = ORDERS_EXPIRY_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.runs = 0
+        self.expired_orders = 0
+        self.reclaimed_units = 0
+        self.failed_runs = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_expired = 0
+
+    async def expire_batch(self, db: AsyncSession, cutoff: datetime) -> dict:
+        """Cancela un lote de pedidos vencidos (sin commit). {'orders', 'units'}"""
+        result = await db.execute(
+            select(Order.id)
+            .where(Order.status == OrderStatus.PENDING_PAYMENT, Order.created_at < cutoff)
+            .order_by(Order.created_at, Order.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        order_ids = result.scalars().all()
+        if not order_ids:
+            return {"orders": 0, "units": 0}
+
+        results = await OrderService.transition(db, order_ids, OrderStatus.CANCELLED)
+        updated = [item for item in results if item["status"] == "updated"]
+        return {"orders": len(updated), "units": sum(item.get("restocked_units", 0) for item in updated)}
+
+    async def sweep(self) -> dict:
+        """Barre todos los pedidos vencidos, un lote por transacción"""
+        totals = {"orders": 0, "units": 0}
+        async with async_session_maker() as db:
+            ttl = (await settings_cache.get(db)).pending_payment_ttl_minutes
+            # created_at y las fechas de estado usan el reloj de la base (db_now): el corte también
+            result = await db.execute(select(db_now()))
+            cutoff = result.scalar_one() - timedelta(minutes=ttl)
+            await db.rollback()
+            if ttl <= 0:
+                return totals
+            while True:
+                try:
+                    batch = await self.expire_batch(db, cutoff)
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    raise
+                totals["orders"] += batch["orders"]
+                totals["units"] += batch["units"]
+                self.expired_orders += batch["orders"]
+                self.reclaimed_units += batch["units"]
+                if batch["orders"] < self.batch_size:
+                    break
+        self.runs += 1
+        self.last_run_at = datetime.now()
+        self.last_expired = totals["orders"]
+        return totals
+
+    async def run(self, interval_minutes: float = ORDERS_EXPIRY_SWEEP_MINUTES) -> None:
+        """Tarea de fondo: barre cada interval_minutes"""
+        while True:
+            try:
+                totals = await self.sweep()
+                if totals["orders"]:
+                    logger.info("pedidos vencidos cancelados: %s (%s unidades repuestas)", totals["orders"], totals["units"])
+            except Exception:
+                self.failed_runs += 1
+                logger.exception("Error cancelando pedidos vencidos")
+            await asyncio.sleep(interval_minutes * 60)
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "last_run_at": self.last_run_at,
+            "last_expired": self.last_expired,
+            "expired_orders": self.expired_orders,
+            "reclaimed_units": self.reclaimed_units,
+        }
+
+
+order_expiry_sweeper = OrderExpirySweeper()
@@ -0,0 +1,166 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, case, DateTime
+from typing import Dict, List, Optional
+
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.product import Product
+from app.models.inventory import MovementReason
+from app.services.inventory_service import InventoryService
+from app.services.stock_alert_service import StockChange
+
+
+# Transiciones permitidas; DELIVERED y CANCELLED son finales
+ORDER_TRANSITIONS: Dict[OrderStatus, frozenset] = {
+    OrderStatus.PENDING_PAYMENT: frozenset({OrderStatus.WAITING_CONTACT, OrderStatus.PAID, OrderStatus.CANCELLED}),
+    OrderStatus.WAITING_CONTACT: frozenset({OrderStatus.PENDING_PAYMENT, OrderStatus.PAID, OrderStatus.CANCELLED}),
+    OrderStatus.PAID: frozenset({OrderStatus.SHIPPED, OrderStatus.DELIVERED, OrderStatus.CANCELLED}),
+    OrderStatus.SHIPPED: frozenset({OrderStatus.DELIVERED}),
+    OrderStatus.DELIVERED: frozenset(),
+    OrderStatus.CANCELLED: frozenset(),
+}
+
+# Columna que registra la fecha de llegada a cada estado
+STATUS_TIMESTAMPS: Dict[OrderStatus, str] = {
+    OrderStatus.WAITING_CONTACT: "waiting_contact_at",
+    OrderStatus.PAID: "paid_at",
+    OrderStatus.SHIPPED: "shipped_at",
+    OrderStatus.DELIVERED: "delivered_at",
+    OrderStatus.CANCELLED: "cancelled_at",
+}
+
+
+class InvalidTransitionError(Exception):
+    """El pedido no puede pasar del estado actual al solicitado"""
+
+
+def can_transition(current: OrderStatus, target: OrderStatus) -> bool:
+    return target in ORDER_TRANSITIONS[OrderStatus(current)]
+
+
+def db_now():
+    """
+    NOW() de la base como datetime. Todas las fechas de los pedidos (created_at,
+    updated_at, fechas de estado, corte de vencimiento) usan el reloj de la base;
+    se agrega como columna a un SELECT que ya se hace, sin round trip extra.
+    """
+    return func.now(type_=DateTime)
+
+
+class OrderService:
+    """
+    Máquina de estados de los pedidos. transition() cambia el estado de muchos
+    pedidos en la transacción de `db`: un SELECT ... FOR UPDATE, un UPDATE por
+    conjunto y, al cancelar, la reposición de stock en un solo UPDATE (CASE por id).
+    """
+
+    @staticmethod
+    async def transition(
+        db: AsyncSession,
+        order_ids: List[int],
+        target: OrderStatus,
+        user_id: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Cambia el estado de los pedidos válidos y retorna un resultado por pedido
+        (status 'updated', 'unchanged' si ya estaba en ese estado o 'error').
+        No hace commit.
+        """
+        target = OrderStatus(target)
+        result = await db.execute(
+            select(Order.id, Order.status, db_now().label("now"))
+            .where(Order.id.in_(set(order_ids)))
+            .with_for_update()
+        )
+        rows = result.all()
+        current = {row.id: OrderStatus(row.status) for row in rows}
+
+        results = []
+        valid = []
+        seen = set()
+        for order_id in order_ids:
+            item = {"order_id": order_id, "status": "error", "from_status": None, "error": None}
+            results.append(item)
+            status = current.get(order_id)
+            if status is None:
+                item["error"] = "Pedido no encontrado"
+            elif order_id in seen:
+                item["error"] = "Pedido repetido"
+            elif status == target:
+                item.update(status="unchanged", from_status=status.value)
+            elif not can_transition(status, target):
+                item.update(from_status=status.value, error=f"Transición no permitida: {status.value} -> {target.value}")
+            else:
+                item.update(status="updated", from_status=status.value)
+                valid.append(order_id)
+            seen.add(order_id)
+
+        if not valid:
+            return results
+
+        # Fecha de la base leída en el SELECT: como valor literal, los pedidos
+        # cargados en la sesión quedan sincronizados sin recargar
+        now = rows[0].now
+        await db.execute(
+            update(Order)
+            .where(Order.id.in_(valid))
+            .values({"status": target, "updated_at": now, STATUS_TIMESTAMPS[target]: now})
+            .execution_options(synchronize_session="evaluate")
+        )
+
+        if target == OrderStatus.CANCELLED:
+            restocked = await OrderService.restock(db, valid, user_id)
+            for item in results:
+                if item["status"] == "updated":
+                    item["restocked_units"] = restocked.get(item["order_id"], 0)
+        return results
+
+    @staticmethod
+    async def restock(db: AsyncSession, order_ids: List[int], user_id: Optional[int] = None) -> Dict[int, int]:
+        """
+        Devuelve al stock las unidades de los pedidos cancelados (un UPDATE para
+        todos los productos) y registra un movimiento CANCELLATION por pedido y
+        producto. Retorna las unidades repuestas por pedido.
+        """
+        result = await db.execute(
+            select(OrderItem.order_id, OrderItem.product_id, func.sum(OrderItem.quantity).label("quantity"))
+            .where(OrderItem.order_id.in_(order_ids))
+            .group_by(OrderItem.order_id, OrderItem.product_id)
+            .order_by(OrderItem.order_id, OrderItem.product_id)
+        )
+        lines = result.all()
+        if not lines:
+            return {}
+
+        deltas: Dict[int, int] = {}
+        for line in lines:
+            deltas[line.product_id] = deltas.get(line.product_id, 0) + int(line.quantity)
+
+        # Bloqueo en orden de id: dos lotes de cancelaciones no se bloquean mutuamente
+        result = await db.execute(
+            select(Product.id, Product.stock, Product.low_stock_threshold)
+            .where(Product.id.in_(deltas))
+            .order_by(Product.id)
+            .with_for_update()
+        )
+        products = {row.id: row for row in result.all()}
+
+        await db.execute(
+            update(Product)
+            .where(Product.id.in_(deltas))
+            .values(stock=Product.stock + case(deltas, value=Product.id))
+            .execution_options(synchronize_session=False)
+        )
+
+        stock = {product_id: row.stock for product_id, row in products.items()}
+        changes = []
+        restocked: Dict[int, int] = {}
+        for line in lines:
+            restocked[line.order_id] = restocked.get(line.order_id, 0) + int(line.quantity)
+            old_stock = stock[line.product_id]
+            stock[line.product_id] = old_stock + int(line.quantity)
+            changes.append(StockChange(
+                line.product_id, old_stock, stock[line.product_id],
+                products[line.product_id].low_stock_threshold, reference_id=line.order_id
+            ))
+        await InventoryService.record(db, changes, MovementReason.CANCELLATION, user_id=user_id)
+        return restocked
@@ -0,0 +1,82 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from app.utils.helpers import fold
+
+CENTS = Decimal("0.01")
+
+
+def zone_key(value: Optional[str]) -> str:
+    """Ciudad o distrito normalizado: sin acentos, minúsculas y espacios simples"""
+    return " ".join(fold(value).split())
+
+
+class ShippingRateValues(NamedTuple):
+    city: str
+    district: Optional[str]
+    cost: Decimal
+    free_shipping_threshold: Optional[Decimal]
+
+
+class ShippingRates:
+    """
+    Tabla de tarifas de envío en memoria: un dict por (ciudad, distrito)
+    normalizados. Se busca el distrito, luego la ciudad (district NULL).
+    """
+
+    def __init__(self, rates: Iterable[ShippingRateValues] = ()):
+        self.rates = tuple(rates)
+        self._lookup: Dict[Tuple[str, str], ShippingRateValues] = {
+            (zone_key(rate.city), zone_key(rate.district)): rate for rate in self.rates
+        }
+
+    def __len__(self) -> int:
+        return len(self.rates)
+
+    def find(self, city: str, district: Optional[str]) -> Optional[ShippingRateValues]:
+        city = zone_key(city)
+        return self._lookup.get((city, zone_key(district))) or self._lookup.get((city, ""))
+
+
+class PriceQuote(NamedTuple):
+    subtotal: Decimal
+    tax: Decimal
+    shipping_cost: Decimal
+    total: Decimal
+    free_shipping_threshold: Optional[Decimal]  # None = sin envío gratis en la zona
+    zone: str  # 'district', 'city' o 'default'
+
+
+class PricingService:
+    """
+    Impuestos y costo de envío del checkout, calculados en Decimal sobre los
+    settings y las tarifas en memoria (settings_cache): no consulta la base.
+    """
+
+    @staticmethod
+    def quote(settings, rates: ShippingRates, subtotal: Decimal, city: str, district: Optional[str]) -> PriceQuote:
+        subtotal = Decimal(subtotal).quantize(CENTS, ROUND_HALF_UP)
+
+        rate = rates.find(city, district)
+        if rate is None:
+            zone = "default"
+            cost, threshold = settings.shipping_base_cost, settings.free_shipping_threshold
+        else:
+            zone = "city" if rate.district is None else "district"
+            cost = rate.cost
+            threshold = settings.free_shipping_threshold if rate.free_shipping_threshold is None else rate.free_shipping_threshold
+
+        threshold = Decimal(threshold) if threshold else None  # 0 = sin envío gratis
+        shipping_cost = Decimal(cost).quantize(CENTS, ROUND_HALF_UP)
+        if threshold is not None and subtotal >= threshold:
+            shipping_cost = Decimal("0.00")
+
+        tax = (subtotal * Decimal(settings.tax_rate)).quantize(CENTS, ROUND_HALF_UP)
+        return PriceQuote(
+            subtotal=subtotal,
+            tax=tax,
+            shipping_cost=shipping_cost,
+            total=subtotal + tax + shipping_cost,
+            free_shipping_threshold=threshold,
+            zone=zone
+        )
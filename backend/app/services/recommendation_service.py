@@ -0,0 +1,250 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, func, and_
+from sqlalchemy.orm import aliased, selectinload
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from dotenv import load_dotenv
+from typing import Dict, List, Tuple
+import asyncio
+import logging
+import os
+import random
+
+from app.database import async_session_maker
+from app.models.category import Category
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.product import Product
+from app.models.product_addon import ProductAddon
+
+load_dotenv()
+
+logger = logging.getLogger("app.recommendations")
+
+ADDONS_TOP_K = int(os.getenv("ADDONS_TOP_K", 12))
+ADDONS_LOOKBACK_DAYS = int(os.getenv("ADDONS_LOOKBACK_DAYS", 180))
+ADDONS_REFRESH_MINUTES = int(os.getenv("ADDONS_REFRESH_MINUTES", 0))  # 0 = solo por script/cron
+
+# Categorías complementarias típicas (por nombre)
+COMPLEMENTARY_CATEGORIES = [
+    name.strip()
+    for name in os.getenv("ADDONS_COMPLEMENTARY_CATEGORIES", "Chocolates,Vinos,Tarjetas,Dulces").split(",")
+    if name.strip()
+]
+
+# Un add-on cuesta como máximo la mitad del producto principal
+ADDON_PRICE_RATIO = Decimal("0.5")
+
+# Peso de la categoría complementaria frente a la afinidad por compras (0..1)
+CATEGORY_WEIGHT = 0.3
+
+
+class RecommendationService:
+    """
+    Add-ons precalculados por producto.
+
+    refresh_addons() recalcula el top-K de todo el catálogo (script o tarea
+    periódica); get_addons() solo lee ese top-K por (product_id, rank) y rota
+    en memoria los que se muestran.
+    """
+
+    @staticmethod
+    async def _co_purchases(db: AsyncSession) -> Dict[int, Dict[int, int]]:
+        """product_id -> {addon_id: pedidos en que se compraron juntos}"""
+        a = aliased(OrderItem)
+        b = aliased(OrderItem)
+        since = datetime.now() - timedelta(days=ADDONS_LOOKBACK_DAYS)
+        result = await db.execute(
+            select(a.product_id, b.product_id, func.count(func.distinct(a.order_id)))
+            .join(b, and_(a.order_id == b.order_id, a.product_id != b.product_id))
+            .join(Order, Order.id == a.order_id)
+            .where(Order.status != OrderStatus.CANCELLED, Order.created_at >= since)
+            .group_by(a.product_id, b.product_id)
+        )
+        pairs: Dict[int, Dict[int, int]] = defaultdict(dict)
+        for product_id, addon_id, orders in result.all():
+            pairs[product_id][addon_id] = orders
+        return pairs
+
+    @staticmethod
+    async def _sales(db: AsyncSession) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """(unidades vendidas, pedidos) por producto"""
+        since = datetime.now() - timedelta(days=ADDONS_LOOKBACK_DAYS)
+        result = await db.execute(
+            select(
+                OrderItem.product_id,
+                func.sum(OrderItem.quantity),
+                func.count(func.distinct(OrderItem.order_id))
+            )
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(Order.status != OrderStatus.CANCELLED, Order.created_at >= since)
+            .group_by(OrderItem.product_id)
+        )
+        units_sold, order_counts = {}, {}
+        for product_id, units, orders in result.all():
+            units_sold[product_id] = int(units or 0)
+            order_counts[product_id] = orders
+        return units_sold, order_counts
+
+    @staticmethod
+    def rank_addons(
+        products: list,
+        complementary_ids: set,
+        co_purchases: Dict[int, Dict[int, int]],
+        units_sold: Dict[int, int],
+        order_counts: Dict[int, int],
+        top_k: int = ADDONS_TOP_K
+    ) -> List[dict]:
+        """
+        Top-K de add-ons por producto.
+
+        products: filas (id, category_id, price) de productos activos con stock.
+        Score = afinidad por compras (pedidos juntos / pedidos del producto)
+        + CATEGORY_WEIGHT si el candidato es de una categoría complementaria,
+        escalado por su popularidad. Todos los candidatos respetan el tope
+        de precio (ADDON_PRICE_RATIO).
+        """
+        by_id = {p.id: p for p in products}
+        max_units = max(units_sold.values(), default=0) or 1
+
+        # Candidatos de categorías complementarias, del más vendido al menos vendido
+        complementary = sorted(
+            (p for p in products if p.category_id in complementary_ids),
+            key=lambda p: (-units_sold.get(p.id, 0), p.price, p.id)
+        )
+
+        rows = []
+        for product in products:
+            max_price = product.price * ADDON_PRICE_RATIO
+            scores: Dict[int, float] = {}
+            sources: Dict[int, str] = {}
+
+            own_orders = order_counts.get(product.id) or 1
+            for addon_id, together in co_purchases.get(product.id, {}).items():
+                candidate = by_id.get(addon_id)
+                if candidate is not None and candidate.price <= max_price:
+                    scores[addon_id] = together / own_orders
+                    sources[addon_id] = "co_purchase"
+
+            taken = 0
+            for candidate in complementary:
+                if taken >= top_k:
+                    break
+                if candidate.id == product.id or candidate.category_id == product.category_id:
+                    continue
+                if candidate.price > max_price:
+                    continue
+                taken += 1
+                bonus = CATEGORY_WEIGHT * (0.5 + 0.5 * units_sold.get(candidate.id, 0) / max_units)
+                scores[candidate.id] = scores.get(candidate.id, 0.0) + bonus
+                sources.setdefault(candidate.id, "category")
+
+            best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+            for rank, (addon_id, score) in enumerate(best):
+                rows.append({
+                    "product_id": product.id,
+                    "addon_product_id": addon_id,
+                    "rank": rank,
+                    "score": round(score, 6),
+                    "source": sources[addon_id],
+                })
+        return rows
+
+    @staticmethod
+    async def refresh_addons(db: AsyncSession, top_k: int = ADDONS_TOP_K) -> int:
+        """
+        Recalcular product_addons para todo el catálogo (reemplazo completo).
+        Retorna la cantidad de filas escritas. El commit lo hace quien llama.
+        """
+        result = await db.execute(
+            select(Product.id, Product.category_id, Product.price)
+            .where(Product.is_active == True, Product.stock > 0)
+        )
+        products = result.all()
+
+        result = await db.execute(
+            select(Category.id).where(Category.name.in_(COMPLEMENTARY_CATEGORIES))
+        )
+        complementary_ids = set(result.scalars().all())
+
+        co_purchases = await RecommendationService._co_purchases(db)
+        units_sold, order_counts = await RecommendationService._sales(db)
+        rows = RecommendationService.rank_addons(
+            products, complementary_ids, co_purchases, units_sold, order_counts, top_k
+        )
+
+        await db.execute(delete(ProductAddon))
+        if rows:
+            await db.execute(insert(ProductAddon), rows)
+        return len(rows)
+
+    @staticmethod
+    async def refresh_periodically(interval_minutes: int = ADDONS_REFRESH_MINUTES) -> None:
+        """Tarea de fondo: recalcula los add-ons cada interval_minutes"""
+        while True:
+            try:
+                async with async_session_maker() as session:
+                    rows = await RecommendationService.refresh_addons(session)
+                    await session.commit()
+                logger.info("add-ons recalculados: %s filas", rows)
+            except Exception:
+                logger.exception("Error recalculando add-ons")
+            await asyncio.sleep(interval_minutes * 60)
+
+    @staticmethod
+    async def get_addons(db: AsyncSession, product_id: int, limit: int) -> List[Product]:
+        """
+        Add-ons de un producto: top-K precalculado (aún activos y con stock),
+        de los que se eligen `limit` al azar en memoria, respetando el orden.
+        """
+        result = await db.execute(
+            select(Product)
+            .join(ProductAddon, ProductAddon.addon_product_id == Product.id)
+            .options(selectinload(Product.images), selectinload(Product.category))
+            .where(
+                ProductAddon.product_id == product_id,
+                Product.is_active == True,
+                Product.stock > 0
+            )
+            .order_by(ProductAddon.rank)
+        )
+        candidates = result.scalars().all()
+
+        if not candidates:
+            candidates = await RecommendationService._fallback_candidates(db, product_id)
+
+        if len(candidates) <= limit:
+            return list(candidates)
+        picked = sorted(random.sample(range(len(candidates)), limit))
+        return [candidates[i] for i in picked]
+
+    @staticmethod
+    async def _fallback_candidates(db: AsyncSession, product_id: int) -> List[Product]:
+        """
+        Producto sin add-ons precalculados (nuevo o antes del primer refresh):
+        los más caros de las categorías complementarias dentro del tope de precio.
+        Usa el índice de precio; sin ORDER BY RAND().
+        """
+        result = await db.execute(
+            select(Product.price, Product.category_id).where(Product.id == product_id)
+        )
+        current = result.one_or_none()
+        if not current:
+            return []
+
+        result = await db.execute(
+            select(Product)
+            .join(Category, Product.category_id == Category.id)
+            .options(selectinload(Product.images), selectinload(Product.category))
+            .where(
+                Category.name.in_(COMPLEMENTARY_CATEGORIES),
+                Product.category_id != current.category_id,
+                Product.is_active == True,
+                Product.stock > 0,
+                Product.id != product_id,
+                Product.price <= current.price * ADDON_PRICE_RATIO
+            )
+            .order_by(Product.price.desc())
+            .limit(ADDONS_TOP_K)
+        )
+        return result.scalars().all()
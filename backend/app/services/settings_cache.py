@@ -0,0 +1,144 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from datetime import datetime
+from decimal import Decimal
+from dotenv import load_dotenv
+from typing import Iterable, NamedTuple, Optional
+import asyncio
+import logging
+import os
+import time
+
+from app.database import async_session_maker
+from app.models.settings import Settings
+from app.models.shipping_rate import ShippingRate
+from app.services.pricing_service import ShippingRates, ShippingRateValues
+
+load_dotenv()
+
+logger = logging.getLogger("app.settings")
+
+SETTINGS_POLL_SECONDS = float(os.getenv("SETTINGS_POLL_SECONDS", 5))
+
+
+class SettingsValues(NamedTuple):
+    """Copia inmutable de la fila de settings (compatible con SettingsResponse)"""
+    id: Optional[int]  # None mientras no exista la fila (se usan los defaults)
+    version: int
+    updated_at: Optional[datetime]
+    email_notifications: bool
+    low_stock_alerts: bool
+    auto_confirmations: bool
+    pending_payment_ttl_minutes: int
+    shipping_base_cost: Decimal
+    free_shipping_threshold: Decimal
+    tax_rate: Decimal
+    business_hours: Optional[str]
+    social_facebook: Optional[str]
+    social_instagram: Optional[str]
+    social_tiktok: Optional[str]
+
+    @classmethod
+    def from_row(cls, settings: Settings) -> "SettingsValues":
+        values = {field: getattr(settings, field) for field in cls._fields}
+        for field, value in values.items():
+            # Fila sin guardar o columnas nuevas sin valor: el default del modelo
+            default = Settings.__table__.c[field].default
+            if value is None and default is not None:
+                values[field] = default.arg
+        for field in ("shipping_base_cost", "free_shipping_threshold", "tax_rate"):
+            values[field] = Decimal(str(values[field]))
+        return cls(**values)
+
+
+class SettingsCache:
+    """
+    Settings del sistema y tarifas de envío en memoria del proceso: leerlos en
+    el camino caliente (checkout, alertas de stock) no consulta la base.
+
+    update_settings (y el cambio de tarifas) incrementa settings.version y
+    reemplaza el caché del proceso que atendió el cambio. Los demás workers sondean la versión (una
+    consulta de una columna) cada SETTINGS_POLL_SECONDS y recargan la fila
+    solo si cambió. Sin el sondeo (scripts), get() recarga cuando el valor
+    tiene más de SETTINGS_POLL_SECONDS.
+    """
+
+    def __init__(self):
+        self._values: Optional[SettingsValues] = None
+        self._rates = ShippingRates()
+        self._loaded_at = 0.0
+        self._running = False
+        self.reloads = 0
+
+    @property
+    def values(self) -> Optional[SettingsValues]:
+        return self._values
+
+    @property
+    def shipping_rates(self) -> ShippingRates:
+        """Tarifas de envío cargadas junto con los settings (ver get())"""
+        return self._rates
+
+    def store(self, settings: Settings, rates: Optional[Iterable[ShippingRate]] = None) -> SettingsValues:
+        """Reemplazar el caché con la fila recién leída o actualizada (y las tarifas, si se pasan)"""
+        if rates is not None:
+            self._rates = ShippingRates(
+                ShippingRateValues(rate.city, rate.district, rate.cost, rate.free_shipping_threshold)
+                for rate in rates
+            )
+        self._values = SettingsValues.from_row(settings)
+        self._loaded_at = time.monotonic()
+        self.reloads += 1
+        return self._values
+
+    async def load(self, db: AsyncSession) -> SettingsValues:
+        """Leer la fila de settings (sin fila, los defaults del modelo; no escribe) y las tarifas"""
+        result = await db.execute(select(Settings).limit(1))
+        settings = result.scalar_one_or_none() or Settings()
+        result = await db.execute(select(ShippingRate))
+        return self.store(settings, result.scalars().all())
+
+    async def get(self, db: AsyncSession) -> SettingsValues:
+        stale = not self._running and time.monotonic() - self._loaded_at > SETTINGS_POLL_SECONDS
+        if self._values is None or stale:
+            return await self.load(db)
+        return self._values
+
+    async def poll(self) -> bool:
+        """Recargar si la versión en la base cambió. True si recargó"""
+        async with async_session_maker() as db:
+            result = await db.execute(select(Settings.version).limit(1))
+            version = result.scalar_one_or_none()
+            current = self._values and (self._values.version if self._values.id is not None else None)
+            if self._values is not None and version == current:
+                self._loaded_at = time.monotonic()
+                return False
+            await self.load(db)
+            return True
+
+    async def run(self, interval_seconds: float = SETTINGS_POLL_SECONDS) -> None:
+        """Tarea de fondo: carga inicial y sondeo de la versión cada interval_seconds"""
+        self._running = True
+        try:
+            while True:
+                try:
+                    if await self.poll():
+                        logger.info("settings recargados (versión %s)", self._values.version)
+                except Exception:
+                    logger.exception("Error sondeando la versión de settings")
+                await asyncio.sleep(interval_seconds)
+        finally:
+            self._running = False
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._values is not None,
+            "version": self._values.version if self._values else None,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._values else None,
+            "shipping_rates": len(self._rates),
+            "polling": self._running,
+            "reloads": self.reloads,
+        }
+
+
+settings_cache = SettingsCache()
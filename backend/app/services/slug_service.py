@@ -0,0 +1,66 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_
+from collections import OrderedDict
+from dotenv import load_dotenv
+from typing import Optional
+import os
+import re
+
+load_dotenv()
+
+SLUG_CACHE_SIZE = int(os.getenv("SLUG_CACHE_SIZE", 4096))
+
+# LRU en memoria: slug -> product_id (lookups públicos por slug)
+_slug_ids: "OrderedDict[str, int]" = OrderedDict()
+
+
+class SlugService:
+    """
+    Asignación de slugs únicos y caché slug -> id de productos.
+    """
+
+    @staticmethod
+    async def allocate(db: AsyncSession, model, base_slug: str, exclude_id: Optional[int] = None) -> str:
+        """
+        Slug libre para base_slug: el mismo base_slug o base_slug-N con el menor
+        N >= 2 disponible. Una sola consulta (slug = base OR slug LIKE 'base-%')
+        en vez de una por sufijo probado.
+        """
+        escaped = base_slug.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        stmt = select(model.slug).where(
+            or_(model.slug == base_slug, model.slug.like(f"{escaped}-%", escape="\\"))
+        )
+        if exclude_id is not None:
+            stmt = stmt.where(model.id != exclude_id)
+        result = await db.execute(stmt)
+        taken = set(result.scalars().all())
+
+        if base_slug not in taken:
+            return base_slug
+
+        suffix = re.compile(rf"^{re.escape(base_slug)}-(\d+)$")
+        used = {int(match.group(1)) for match in map(suffix.match, taken) if match}
+        counter = 2
+        while counter in used:
+            counter += 1
+        return f"{base_slug}-{counter}"
+
+    @staticmethod
+    def cached_product_id(slug: str) -> Optional[int]:
+        product_id = _slug_ids.get(slug)
+        if product_id is not None:
+            _slug_ids.move_to_end(slug)
+        return product_id
+
+    @staticmethod
+    def remember(slug: str, product_id: int) -> None:
+        _slug_ids[slug] = product_id
+        _slug_ids.move_to_end(slug)
+        while len(_slug_ids) > SLUG_CACHE_SIZE:
+            _slug_ids.popitem(last=False)
+
+    @staticmethod
+    def forget(slug: Optional[str]) -> None:
+        """Invalidar un slug (renombrado o eliminado)"""
+        if slug:
+            _slug_ids.pop(slug, None)
@@ -0,0 +1,84 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update, func
+from dotenv import load_dotenv
+from typing import Iterable, List, NamedTuple, Optional
+import os
+
+from app.models.stock_alert import StockAlert, StockAlertLevel
+from app.services.settings_cache import settings_cache
+
+load_dotenv()
+
+LOW_STOCK_DEFAULT_THRESHOLD = int(os.getenv("LOW_STOCK_DEFAULT_THRESHOLD", 5))
+
+
+class StockChange(NamedTuple):
+    """Evento de cambio de stock de un producto (ajuste manual, pedido, edición)"""
+    product_id: int
+    old_stock: int
+    new_stock: int
+    threshold: Optional[int] = None  # Product.low_stock_threshold
+    reference_id: Optional[int] = None  # Pisa el reference_id de InventoryService.record
+
+
+def effective_threshold(threshold: Optional[int]) -> int:
+    return LOW_STOCK_DEFAULT_THRESHOLD if threshold is None else threshold
+
+
+def crossing(change: StockChange) -> Optional[str]:
+    """
+    Nivel alcanzado por el cambio, solo si cruza un umbral:
+    OUT al llegar a 0, LOW al bajar hasta el umbral, 'RECOVERED' al superarlo
+    de nuevo. None si el cambio no cruza nada (el caso común).
+    """
+    threshold = effective_threshold(change.threshold)
+    if change.new_stock <= 0 < change.old_stock:
+        return StockAlertLevel.OUT.value
+    if change.new_stock <= threshold < change.old_stock:
+        return StockAlertLevel.LOW.value
+    if change.old_stock <= threshold < change.new_stock:
+        return "RECOVERED"
+    return None
+
+
+class StockAlertService:
+    """
+    Alertas de stock bajo a partir de eventos de cambio de stock.
+
+    Los endpoints que modifican stock llaman a record() con sus cambios antes del
+    commit, así la alerta queda en la misma transacción. Los cambios que no
+    cruzan un umbral no cuestan ninguna consulta.
+    """
+
+    @staticmethod
+    async def alerts_enabled(db: AsyncSession) -> bool:
+        return bool((await settings_cache.get(db)).low_stock_alerts)
+
+    @staticmethod
+    async def record(db: AsyncSession, changes: Iterable[StockChange]) -> List[StockAlert]:
+        crossings = [(change, level) for change in changes if (level := crossing(change))]
+        if not crossings or not await StockAlertService.alerts_enabled(db):
+            return []
+
+        alerts = []
+        recovered = []
+        for change, level in crossings:
+            if level == "RECOVERED":
+                recovered.append(change.product_id)
+                continue
+            alert = StockAlert(
+                product_id=change.product_id,
+                level=level,
+                stock=change.new_stock,
+                threshold=effective_threshold(change.threshold)
+            )
+            db.add(alert)
+            alerts.append(alert)
+
+        if recovered:
+            await db.execute(
+                update(StockAlert)
+                .where(StockAlert.product_id.in_(recovered), StockAlert.resolved_at.is_(None))
+                .values(resolved_at=func.now())
+            )
+        return alerts
@@ -0,0 +1,108 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, case
+from dotenv import load_dotenv
+from typing import Dict, List, NamedTuple
+import os
+
+from app.models.product import Product
+from app.services.audit_service import AuditService
+from app.models.inventory import MovementReason
+from app.services.inventory_service import InventoryService
+from app.services.stock_alert_service import StockChange
+
+load_dotenv()
+
+STOCK_BATCH_MAX_LINES = int(os.getenv("STOCK_BATCH_MAX_LINES", 1000))
+
+
+class StockAdjustmentLine(NamedTuple):
+    line: int  # Número de línea (1 = primera) para reportar resultados
+    product_id: int
+    adjustment: int
+    reason: str
+
+
+class StockConflictError(Exception):
+    """El UPDATE no aplicó lo que la validación previa esperaba"""
+
+
+class StockService:
+    """
+    Ajustes de stock en lote: una transacción, un SELECT ... FOR UPDATE, un
+    UPDATE por conjunto (CASE por id) con la no negatividad validada en SQL y
+    los registros de auditoría en un solo executemany (AuditService).
+    """
+
+    @staticmethod
+    async def apply_adjustments(
+        db: AsyncSession,
+        user_id: int,
+        lines: List[StockAdjustmentLine],
+        atomic: bool = False
+    ) -> List[dict]:
+        """
+        Aplica los ajustes válidos y retorna un resultado por línea
+        (status 'applied', 'error' o 'skipped' si atomic=True y hubo errores).
+        No hace commit.
+        """
+        product_ids = {line.product_id for line in lines}
+        result = await db.execute(
+            select(Product.id, Product.stock, Product.low_stock_threshold)
+            .where(Product.id.in_(product_ids))
+            .with_for_update()
+        )
+        products = {row.id: row for row in result.all()}
+
+        results = []
+        deltas: Dict[int, int] = {}
+        seen = set()
+        for line in lines:
+            item = {"line": line.line, "product_id": line.product_id, "adjustment": line.adjustment,
+                    "status": "error", "old_stock": None, "new_stock": None, "error": None}
+            results.append(item)
+            product = products.get(line.product_id)
+            if product is None:
+                item["error"] = "Producto no encontrado"
+            elif line.product_id in seen:
+                item["error"] = "Producto repetido en el lote"
+            elif line.adjustment == 0:
+                item["error"] = "El ajuste no puede ser 0"
+            elif product.stock + line.adjustment < 0:
+                item["old_stock"] = product.stock
+                item["error"] = f"Stock insuficiente. Stock actual: {product.stock}"
+            else:
+                item.update(status="applied", old_stock=product.stock, new_stock=product.stock + line.adjustment)
+                deltas[line.product_id] = line.adjustment
+            seen.add(line.product_id)
+
+        has_errors = len(deltas) < len(lines)
+        if not deltas or (atomic and has_errors):
+            for item in results:
+                if item["status"] == "applied":
+                    item.update(status="skipped", new_stock=None)
+            return results
+
+        delta = case(deltas, value=Product.id)
+        updated = await db.execute(
+            update(Product)
+            .where(Product.id.in_(deltas), Product.stock + delta >= 0)
+            .values(stock=Product.stock + delta)
+            .execution_options(synchronize_session=False)
+        )
+        if updated.rowcount != len(deltas):
+            raise StockConflictError("El stock cambió durante el ajuste, reintente")
+
+        applied = {item["line"]: item for item in results if item["status"] == "applied"}
+        await AuditService.log(db, [
+            AuditService.stock_adjustment(
+                user_id, line.product_id, applied[line.line]["old_stock"], applied[line.line]["new_stock"], line.reason
+            )
+            for line in lines if line.line in applied
+        ])
+
+        await InventoryService.record(db, [
+            StockChange(item["product_id"], item["old_stock"], item["new_stock"],
+                        products[item["product_id"]].low_stock_threshold)
+            for item in applied.values()
+        ], MovementReason.ADJUSTMENT, user_id=user_id)
+        return results
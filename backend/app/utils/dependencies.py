@@ -15,6 +15,8 @@ async def get_current_user(
     """
     Dependency para obtener usuario actual desde JWT.
     Valida el token y retorna el usuario.
+    Se lee del primario con la sesión de get_db (la misma del endpoint en las
+    rutas de escritura): is_active y el rol nunca vienen de una réplica atrasada.
     """
     token = credentials.credentials
     
@@ -1,29 +1,67 @@
+import base64
 import re
-from typing import Optional
+import unicodedata
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Tuple
 
+# Letras que NFKD no descompone en letra base + acento. Son raras: un regex
+# precompilado las busca más rápido que str.translate con un dict
+_TRANSLITERATIONS = {
+    'ß': 'ss', 'æ': 'ae', 'œ': 'oe', 'ø': 'o', 'đ': 'd', 'ð': 'd',
+    'þ': 'th', 'ł': 'l', 'ı': 'i', 'ħ': 'h', 'ŧ': 't', 'ŋ': 'n',
+}
+_TRANSLITERATE = re.compile('[' + ''.join(_TRANSLITERATIONS) + ']')
+
+# ASCII: espacios y guiones pasan a separador (b' '), se borra todo lo que no
+# sea letra, dígito o separador. bytes.translate hace las dos cosas en C
+_ASCII = bytes(range(128))
+_SEPARATORS = bytes(c for c in _ASCII if chr(c).isspace() or c == ord('-'))
+_SLUG_TABLE = bytes.maketrans(_SEPARATORS, b' ' * len(_SEPARATORS))
+_SLUG_DELETE = bytes(c for c in _ASCII if not chr(c).isalnum() and c not in _SEPARATORS)
+
+@lru_cache(maxsize=4096)
 def slugify(text: str) -> str:
     """
     Convert text to URL-friendly slug.
     Example: "Electrónica y Tecnología" -> "electronica-y-tecnologia"
+             "Crème brûlée" -> "creme-brulee"
     """
     # Convert to lowercase
     text = text.lower()
-    
-    # Replace spanish characters
-    replacements = {
-        'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ú': 'u',
-        'ñ': 'n', 'ü': 'u'
-    }
-    for old, new in replacements.items():
-        text = text.replace(old, new)
-    
-    # Remove any character that isn't alphanumeric or space
-    text = re.sub(r'[^a-z0-9\s-]', '', text)
-    
-    # Replace spaces and multiple hyphens with single hyphen
-    text = re.sub(r'[\s-]+', '-', text)
-    
-    # Remove leading/trailing hyphens
-    text = text.strip('-')
-    
-    return text
+
+    if text.isascii():
+        data = text.encode('ascii')
+    else:
+        # Transliterate, split accented letters (é -> e + ´) and drop
+        # accents and any other non-ASCII character
+        text = _TRANSLITERATE.sub(lambda match: _TRANSLITERATIONS[match.group()], text)
+        text = unicodedata.normalize('NFKD', text)
+        data = text.encode('ascii', 'ignore')
+
+    # One pass over the translation table, then collapse separators
+    data = data.translate(_SLUG_TABLE, _SLUG_DELETE)
+    return b'-'.join(data.split()).decode('ascii')
+
+
+def fold(text: Optional[str]) -> str:
+    """Minúsculas y sin acentos, como la collation utf8mb4_unicode_ci de MySQL"""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque keyset-pagination cursor for the position (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor. Raises ValueError if the cursor is invalid."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
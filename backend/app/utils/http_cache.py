@@ -0,0 +1,79 @@
+from fastapi import Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from dotenv import load_dotenv
+from decimal import Decimal
+from typing import Any
+import hashlib
+import os
+
+from app.models.catalog_change import CatalogChange
+
+load_dotenv()
+
+# Políticas de Cache-Control por tipo de recurso
+CATALOG_CACHE_CONTROL = os.getenv("CATALOG_CACHE_CONTROL", "public, max-age=60, stale-while-revalidate=300")
+ORDER_CACHE_CONTROL = os.getenv("ORDER_CACHE_CONTROL", "private, no-cache")
+
+
+def catalog_version_columns(*tables) -> list:
+    """
+    Subconsultas escalares con la suma de los contadores de catalog_changes
+    por tabla (cambios y bajas físicas), para agregar a cualquier SELECT.
+    """
+    columns = []
+    for table in tables:
+        name = table.__tablename__
+        for key in (name, name + ".deleted"):
+            columns.append(
+                select(func.coalesce(func.sum(CatalogChange.version), 0))
+                .where(CatalogChange.table_name == key)
+                .scalar_subquery()
+            )
+    return columns
+
+
+def _plain(value):
+    # SUM() de MySQL devuelve Decimal: int para que la versión sea estable
+    return int(value) if isinstance(value, Decimal) else value
+
+
+async def catalog_version(db: AsyncSession, *tables, extra: tuple = ()) -> tuple:
+    """
+    Sondeo barato de cambios: los contadores de catalog_changes de cada
+    tabla, en una sola consulta. Cada commit que toca la tabla incrementa el
+    contador, aunque caiga en el mismo segundo.
+    extra: subconsultas escalares adicionales para la misma consulta.
+    """
+    result = await db.execute(select(*extra, *catalog_version_columns(*tables)))
+    return tuple(_plain(value) for value in result.one())
+
+
+def make_etag(*parts: Any) -> str:
+    """ETag débil a partir de valores baratos de obtener (updated_at, conteos, ids)"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True si el If-None-Match del cliente incluye el ETag actual"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Comparación débil: se ignora el prefijo W/
+    current = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == current for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
@@ -32,10 +32,36 @@ def validate_image(file: UploadFile) -> None:
             detail=f"File too large. Maximum size: {MAX_FILE_SIZE // 1024 // 1024}MB"
         )
 
-async def save_upload_file(file: UploadFile) -> Tuple[str, str]:
+def create_thumbnail(filename: str) -> str:
+    """
+    Create the 300x300 thumbnail of an uploaded image.
+    Returns the thumbnail URL. Raises if the image can't be processed.
+    """
+    file_path = UPLOAD_DIR / filename
+    thumbnail_path = THUMBNAIL_DIR / filename
+    
+    with Image.open(file_path) as img:
+        # Convert RGBA to RGB if necessary
+        if img.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+            img = background
+        
+        # Create thumbnail
+        img.thumbnail((300, 300), Image.Resampling.LANCZOS)
+        img.save(thumbnail_path, quality=85, optimize=True)
+    
+    return f"/uploads/products/thumbnails/{filename}"
+
+async def save_upload_file(file: UploadFile, defer_thumbnail: bool = False) -> Tuple[str, Optional[str]]:
     """
     Save uploaded image and create thumbnail.
     Returns tuple: (image_url, thumbnail_url)
+    
+    With defer_thumbnail=True the image is only verified (no decoding) and
+    thumbnail_url is None: the caller enqueues the 'create_thumbnail' job.
     """
     validate_image(file)
     
@@ -45,7 +71,6 @@ async def save_upload_file(file: UploadFile) -> Tuple[str, str]:
     
     # Save original image
     file_path = UPLOAD_DIR / filename
-    thumbnail_path = THUMBNAIL_DIR / filename
     
     # Read file content
     content = await file.read()
@@ -54,22 +79,15 @@ async def save_upload_file(file: UploadFile) -> Tuple[str, str]:
     with open(file_path, 'wb') as f:
         f.write(content)
     
-    # Create thumbnail (300x300)
     try:
-        with Image.open(file_path) as img:
-            # Convert RGBA to RGB if necessary
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                img = background
-            
-            # Create thumbnail
-            img.thumbnail((300, 300), Image.Resampling.LANCZOS)
-            img.save(thumbnail_path, quality=85, optimize=True)
+        if defer_thumbnail:
+            with Image.open(file_path) as img:
+                img.verify()
+            thumbnail_url = None
+        else:
+            thumbnail_url = create_thumbnail(filename)
     except Exception as e:
-        # Clean up original if thumbnail fails
+        # Clean up original if the image is invalid
         if file_path.exists():
             file_path.unlink()
         raise HTTPException(
@@ -79,7 +97,6 @@ async def save_upload_file(file: UploadFile) -> Tuple[str, str]:
     
     # Return relative URLs
     image_url = f"/uploads/products/{filename}"
-    thumbnail_url = f"/uploads/products/thumbnails/{filename}"
     
     return image_url, thumbnail_url
 
@@ -0,0 +1,63 @@
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+import bisect
+import threading
+import time
+
+# Límites superiores (ms) de los buckets de espera; el último bucket es +inf
+WAIT_BUCKETS_MS = (0.1, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolWaitMetrics:
+    """Tiempo de espera para obtener una conexión del pool (por proceso)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def observe(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            if wait_ms > self.max_wait_ms:
+                self.max_wait_ms = wait_ms
+            self.buckets[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"<={bound}ms" for bound in WAIT_BUCKETS_MS] + ["+inf"]
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "histogram": dict(zip(labels, self.buckets)),
+            }
+
+
+pool_wait_metrics = PoolWaitMetrics()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool que mide cuánto espera cada checkout"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_wait_metrics.observe(0, timed_out=True)
+            raise
+        pool_wait_metrics.observe((time.perf_counter() - start) * 1000)
+        return connection
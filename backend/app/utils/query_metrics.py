@@ -0,0 +1,203 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from contextvars import ContextVar
+from functools import lru_cache
+from dotenv import load_dotenv
+from typing import Optional
+import bisect
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+load_dotenv()
+
+# Configuración (variables de entorno)
+SQL_METRICS_ENABLED = os.getenv("SQL_METRICS_ENABLED", "true").lower() == "true"
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", 200))
+SQL_SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SQL_SLOW_QUERY_SAMPLE_RATE", 1.0))
+SQL_DEBUG_HEADERS = os.getenv("SQL_DEBUG_HEADERS", "false").lower() == "true"
+
+# Límites superiores (ms) de los buckets del histograma; el último bucket es +inf
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+MAX_FINGERPRINTS = 500
+
+logger = logging.getLogger("app.sql")
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s|\?|:\w+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_LIST = re.compile(r"(\(\?(?:, \?)*\))(?:\s*,\s*\(\?(?:, \?)*\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint_statement(statement: str) -> str:
+    """
+    Normalizar SQL para agrupar consultas equivalentes.
+    Ej: "SELECT * FROM products WHERE id IN (%s, %s, %s)" -> "SELECT * FROM products WHERE id IN (?+)"
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    normalized = _VALUES_LIST.sub(r"\1, ...", normalized)
+    normalized = _IN_LIST.sub("(?+)", normalized)
+    return normalized
+
+
+class _StatementStats:
+    __slots__ = ("count", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        self.buckets[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, elapsed_ms)] += 1
+
+    def as_dict(self) -> dict:
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BUCKETS_MS] + ["+inf"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0,
+            "max_ms": round(self.max_ms, 3),
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class QueryMetrics:
+    """Agregados por fingerprint de SQL, compartidos por todo el proceso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[str, _StatementStats] = {}
+        self._overall = _StatementStats()
+        self.slow_queries = 0
+
+    def observe(self, fingerprint: str, elapsed_ms: float) -> None:
+        with self._lock:
+            stats = self._stats.get(fingerprint)
+            if stats is None:
+                if len(self._stats) >= MAX_FINGERPRINTS:
+                    fingerprint = "<other>"
+                    stats = self._stats.setdefault(fingerprint, _StatementStats())
+                else:
+                    stats = self._stats[fingerprint] = _StatementStats()
+            stats.observe(elapsed_ms)
+            self._overall.observe(elapsed_ms)
+
+    def snapshot(self, top: int = 20) -> dict:
+        with self._lock:
+            ranked = sorted(self._stats.items(), key=lambda kv: kv[1].total_ms, reverse=True)[:top]
+            return {
+                "overall": self._overall.as_dict(),
+                "slow_queries": self.slow_queries,
+                "slow_query_threshold_ms": SQL_SLOW_QUERY_MS,
+                "statements": [
+                    {"fingerprint": fp, **stats.as_dict()}
+                    for fp, stats in ranked
+                ],
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._overall = _StatementStats()
+            self.slow_queries = 0
+
+
+query_metrics = QueryMetrics()
+
+
+class RequestQueryStats:
+    __slots__ = ("count", "transactions", "total_ms")
+
+    def __init__(self):
+        self.count = 0
+        self.transactions = 0  # COMMIT / ROLLBACK enviados al servidor
+        self.total_ms = 0.0
+
+    @property
+    def round_trips(self) -> int:
+        return self.count + self.transactions
+
+
+# Contador por request (lo inicializa el middleware de main.py)
+request_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+
+    fingerprint = fingerprint_statement(statement)
+    query_metrics.observe(fingerprint, elapsed_ms)
+
+    stats = request_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+
+    if elapsed_ms >= SQL_SLOW_QUERY_MS:
+        query_metrics.slow_queries += 1
+        if random.random() < SQL_SLOW_QUERY_SAMPLE_RATE:
+            logger.warning(json.dumps({
+                "event": "slow_query",
+                "elapsed_ms": round(elapsed_ms, 3),
+                "threshold_ms": SQL_SLOW_QUERY_MS,
+                "fingerprint": fingerprint,
+                "executemany": executemany,
+            }))
+
+
+def _end_transaction(conn):
+    stats = request_query_stats.get()
+    if stats is not None:
+        stats.transactions += 1
+
+
+def _pool_reset(dbapi_connection, connection_record, reset_state):
+    # ROLLBACK del pool al devolver una conexión cuya transacción no se cerró
+    # (p. ej. tras el commit de la sesión); solo con reset_on_return="rollback"
+    if reset_state.asyncio_safe and not reset_state.transaction_was_reset:
+        _end_transaction(None)
+
+
+def _handle_error(exception_context):
+    # Descartar el tiempo de inicio de la consulta que falló
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine: Engine, pool_resets: bool = True) -> None:
+    """
+    Registrar los eventos de instrumentación en un engine síncrono (usar engine.sync_engine para async).
+    Cuenta cada COMMIT / ROLLBACK que llega al driver: los de las transacciones
+    (también el ROLLBACK al cerrar una conexión en autocommit) y, con
+    pool_resets, el rollback-on-return del pool.
+    """
+    if not SQL_METRICS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    event.listen(engine, "commit", _end_transaction)
+    event.listen(engine, "rollback", _end_transaction)
+    if pool_resets:
+        event.listen(engine.pool, "reset", _pool_reset)
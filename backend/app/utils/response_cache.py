@@ -0,0 +1,102 @@
+from fastapi import Request, Response
+from collections import OrderedDict
+from dotenv import load_dotenv
+from typing import Dict, Optional
+import os
+import threading
+
+from app.utils.compression import COMPRESSION_MIN_SIZE, compress, negotiate_encoding
+
+load_dotenv()
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 256))
+
+
+class CachedBody:
+    """Cuerpo JSON de una respuesta con sus variantes comprimidas (creadas bajo demanda)"""
+
+    __slots__ = ("identity", "_encoded")
+
+    def __init__(self, identity: bytes):
+        self.identity = identity
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        body = self._encoded.get(encoding)
+        if body is None:
+            # Mismos niveles que CompressionMiddleware: se comprime en el event loop,
+            # con el primer request de cada versión (brotli 11 tarda ~100x más que 4)
+            body = compress(self.identity, encoding)
+            self._encoded[encoding] = body
+        return body
+
+
+class ResponseCache:
+    """
+    LRU en memoria de respuestas del catálogo, indexado por (clave, ETag).
+    Como el ETag cambia con cada escritura, una entrada vieja nunca se sirve:
+    simplemente deja de coincidir y sale del LRU.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[str, CachedBody]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, etag: str) -> Optional[CachedBody]:
+        if not RESPONSE_CACHE_ENABLED:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, etag: str, body: bytes) -> CachedBody:
+        cached = CachedBody(body)
+        if not RESPONSE_CACHE_ENABLED:
+            return cached
+        with self._lock:
+            self._entries[key] = (etag, cached)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+catalog_cache = ResponseCache()
+
+
+def cached_response(request: Request, cached: CachedBody, headers: Dict[str, str]) -> Response:
+    """
+    Responder con los bytes cacheados, ya comprimidos si el cliente lo acepta.
+    El Content-Encoding hace que CompressionMiddleware no vuelva a comprimir.
+    """
+    headers = dict(headers)
+    headers["Vary"] = "Accept-Encoding"
+    encoding = None
+    if len(cached.identity) >= COMPRESSION_MIN_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding is None:
+        return Response(cached.identity, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(cached.encoded(encoding), media_type="application/json", headers=headers)
@@ -0,0 +1,27 @@
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from decimal import Decimal
+from typing import Any
+import orjson
+
+
+def _default(obj: Any) -> Any:
+    # Decimal como string (igual que Pydantic en modo JSON), sin pasar por float
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse serializada con orjson (datetime/enum nativos, Decimal como string)"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
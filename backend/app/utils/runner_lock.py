@@ -0,0 +1,45 @@
+from dotenv import load_dotenv
+from typing import IO, Optional
+import logging
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin flock, cada proceso se considera el único
+    fcntl = None
+
+load_dotenv()
+
+logger = logging.getLogger("app.runner_lock")
+
+# false en los servidores que no deben correr las tareas compartidas (varios hosts, o cron)
+BACKGROUND_TASKS_ENABLED = os.getenv("BACKGROUND_TASKS_ENABLED", "true").lower() == "true"
+BACKGROUND_LOCK_FILE = os.getenv(
+    "BACKGROUND_LOCK_FILE", os.path.join(tempfile.gettempdir(), "ventas-background.lock")
+)
+
+_lock_file: Optional[IO] = None
+
+
+def acquire_background_lock() -> bool:
+    """
+    True si este proceso corre las tareas de fondo compartidas (recálculos,
+    jobs, vencimientos). Entre los workers de uvicorn de un host lo obtiene
+    solo el primero (flock no bloqueante); el sistema lo libera cuando el
+    proceso termina, y el worker que lo reemplaza lo vuelve a tomar.
+    """
+    global _lock_file
+    if not BACKGROUND_TASKS_ENABLED:
+        return False
+    if _lock_file is not None or fcntl is None:
+        return True
+    lock_file = open(BACKGROUND_LOCK_FILE, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _lock_file = lock_file
+    logger.info("tareas de fondo compartidas en el proceso %s", os.getpid())
+    return True
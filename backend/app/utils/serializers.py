@@ -0,0 +1,73 @@
+"""
+Serialización directa de modelos ORM a dicts para endpoints de listado.
+
+Los endpoints que retornan ORJSONResponse con estos dicts evitan construir un
+modelo Pydantic por item y que FastAPI lo vuelva a validar con response_model.
+Las claves deben coincidir con los schemas de app/schemas (usados en OpenAPI).
+"""
+from typing import Optional
+
+
+def primary_image(product):
+    """Imagen principal del producto (o la primera si ninguna está marcada)"""
+    image = next((img for img in product.images if img.is_primary), None)
+    if not image and product.images:
+        image = product.images[0]
+    return image
+
+
+def category_base(category) -> Optional[dict]:
+    """Equivalente a schemas.product.CategoryBase"""
+    if category is None:
+        return None
+    return {"name": category.name, "slug": category.slug}
+
+
+def category_response(category) -> dict:
+    """Equivalente a schemas.category.CategoryResponse"""
+    return {
+        "id": category.id,
+        "name": category.name,
+        "slug": category.slug,
+        "description": category.description,
+        "image_url": category.image_url,
+        "is_active": category.is_active,
+        "created_at": category.created_at,
+        "updated_at": category.updated_at,
+    }
+
+
+def product_list_item(product, image_url: Optional[str] = None) -> dict:
+    """Equivalente a schemas.product.ProductListItem"""
+    return {
+        "id": product.id,
+        "name": product.name,
+        "slug": product.slug,
+        "category_id": product.category_id,
+        "category": category_base(product.category),
+        "price": product.price,
+        "stock": product.stock,
+        "is_active": product.is_active,
+        "image_url": image_url,
+    }
+
+
+def product_list_item_with_thumbnail(product) -> dict:
+    """
+    ProductListItem con el thumbnail de la imagen principal (la imagen
+    original mientras el job 'create_thumbnail' no termina)
+    """
+    image = primary_image(product)
+    return product_list_item(product, (image.thumbnail_url or image.image_url) if image else None)
+
+
+def order_list_item(order) -> dict:
+    """Equivalente a schemas.order_schemas.OrderListResponse"""
+    return {
+        "id": order.id,
+        "order_number": order.order_number,
+        "shipping_full_name": order.shipping_full_name,
+        "total": order.total,
+        "status": order.status,
+        "created_at": order.created_at,
+    }
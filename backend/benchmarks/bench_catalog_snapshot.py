@@ -0,0 +1,161 @@
+"""
+Benchmark: listado público resuelto con el snapshot en memoria (numpy)
+contra el camino SQL, con catálogos sintéticos de 10k, 100k y 1M productos.
+
+El camino SQL se mide con SQLite en memoria (mismas consultas: COUNT, página
+ordenada y las imágenes de la página, con los índices del schema de MySQL).
+No incluye la latencia de red de MySQL, así que es una cota inferior.
+
+Uso:
+    python benchmarks/bench_catalog_snapshot.py [tamaños...]
+    python benchmarks/bench_catalog_snapshot.py 10000 100000
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.services.catalog_snapshot import CatalogSnapshot, np
+
+SIZES = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+CATEGORIES = 40
+REPEAT = 20
+
+WORDS = ["rosas", "rojas", "tulipanes", "girasoles", "ramo", "caja", "chocolates", "peluche", "orquídea", "premium"]
+
+# (descripción, category_id, search, min_price, max_price, sort_by, limit, offset)
+SCENARIOS = [
+    ("home: newest, página 1", None, None, None, None, "newest", 8, 0),
+    ("categoría + rango de precio", 7, None, 50.0, 150.0, "price_asc", 24, 0),
+    ("búsqueda 'tulipanes'", None, "tulipanes", None, None, "newest", 24, 0),
+    ("orden por nombre, página 50", None, None, None, None, "name", 24, 24 * 49),
+]
+
+
+def make_rows(n, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for i in range(1, n + 1):
+        yield (
+            i,
+            rng.randint(1, CATEGORIES),
+            " ".join(rng.sample(WORDS, 3)) + f" {i}",
+            Decimal(rng.randint(1000, 50000)) / 100,
+            rng.randint(0, 50),
+            start + timedelta(minutes=rng.randint(0, 60 * 24 * 600)),
+        )
+
+
+def as_products(rows):
+    categories = {i: SimpleNamespace(name=f"Categoría {i}", slug=f"categoria-{i}") for i in range(1, CATEGORIES + 1)}
+    for product_id, category_id, name, price, stock, created_at in rows:
+        yield SimpleNamespace(
+            id=product_id, category_id=category_id, category=categories[category_id],
+            name=name, slug=f"producto-{product_id}", description=None,
+            price=price, stock=stock, is_active=True, created_at=created_at,
+            images=[SimpleNamespace(is_primary=True, thumbnail_url=f"/uploads/products/thumbnails/{product_id}.jpg")],
+        )
+
+
+def build_sqlite(n):
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE products (
+            id INTEGER PRIMARY KEY, category_id INTEGER, name TEXT, description TEXT,
+            price NUMERIC, stock INTEGER, is_active INTEGER, created_at TEXT
+        );
+        CREATE TABLE product_images (
+            id INTEGER PRIMARY KEY, product_id INTEGER, thumbnail_url TEXT, is_primary INTEGER
+        );
+        CREATE INDEX idx_category ON products(category_id);
+        CREATE INDEX idx_name ON products(name);
+        CREATE INDEX idx_price ON products(price);
+        CREATE INDEX idx_active ON products(is_active);
+        CREATE INDEX idx_images_product ON product_images(product_id);
+    """)
+    conn.executemany(
+        "INSERT INTO products VALUES (?, ?, ?, NULL, ?, ?, 1, ?)",
+        ((i, c, name, float(price), stock, created.isoformat()) for i, c, name, price, stock, created in make_rows(n))
+    )
+    conn.executemany(
+        "INSERT INTO product_images (product_id, thumbnail_url, is_primary) VALUES (?, ?, 1)",
+        ((i, f"/uploads/products/thumbnails/{i}.jpg") for i in range(1, n + 1))
+    )
+    conn.commit()
+    return conn
+
+
+ORDER_BY = {
+    "newest": "created_at DESC, id DESC",
+    "price_asc": "price ASC, id",
+    "price_desc": "price DESC, id",
+    "name": "name ASC, id",
+}
+
+
+def sql_page(conn, category_id, search, min_price, max_price, sort_by, limit, offset):
+    where, params = ["is_active = 1", "stock > 0"], []
+    if category_id:
+        where.append("category_id = ?"); params.append(category_id)
+    if min_price is not None:
+        where.append("price >= ?"); params.append(min_price)
+    if max_price is not None:
+        where.append("price <= ?"); params.append(max_price)
+    if search:
+        where.append("(name LIKE ? OR description LIKE ?)"); params += [f"%{search}%"] * 2
+    clause = " AND ".join(where)
+    total = conn.execute(f"SELECT COUNT(*) FROM products WHERE {clause}", params).fetchone()[0]
+    rows = conn.execute(
+        f"SELECT * FROM products WHERE {clause} ORDER BY {ORDER_BY[sort_by]} LIMIT ? OFFSET ?",
+        params + [limit, offset]
+    ).fetchall()
+    ids = [row[0] for row in rows]
+    if ids:
+        conn.execute(
+            f"SELECT * FROM product_images WHERE product_id IN ({','.join('?' * len(ids))})", ids
+        ).fetchall()
+    return ids, total
+
+
+def best_ms(fn):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+if __name__ == "__main__":
+    if np is None:
+        sys.exit("numpy no está instalado: pip install numpy")
+
+    for n in SIZES:
+        print(f"\n=== {n:,} productos ===")
+
+        start = time.perf_counter()
+        snapshot = CatalogSnapshot()
+        snapshot.load(as_products(make_rows(n)), version=(n,))
+        print(f"carga del snapshot: {time.perf_counter() - start:.2f} s")
+
+        start = time.perf_counter()
+        conn = build_sqlite(n)
+        print(f"carga de SQLite:    {time.perf_counter() - start:.2f} s")
+
+        print(f"{'escenario':<32} {'SQL (ms)':>10} {'snapshot (ms)':>14} {'total':>8}")
+        for label, *args in SCENARIOS:
+            sql_ids, sql_total = sql_page(conn, *args)
+            items, snap_total = snapshot.query(*args)
+            assert snap_total == sql_total, f"{label}: total {snap_total} != {sql_total}"
+            sql_ms = best_ms(lambda: sql_page(conn, *args))
+            snap_ms = best_ms(lambda: snapshot.query(*args))
+            print(f"{label:<32} {sql_ms:>10.2f} {snap_ms:>14.3f} {snap_total:>8}")
+
+        conn.close()
+        del snapshot
@@ -0,0 +1,109 @@
+"""
+Load test de POST /public/orders (pedidos/seg) con 1, 5 y 20 items por pedido.
+
+Cada pedido descuenta stock: usar una base de prueba con stock alto en los
+productos indicados (p. ej. UPDATE products SET stock = 1000000 WHERE id <= 20).
+Con SQL_DEBUG_HEADERS=true también muestra las consultas y round trips por pedido.
+
+Uso (con el servidor corriendo):
+    SQL_DEBUG_HEADERS=true APP_ENV=production WEB_CONCURRENCY=1 python main.py
+    python benchmarks/bench_create_order.py --url http://127.0.0.1:8000 --products 1-20 --concurrency 16 --duration 20
+
+Correr antes y después de un cambio en create_order y anotar los resultados.
+Solo usa la librería estándar (HTTP/1.1 keep-alive sobre asyncio).
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+ITEM_COUNTS = [1, 5, 20]
+
+
+def parse_products(value: str):
+    """'1-20' o '1,4,7'"""
+    if "-" in value:
+        first, last = value.split("-")
+        return list(range(int(first), int(last) + 1))
+    return [int(product_id) for product_id in value.split(",")]
+
+
+async def _read_response(reader: asyncio.StreamReader):
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers
+
+
+async def _client(host, port, body, deadline, latencies, errors, round_trips):
+    reader, writer = await asyncio.open_connection(host, port)
+    request = (
+        f"POST /api/v1/public/orders HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            status, headers = await _read_response(reader)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status >= 400:
+                errors.append(status)
+            elif "x-round-trips" in headers:
+                round_trips.append(int(headers["x-round-trips"]))
+    finally:
+        writer.close()
+
+
+async def run_case(host, port, products, items, concurrency, duration):
+    body = json.dumps({
+        "customer_name": "Load test",
+        "customer_phone": "999999999",
+        "shipping_address": "Av. Prueba 123",
+        "district": "Miraflores",
+        "city": "Lima",
+        "items": [{"product_id": product_id, "quantity": 1} for product_id in products[:items]],
+    }).encode()
+    latencies, errors, round_trips = [], [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _client(host, port, body, deadline, latencies, errors, round_trips)
+        for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] if latencies else 0
+    ok = len(latencies) - len(errors)
+    print(f"{items:>5} {ok / elapsed:>10.1f} {len(errors):>8} {p(0.50):>8.1f} {p(0.95):>8.1f} "
+          f"{statistics.fmean(round_trips) if round_trips else float('nan'):>12.1f}")
+
+
+async def run(url, products, concurrency, duration):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    print(f"{'items':>5} {'pedidos/s':>10} {'errores':>8} {'p50 ms':>8} {'p95 ms':>8} {'round trips':>12}")
+    for items in ITEM_COUNTS:
+        if items > len(products):
+            print(f"{items:>5} (faltan productos: --products debe tener al menos {items})")
+            continue
+        await run_case(host, port, products, items, concurrency, duration)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test de creación de pedidos")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--products", default="1-20", help="IDs de productos activos: '1-20' o '1,4,7'")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, parse_products(args.products), args.concurrency, args.duration))
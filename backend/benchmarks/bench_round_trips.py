@@ -0,0 +1,64 @@
+"""
+Round trips a la base de datos por request.
+
+Requiere el servidor corriendo con SQL_DEBUG_HEADERS=true, que agrega
+X-Query-Count y X-Round-Trips (consultas + COMMIT/ROLLBACK) a cada respuesta.
+
+Uso:
+    SQL_DEBUG_HEADERS=true python main.py
+    python benchmarks/bench_round_trips.py --url http://127.0.0.1:8000 --token <admin_jwt> --order-id 1
+
+El pre-ping del pool (un SELECT 1 por checkout) no se incluye en el conteo.
+"""
+import argparse
+import json
+import urllib.request
+from urllib.error import HTTPError
+
+
+def _request(base_url, method, path, token=None, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method)
+    req.add_header("Content-Type", "application/json")
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, response.headers
+    except HTTPError as e:
+        return e.code, e.headers
+
+
+def run(base_url, token, order_id, product_slug):
+    cases = [
+        ("GET", "/api/v1/public/categories", None, False),
+        ("GET", "/api/v1/public/products?limit=24", None, False),
+        ("GET", f"/api/v1/public/products/{product_slug}", None, False),
+    ]
+    if token:
+        cases += [
+            ("GET", "/api/v1/admin/products?limit=20", None, True),
+            ("GET", "/api/v1/admin/analytics/summary", None, True),
+            ("GET", "/api/v1/admin/stock/history", None, True),
+        ]
+        if order_id:
+            cases.append((
+                "PUT", f"/api/v1/admin/orders/{order_id}/status",
+                {"status": "WAITING_CONTACT"}, True
+            ))
+
+    print(f"{'endpoint':<55} {'status':>6} {'queries':>8} {'round trips':>12}")
+    for method, path, body, needs_auth in cases:
+        status, headers = _request(base_url, method, path, token if needs_auth else None, body)
+        print(f"{method + ' ' + path:<55} {status:>6} "
+              f"{headers.get('X-Query-Count', '-'):>8} {headers.get('X-Round-Trips', '-'):>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Round trips a la BD por endpoint")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", help="JWT de un admin (para endpoints /admin)")
+    parser.add_argument("--order-id", type=int, help="Pedido para probar PUT /admin/orders/{id}/status")
+    parser.add_argument("--product-slug", default="laptop-hp-15")
+    args = parser.parse_args()
+    run(args.url, args.token, args.order_id, args.product_slug)
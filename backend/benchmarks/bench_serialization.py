@@ -0,0 +1,84 @@
+"""
+Microbenchmark: serialización de una página de 100 productos.
+
+Compara el camino anterior (ProductListItem por item + ProductListResponse,
+re-validado por response_model y serializado con json estándar) contra el
+actual (dicts directos + orjson con Decimal como string).
+
+Uso:
+    python benchmarks/bench_serialization.py
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import timeit
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from app.schemas.product import ProductListItem, ProductListResponse
+from app.utils.responses import ORJSONResponse
+from app.utils.serializers import product_list_item_with_thumbnail
+
+PAGE_SIZE = 100
+ROUNDS = 200
+
+
+def make_products(n):
+    category = SimpleNamespace(name="Rosas", slug="rosas")
+    now = datetime.now()
+    return [
+        SimpleNamespace(
+            id=i,
+            name=f"Ramo de rosas {i}",
+            slug=f"ramo-de-rosas-{i}",
+            category_id=1,
+            category=category,
+            price=Decimal("89.90") + i,
+            stock=10 + i,
+            is_active=True,
+            created_at=now,
+            images=[
+                SimpleNamespace(is_primary=False, thumbnail_url=f"/uploads/products/thumbnails/{i}-a.jpg"),
+                SimpleNamespace(is_primary=True, thumbnail_url=f"/uploads/products/thumbnails/{i}-b.jpg"),
+            ],
+        )
+        for i in range(n)
+    ]
+
+
+def old_path(products):
+    items = []
+    for p in products:
+        primary_image = next((img for img in p.images if img.is_primary), None)
+        items.append(ProductListItem(
+            id=p.id, name=p.name, slug=p.slug, category_id=p.category_id,
+            category=p.category, price=p.price, stock=p.stock, is_active=p.is_active,
+            image_url=primary_image.thumbnail_url if primary_image else None
+        ))
+    response = ProductListResponse(items=items, total=1000, page=1, pages=10, limit=PAGE_SIZE)
+    # Lo que hace FastAPI con response_model: dump, re-validar y serializar
+    validated = ProductListResponse.model_validate(response.model_dump())
+    content = jsonable_encoder(validated.model_dump(mode="json"))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def new_path(products):
+    content = {
+        "items": [product_list_item_with_thumbnail(p) for p in products],
+        "total": 1000, "page": 1, "pages": 10, "limit": PAGE_SIZE, "facets": None,
+    }
+    return ORJSONResponse(content).body
+
+
+if __name__ == "__main__":
+    products = make_products(PAGE_SIZE)
+    assert json.loads(old_path(products)) == json.loads(new_path(products)), "Las salidas difieren"
+
+    for name, fn in (("pydantic + json", old_path), ("dicts + orjson", new_path)):
+        seconds = min(timeit.repeat(lambda: fn(products), number=ROUNDS, repeat=5)) / ROUNDS
+        print(f"{name:<18} {seconds * 1000:.3f} ms por página de {PAGE_SIZE} items")
@@ -0,0 +1,62 @@
+"""
+Microbenchmark: slugify anterior (dict de str.replace + dos regex sin
+precompilar) contra el actual (translate + NFKD + regex precompiladas + LRU).
+
+Mide el costo sin caché (slugify.__wrapped__) y con caché (nombres repetidos,
+como en importaciones masivas o asignación de slugs), y verifica que para
+texto en español ambos generan el mismo slug.
+
+Uso:
+    python benchmarks/bench_slugify.py
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import re
+import timeit
+
+from app.utils.helpers import slugify
+
+ROUNDS = 20
+
+
+def old_slugify(text: str) -> str:
+    text = text.lower()
+    replacements = {
+        'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ú': 'u',
+        'ñ': 'n', 'ü': 'u'
+    }
+    for old, new in replacements.items():
+        text = text.replace(old, new)
+    text = re.sub(r'[^a-z0-9\s-]', '', text)
+    text = re.sub(r'[\s-]+', '-', text)
+    return text.strip('-')
+
+
+SPANISH = [
+    "Ramo de Rosas Rojas", "Caja de Chocolates Surtidos", "Peluche Osito Cariñoso",
+    "Orquídea Phalaenopsis", "Arreglo Floral Corazón", "Tulipanes Holandeses",
+    "Girasoles del Perú", "Vino Tinto Reserva", "Tarjeta de Cumpleaños", "Canasta Pingüino",
+]
+FOREIGN = ["Crème brûlée", "Straße", "Smørrebrød", "Æbleskiver", "Łódź", "Ｆｕｌｌｗｉｄｔｈ"]
+
+
+def make_names(n, seed=7):
+    rng = random.Random(seed)
+    return [f"{rng.choice(SPANISH)} {rng.choice(['', 'Grande', 'Mediano', 'Pequeño', 'Edición Día de la Madre'])} {i % 50}"
+            for i in range(n)]
+
+
+if __name__ == "__main__":
+    for text in SPANISH:
+        assert slugify(text) == old_slugify(text), text
+    for text in FOREIGN:
+        print(f"{text!r:<22} anterior: {old_slugify(text)!r:<16} actual: {slugify(text)!r}")
+
+    names = make_names(1000)
+    cold = slugify.__wrapped__
+    for label, fn in (("anterior", old_slugify), ("actual sin caché", cold), ("actual con caché", slugify)):
+        seconds = min(timeit.repeat(lambda: [fn(name) for name in names], number=ROUNDS, repeat=5)) / ROUNDS
+        print(f"{label:<18} {seconds / len(names) * 1e6:.2f} µs por nombre")
@@ -0,0 +1,95 @@
+"""
+Load test de los endpoints del catálogo (requests/seg).
+
+Uso (con el servidor corriendo):
+    APP_ENV=production WEB_CONCURRENCY=1 python main.py
+    python benchmarks/bench_workers.py --url http://127.0.0.1:8000 --concurrency 64 --duration 20
+
+Repetir con WEB_CONCURRENCY=1, 2, 4, ... N y anotar los resultados en README.md.
+Solo usa la librería estándar (HTTP/1.1 keep-alive sobre asyncio).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+CATALOG_PATHS = [
+    "/api/v1/public/categories",
+    "/api/v1/public/products?limit=8&page=1",
+    "/api/v1/public/products?limit=24&page=1&sort_by=price_asc",
+    "/api/v1/public/products?limit=100&page=1",
+]
+
+
+async def _read_response(reader: asyncio.StreamReader) -> int:
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value.strip())
+        elif name == "transfer-encoding" and "chunked" in value:
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(length)
+    return status
+
+
+async def _client(host, port, deadline, latencies, errors, offset):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            path = CATALOG_PATHS[i % len(CATALOG_PATHS)]
+            i += 1
+            request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n"
+            start = time.perf_counter()
+            writer.write(request.encode())
+            status = await _read_response(reader)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(url: str, concurrency: int, duration: float):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _client(host, port, deadline, latencies, errors, offset)
+        for offset in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] if latencies else 0
+    print(f"requests:    {len(latencies)} ({len(errors)} errores)")
+    print(f"req/s:       {len(latencies) / elapsed:.1f}")
+    print(f"latencia ms: p50={p(0.50):.1f} p95={p(0.95):.1f} p99={p(0.99):.1f} "
+          f"media={statistics.fmean(latencies) if latencies else 0:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test de endpoints del catálogo")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.duration))
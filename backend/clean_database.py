@@ -6,6 +6,7 @@ Keeps: admin user, settings
 import asyncio
 from sqlalchemy import text
 from app.database import async_session_maker
+from app.models.catalog_change import mark_catalog_changed
 
 async def clean_database():
     """Remove all test data from database"""
@@ -33,6 +34,9 @@ async def clean_database():
             result = await session.execute(text("DELETE FROM categories"))
             print(f"✅ Eliminadas {result.rowcount} categorías")
             
+            # SQL en texto: avisar al contador de cambios del catálogo (ETags y snapshot)
+            mark_catalog_changed(session.sync_session, "products.deleted", "categories.deleted", "product_images.deleted")
+            
             # Reset auto-increment counters
             await session.execute(text("ALTER TABLE orders AUTO_INCREMENT = 1"))
             await session.execute(text("ALTER TABLE order_items AUTO_INCREMENT = 1"))
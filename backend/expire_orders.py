@@ -0,0 +1,23 @@
+"""
+Cancela los pedidos PENDING_PAYMENT más antiguos que
+settings.pending_payment_ttl_minutes y devuelve su stock. Alternativa por cron
+al barrido en segundo plano (ORDERS_EXPIRY_SWEEP_MINUTES=0):
+
+    */5 * * * * cd /ruta/backend && python expire_orders.py
+"""
+import asyncio
+from app.database import engine
+from app.services.order_expiry import order_expiry_sweeper
+
+async def expire_orders():
+    try:
+        totals = await order_expiry_sweeper.sweep()
+        print(f"✅ Pedidos vencidos cancelados: {totals['orders']} ({totals['units']} unidades repuestas)")
+    except Exception as e:
+        print(f"❌ Error cancelando pedidos vencidos: {e}")
+        raise
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(expire_orders())
@@ -0,0 +1,38 @@
+"""
+Snapshot del inventario (tabla inventory_snapshots) y conciliación del ledger
+contra products.stock. Pensado para ejecutarse periódicamente (cron):
+
+    0 2 * * * cd /ruta/backend && python inventory_snapshot.py
+    python inventory_snapshot.py --fix   # registrar las diferencias como movimientos RECONCILIATION
+"""
+import argparse
+import asyncio
+from app.database import async_session_maker, engine
+from app.services.inventory_service import InventoryService
+
+async def inventory_snapshot(fix: bool):
+    async with async_session_maker() as session:
+        try:
+            snapshot = await InventoryService.take_snapshot(session)
+            if snapshot:
+                print(f"✅ Snapshot {snapshot['snapshot_at']}: {snapshot['products']} productos (hasta el movimiento {snapshot['last_movement_id']})")
+            else:
+                print("✅ Sin movimientos nuevos desde el último snapshot")
+
+            drifts = await InventoryService.reconcile(session, fix=fix)
+            for drift in drifts:
+                print(f"⚠️ {drift['name']} (ID {drift['product_id']}): stock {drift['stock']}, ledger {drift['ledger_stock']}")
+            if drifts:
+                print(f"{'🔧 Corregidas' if fix else '⚠️ Sin corregir'}: {len(drifts)} diferencias")
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            print(f"❌ Error en el snapshot de inventario: {e}")
+            raise
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshot y conciliación del inventario")
+    parser.add_argument("--fix", action="store_true", help="Registrar las diferencias como movimientos RECONCILIATION")
+    args = parser.parse_args()
+    asyncio.run(inventory_snapshot(args.fix))
@@ -1,7 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.routers import auth, public, admin_categories, admin_products, public_orders, admin_orders, admin_analytics, admin_settings, admin_stock, users, public_receipt
+from app.routers import auth, public, admin_categories, admin_products, public_orders, admin_orders, admin_analytics, admin_settings, admin_stock, users, public_receipt, admin_metrics, admin_inventory
+from app.utils.query_metrics import SQL_DEBUG_HEADERS, RequestQueryStats, request_query_stats
+from app.database import replica_engine, mark_recent_write
+from app.utils.responses import ORJSONResponse
+from app.utils.compression import CompressionMiddleware
+from app.utils.runner_lock import acquire_background_lock
+from app.services.recommendation_service import ADDONS_REFRESH_MINUTES, RecommendationService
+from app.services.feed_service import FEEDS_REFRESH_MINUTES, FeedService
+from app.services.catalog_snapshot import catalog_snapshot
+from app.services.job_queue import JOBS_INPROCESS_WORKERS, JobWorker
+from app.services.audit_service import AUDIT_ASYNC_WRITES, audit_writer
+from app.services.order_expiry import ORDERS_EXPIRY_SWEEP_MINUTES, order_expiry_sweeper
+from app.services.settings_cache import SETTINGS_POLL_SECONDS, settings_cache
+import app.services.job_handlers  # registra los handlers de jobs
+import asyncio
 import uvicorn
 import os
 from dotenv import load_dotenv
@@ -12,6 +26,7 @@ app = FastAPI(
     title="Sistema de Ventas API",
     description="API para sistema de ventas con autenticación y gestión de productos",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Configuración de CORS
@@ -23,6 +38,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compresión brotli/gzip (respuestas >= COMPRESSION_MIN_SIZE)
+app.add_middleware(CompressionMiddleware)
+
+# Conteo de consultas por request (solo en modo debug)
+if SQL_DEBUG_HEADERS:
+    @app.middleware("http")
+    async def query_count_headers(request: Request, call_next):
+        stats = RequestQueryStats()
+        request_query_stats.set(stats)
+        response = await call_next(request)
+        response.headers["X-Query-Count"] = str(stats.count)
+        response.headers["X-Round-Trips"] = str(stats.round_trips)
+        response.headers["X-Query-Time-Ms"] = f"{stats.total_ms:.2f}"
+        return response
+
+# Read-your-writes: tras una escritura, el cliente lee del primario unos segundos
+if replica_engine is not None:
+    @app.middleware("http")
+    async def read_after_write_cookie(request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            mark_recent_write(response)
+        return response
+
+# Tareas en segundo plano
+background_tasks = set()
+
+@app.on_event("startup")
+async def schedule_background_refresh():
+    # Trabajo compartido sobre la base: un solo proceso por host (o cron / worker.py)
+    if acquire_background_lock():
+        # Recálculos periódicos (alternativa a refresh_addons.py / refresh_feeds.py)
+        if ADDONS_REFRESH_MINUTES > 0:
+            background_tasks.add(asyncio.create_task(RecommendationService.refresh_periodically()))
+        if FEEDS_REFRESH_MINUTES > 0:
+            background_tasks.add(asyncio.create_task(FeedService.refresh_periodically()))
+        # Worker de jobs (alternativa a worker.py)
+        if JOBS_INPROCESS_WORKERS > 0:
+            background_tasks.add(asyncio.create_task(JobWorker(JOBS_INPROCESS_WORKERS).run()))
+        # Vencimiento de pedidos sin pago (alternativa a expire_orders.py)
+        if ORDERS_EXPIRY_SWEEP_MINUTES > 0:
+            background_tasks.add(asyncio.create_task(order_expiry_sweeper.run()))
+
+    # Estado en memoria de cada proceso: corren en todos los workers
+    # Snapshot del catálogo
+    if catalog_snapshot.available:
+        background_tasks.add(asyncio.create_task(catalog_snapshot.run()))
+    # Buffer de auditoría de este proceso
+    if AUDIT_ASYNC_WRITES:
+        background_tasks.add(asyncio.create_task(audit_writer.run()))
+    # Sondeo de la versión de settings
+    if SETTINGS_POLL_SECONDS > 0:
+        background_tasks.add(asyncio.create_task(settings_cache.run()))
+
+@app.on_event("shutdown")
+async def flush_audit_log():
+    # Escribir la auditoría pendiente del buffer antes de salir
+    await audit_writer.stop()
+
 # Serve uploaded files
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # Ensure uploads directory exists
@@ -43,6 +117,8 @@ app.include_router(admin_orders.router, prefix="/api/v1")  # Admin orders
 app.include_router(admin_analytics.router, prefix="/api/v1")  # Admin analytics
 app.include_router(admin_settings.router, prefix="/api/v1")  # Admin settings
 app.include_router(admin_stock.router, prefix="/api/v1")     # Admin stock
+app.include_router(admin_inventory.router, prefix="/api/v1")  # Admin inventory ledger
+app.include_router(admin_metrics.router, prefix="/api/v1")   # Admin metrics
 
 @app.get("/")
 def root():
@@ -53,4 +129,17 @@ def health_check():
     return {"status": "healthy"}
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    if os.getenv("APP_ENV", "development") == "production":
+        # Perfil de producción: un worker por core, sin reload
+        workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+        os.environ["WEB_CONCURRENCY"] = str(workers)  # Cada worker dimensiona su pool con este valor
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=int(os.getenv("PORT", 8000)),
+            workers=workers,
+            proxy_headers=True,
+            timeout_keep_alive=int(os.getenv("KEEP_ALIVE_TIMEOUT", 5))
+        )
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
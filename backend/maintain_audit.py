@@ -0,0 +1,27 @@
+"""
+Mantenimiento de audit_logs particionada por mes (MySQL):
+crea las particiones de los próximos meses y archiva en archivos .jsonl.gz
+(AUDIT_ARCHIVE_DIR) las anteriores a AUDIT_RETENTION_MONTHS antes de eliminarlas.
+
+    0 3 * * * cd /ruta/backend && python maintain_audit.py
+"""
+import asyncio
+from app.database import async_session_maker, engine
+from app.services.audit_service import AuditService
+
+async def maintain_audit():
+    async with async_session_maker() as session:
+        try:
+            created = await AuditService.ensure_partitions(session)
+            print(f"✅ Particiones creadas: {', '.join(created) or 'ninguna'}")
+            for archived in await AuditService.archive_expired(session):
+                print(f"📦 {archived['partition']}: {archived['rows']} filas -> {archived['path']}")
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            print(f"❌ Error en el mantenimiento de auditoría: {e}")
+            raise
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(maintain_audit())
@@ -0,0 +1,10 @@
+-- Migration: Composite indexes for audit history queries
+-- Date: 2026-10-19
+-- Description: GET /admin/stock/history filters by action_type (+ entity_id) and pages
+--              with a (created_at, id) cursor. InnoDB appends the primary key (id, created_at)
+--              to secondary indexes, so both orderings are read straight from the index.
+--              idx_audit_action becomes redundant (prefix of the new indexes)
+
+CREATE INDEX idx_audit_action_entity_created ON audit_logs(action_type, entity_id, created_at);
+CREATE INDEX idx_audit_action_created ON audit_logs(action_type, created_at);
+DROP INDEX idx_audit_action ON audit_logs;
@@ -0,0 +1,30 @@
+-- Migration: Catalog change counters
+-- Date: 2026-10-19
+-- Description: The catalog version (ETags, response cache, snapshot) was COUNT(*) + MAX(updated_at),
+--              which misses a second edit within the same second (TIMESTAMP has 1 s precision) and
+--              edits to rows that are not the newest. Every commit that touches products, categories
+--              or product_images now increments a counter here, in the same transaction.
+--              Each table has CATALOG_CHANGE_SLOTS (16) rows; a commit increments a random one and
+--              the version is SUM(version), so concurrent writers do not queue on a single row.
+
+CREATE TABLE IF NOT EXISTS `catalog_changes` (
+  `table_name` VARCHAR(40) NOT NULL COMMENT 'Tabla, o tabla + ".deleted" para bajas físicas',
+  `slot` SMALLINT NOT NULL COMMENT '0..15, elegido al azar en cada commit',
+  `version` BIGINT NOT NULL DEFAULT 0 COMMENT 'Commits que cambiaron la tabla',
+  PRIMARY KEY (`table_name`, `slot`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Contadores de cambios del catálogo';
+
+-- Filas iniciales: los incrementos son UPDATE sobre filas existentes (sin gap locks del INSERT)
+INSERT IGNORE INTO `catalog_changes` (`table_name`, `slot`, `version`)
+SELECT t.name, s.slot, 0
+FROM (
+  SELECT 'products' AS name UNION ALL SELECT 'products.deleted'
+  UNION ALL SELECT 'categories' UNION ALL SELECT 'categories.deleted'
+  UNION ALL SELECT 'product_images' UNION ALL SELECT 'product_images.deleted'
+) t
+CROSS JOIN (
+  SELECT 0 AS slot UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3
+  UNION ALL SELECT 4 UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7
+  UNION ALL SELECT 8 UNION ALL SELECT 9 UNION ALL SELECT 10 UNION ALL SELECT 11
+  UNION ALL SELECT 12 UNION ALL SELECT 13 UNION ALL SELECT 14 UNION ALL SELECT 15
+) s;
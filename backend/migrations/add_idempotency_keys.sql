@@ -0,0 +1,22 @@
+-- Migration: Add idempotency_keys table
+-- Date: 2026-10-19
+-- Description: Stores responses of POST /public/orders and POST /public/orders/{id}/upload-receipt
+--              keyed by the Idempotency-Key header so client retries replay the original response
+
+CREATE TABLE IF NOT EXISTS `idempotency_keys` (
+  `id` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `idempotency_key` VARCHAR(255) NOT NULL,
+  `scope` VARCHAR(100) NOT NULL COMMENT 'Ej: create_order, upload_receipt',
+  `request_fingerprint` CHAR(64) NOT NULL COMMENT 'sha256 del request',
+  `status_code` INT NOT NULL,
+  `response_body` JSON NOT NULL,
+  `created_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uk_idempotency_scope_key` (`scope`, `idempotency_key`),
+  INDEX `idx_idempotency_created` (`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Respuestas almacenadas por Idempotency-Key';
+
+-- Optional: purge expired keys periodically
+-- DELETE FROM idempotency_keys WHERE created_at < NOW() - INTERVAL 24 HOUR;
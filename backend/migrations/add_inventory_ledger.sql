@@ -0,0 +1,41 @@
+-- Migration: Inventory movements ledger and periodic snapshots
+-- Date: 2026-10-19
+-- Description: Every stock change appends a row to inventory_movements (orders, manual
+--              adjustments, product edits, cancellations). inventory_snapshots stores the
+--              stock of every product at a point in time (taken by inventory_snapshot.py),
+--              so "stock as of X" = latest snapshot <= X + movements after it, and drift
+--              against products.stock is detected by reconciliation
+
+CREATE TABLE IF NOT EXISTS `inventory_movements` (
+  `id` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `product_id` BIGINT UNSIGNED NOT NULL,
+  `quantity` INT NOT NULL COMMENT 'Positivo = entrada, negativo = salida',
+  `stock_after` INT NOT NULL COMMENT 'products.stock tras el movimiento',
+  `reason` VARCHAR(20) NOT NULL COMMENT 'INITIAL, ORDER, CANCELLATION, ADJUSTMENT, EDIT, RECONCILIATION',
+  `reference_id` BIGINT UNSIGNED NULL COMMENT 'order_id para ORDER/CANCELLATION',
+  `user_id` BIGINT UNSIGNED NULL,
+  `created_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+  PRIMARY KEY (`id`),
+  INDEX `idx_inventory_movements_product` (`product_id`, `id`),
+  INDEX `idx_inventory_movements_created` (`created_at`),
+  CONSTRAINT `fk_inventory_movements_product` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Ledger de movimientos de inventario (solo inserciones)';
+
+CREATE TABLE IF NOT EXISTS `inventory_snapshots` (
+  `id` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `product_id` BIGINT UNSIGNED NOT NULL,
+  `snapshot_at` TIMESTAMP NOT NULL,
+  `stock` INT NOT NULL,
+  `last_movement_id` BIGINT UNSIGNED NOT NULL COMMENT 'Movimientos con id <= este ya están incluidos',
+
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uk_inventory_snapshot` (`snapshot_at`, `product_id`),
+  CONSTRAINT `fk_inventory_snapshots_product` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Stock por producto en cada snapshot del inventario';
+
+-- Opening balance: the current stock of every product
+INSERT INTO inventory_movements (product_id, quantity, stock_after, reason)
+SELECT id, stock, stock, 'INITIAL' FROM products;
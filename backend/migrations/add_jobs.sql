@@ -0,0 +1,27 @@
+-- Migration: Add jobs table
+-- Date: 2026-10-19
+-- Description: Durable queue for post-commit background work (thumbnails, file deletion).
+--              Jobs are inserted in the same transaction as the request that creates them
+--              and executed by the in-process worker or by `python worker.py`
+
+CREATE TABLE IF NOT EXISTS `jobs` (
+  `id` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `name` VARCHAR(100) NOT NULL COMMENT 'Handler registrado, ej: delete_image_files',
+  `payload` JSON NULL,
+  `status` VARCHAR(20) NOT NULL DEFAULT 'PENDING' COMMENT 'PENDING, RUNNING, DONE, FAILED',
+  `attempts` INT NOT NULL DEFAULT 0,
+  `max_attempts` INT NOT NULL DEFAULT 5,
+  `run_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT 'Próximo intento (backoff)',
+  `locked_by` VARCHAR(100) NULL,
+  `locked_at` TIMESTAMP NULL,
+  `last_error` TEXT NULL,
+  `created_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `finished_at` TIMESTAMP NULL,
+
+  PRIMARY KEY (`id`),
+  INDEX `idx_jobs_status_run_at` (`status`, `run_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Cola de jobs en segundo plano';
+
+-- Optional: purge finished jobs periodically
+-- DELETE FROM jobs WHERE status = 'DONE' AND finished_at < NOW() - INTERVAL 7 DAY;
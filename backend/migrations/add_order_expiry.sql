@@ -0,0 +1,12 @@
+-- Migration: Expiry of unpaid orders
+-- Date: 2026-10-19
+-- Description: Orders left in PENDING_PAYMENT longer than settings.pending_payment_ttl_minutes
+--              are cancelled by the expiry sweeper, which gives their stock back. The sweeper
+--              reads them with a (status, created_at) range scan. idx_orders_status becomes
+--              redundant (prefix of the new index)
+
+ALTER TABLE `settings`
+  ADD COLUMN `pending_payment_ttl_minutes` INT NOT NULL DEFAULT 1440 COMMENT 'Minutos antes de cancelar un pedido sin pago (0 = no vencen)' AFTER `auto_confirmations`;
+
+CREATE INDEX idx_orders_status_created ON orders(status, created_at);
+DROP INDEX idx_orders_status ON orders;
@@ -0,0 +1,12 @@
+-- Migration: Order status timestamps
+-- Date: 2026-10-19
+-- Description: One timestamp per status transition (set by OrderService.transition), used
+--              by /admin/orders/sla to measure payment, fulfillment and delivery times.
+--              Existing orders keep NULL (their transition dates were not recorded)
+
+ALTER TABLE `orders`
+  ADD COLUMN `waiting_contact_at` TIMESTAMP NULL COMMENT 'Comprobante recibido' AFTER `updated_at`,
+  ADD COLUMN `paid_at` TIMESTAMP NULL AFTER `waiting_contact_at`,
+  ADD COLUMN `shipped_at` TIMESTAMP NULL AFTER `paid_at`,
+  ADD COLUMN `delivered_at` TIMESTAMP NULL AFTER `shipped_at`,
+  ADD COLUMN `cancelled_at` TIMESTAMP NULL COMMENT 'El stock se repone al cancelar' AFTER `delivered_at`;
@@ -0,0 +1,24 @@
+-- Migration: Add product_addons table
+-- Date: 2026-10-19
+-- Description: Top-K add-ons per product, precomputed from co-purchases (order_items)
+--              and complementary categories. GET /public/products/{id}/addons reads
+--              them with one lookup on (product_id, rank) instead of ORDER BY RAND()
+
+CREATE TABLE IF NOT EXISTS `product_addons` (
+  `id` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `product_id` BIGINT UNSIGNED NOT NULL,
+  `addon_product_id` BIGINT UNSIGNED NOT NULL,
+  `rank` INT NOT NULL COMMENT '0 = mejor candidato',
+  `score` DOUBLE NOT NULL,
+  `source` VARCHAR(20) NOT NULL COMMENT 'co_purchase, category',
+  `computed_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uk_product_addon` (`product_id`, `addon_product_id`),
+  INDEX `idx_product_addons_rank` (`product_id`, `rank`),
+  CONSTRAINT `fk_product_addons_product` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`) ON DELETE CASCADE,
+  CONSTRAINT `fk_product_addons_addon` FOREIGN KEY (`addon_product_id`) REFERENCES `products` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Add-ons precalculados por producto';
+
+-- Refresh: python refresh_addons.py (cron) o ADDONS_REFRESH_MINUTES > 0 en el servidor
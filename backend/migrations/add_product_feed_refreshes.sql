@@ -0,0 +1,16 @@
+-- Migration: Feed refresh watermarks
+-- Date: 2026-10-19
+-- Description: The signature of the sources each feed group was last computed from was kept in
+--              a per-process dict, so every worker recomputed every feed. It now lives here: the
+--              refresh locks the group row (SELECT ... FOR UPDATE), compares the signature and only
+--              the first worker to see a change recomputes the group
+
+CREATE TABLE IF NOT EXISTS `product_feed_refreshes` (
+  `group_name` VARCHAR(30) NOT NULL COMMENT 'bestsellers o catalog',
+  `signature` VARCHAR(255) NOT NULL DEFAULT '' COMMENT 'Fuentes del último cálculo',
+  `refreshed_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`group_name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Última firma calculada por grupo de feeds';
+
+INSERT IGNORE INTO `product_feed_refreshes` (`group_name`, `signature`) VALUES ('bestsellers', ''), ('catalog', '');
@@ -0,0 +1,23 @@
+-- Migration: Add product_feeds table
+-- Date: 2026-10-19
+-- Description: Precomputed storefront feeds (bestsellers 7/30 days, newest, price ranked),
+--              global (category_id = 0) and per category. GET /public/feeds/{feed} reads a
+--              page by (feed, category_id, rank) instead of sorting the catalog per request
+
+CREATE TABLE IF NOT EXISTS `product_feeds` (
+  `id` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `feed` VARCHAR(30) NOT NULL COMMENT 'bestsellers_7d, bestsellers_30d, newest, price_asc, price_desc',
+  `category_id` BIGINT UNSIGNED NOT NULL DEFAULT 0 COMMENT '0 = todo el catálogo',
+  `rank` INT NOT NULL COMMENT '0 = primero',
+  `product_id` BIGINT UNSIGNED NOT NULL,
+  `score` DOUBLE NOT NULL DEFAULT 0,
+  `computed_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uk_product_feed_rank` (`feed`, `category_id`, `rank`),
+  INDEX `idx_product_feeds_product` (`product_id`),
+  CONSTRAINT `fk_product_feeds_product` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Feeds rankeados precalculados para el home';
+
+-- Refresh: python refresh_feeds.py (cron) o FEEDS_REFRESH_MINUTES > 0 en el servidor
@@ -0,0 +1,8 @@
+-- Migration: Settings version for the in-process settings cache
+-- Date: 2026-10-19
+-- Description: Every worker keeps settings in memory. PUT /admin/settings increments
+--              settings.version and the other workers reload the row when their poll
+--              (SELECT version, every SETTINGS_POLL_SECONDS) sees a new value
+
+ALTER TABLE `settings`
+  ADD COLUMN `version` INT NOT NULL DEFAULT 1 COMMENT 'Se incrementa en cada cambio' AFTER `updated_at`;
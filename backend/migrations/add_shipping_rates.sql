@@ -0,0 +1,22 @@
+-- Migration: Shipping rates and tax rate for checkout pricing
+-- Date: 2026-10-19
+-- Description: Shipping cost per city/district (district NULL = rest of the city) with an
+--              optional free-shipping threshold override, and the tax rate applied to the
+--              order subtotal. Rates are loaded into memory with the settings cache; editing
+--              them increments settings.version so every worker reloads
+
+CREATE TABLE IF NOT EXISTS `shipping_rates` (
+  `id` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `city` VARCHAR(100) NOT NULL,
+  `district` VARCHAR(100) NULL COMMENT 'NULL = resto de la ciudad',
+  `cost` DECIMAL(10, 2) NOT NULL,
+  `free_shipping_threshold` DECIMAL(10, 2) NULL COMMENT 'NULL = settings.free_shipping_threshold',
+  `created_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uk_shipping_rates_city_district` (`city`, `district`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Tarifas de envío por ciudad y distrito';
+
+ALTER TABLE `settings`
+  ADD COLUMN `tax_rate` DECIMAL(5, 4) NOT NULL DEFAULT 0 COMMENT 'Impuesto sobre el subtotal (0.18 = 18%; 0 si los precios ya lo incluyen)' AFTER `free_shipping_threshold`;
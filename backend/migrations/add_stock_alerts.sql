@@ -0,0 +1,27 @@
+-- Migration: Low-stock alerts
+-- Date: 2026-10-19
+-- Description: Per-product low-stock threshold and the stock_alerts table. An alert is
+--              recorded when a stock change crosses the threshold (not on every change).
+--              idx_products_active_stock serves /admin/analytics/low-stock ordered by stock
+
+ALTER TABLE `products`
+  ADD COLUMN `low_stock_threshold` INT NULL COMMENT 'NULL = LOW_STOCK_DEFAULT_THRESHOLD' AFTER `stock`,
+  ADD INDEX `idx_products_active_stock` (`is_active`, `stock`);
+
+CREATE TABLE IF NOT EXISTS `stock_alerts` (
+  `id` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `product_id` BIGINT UNSIGNED NOT NULL,
+  `level` VARCHAR(10) NOT NULL COMMENT 'LOW, OUT',
+  `stock` INT NOT NULL COMMENT 'Stock después del cambio',
+  `threshold` INT NOT NULL,
+  `created_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `acknowledged_at` TIMESTAMP NULL,
+  `acknowledged_by` BIGINT UNSIGNED NULL,
+  `resolved_at` TIMESTAMP NULL COMMENT 'El stock volvió a superar el umbral',
+
+  PRIMARY KEY (`id`),
+  INDEX `idx_stock_alerts_product_resolved` (`product_id`, `resolved_at`),
+  CONSTRAINT `fk_stock_alerts_product` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`) ON DELETE CASCADE,
+  CONSTRAINT `fk_stock_alerts_user` FOREIGN KEY (`acknowledged_by`) REFERENCES `users` (`id`) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Alertas de stock bajo';
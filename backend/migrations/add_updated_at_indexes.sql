@@ -0,0 +1,7 @@
+-- Migration: Index updated_at on catalog tables
+-- Date: 2026-10-19
+-- Description: ETag probes on /public/categories and /public/products read MAX(updated_at);
+--              with these indexes the probe is a single index lookup instead of a table scan
+
+CREATE INDEX idx_products_updated ON products(updated_at);
+CREATE INDEX idx_categories_updated ON categories(updated_at);
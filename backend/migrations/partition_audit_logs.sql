@@ -0,0 +1,37 @@
+-- Migration: Native JSON and monthly partitions for audit_logs
+-- Date: 2026-10-19
+-- Description: Audit values were stored as json.dumps() strings inside the JSON columns
+--              (double-encoded); they are converted to JSON objects. The table is
+--              partitioned by month on created_at so old months are archived and dropped
+--              with DROP PARTITION (see maintain_audit.py) instead of large DELETEs.
+--              Partitioned tables can't have foreign keys and every unique key must
+--              include the partition column, hence the FK drop and the (id, created_at) PK.
+
+-- 1. Undo the double encoding
+UPDATE audit_logs SET old_value = CAST(JSON_UNQUOTE(old_value) AS JSON) WHERE JSON_TYPE(old_value) = 'STRING';
+UPDATE audit_logs SET new_value = CAST(JSON_UNQUOTE(new_value) AS JSON) WHERE JSON_TYPE(new_value) = 'STRING';
+
+-- 2. Keys compatible with partitioning
+-- (if the table was created by SQLAlchemy the FK may be named audit_logs_ibfk_1:
+--  SELECT CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS WHERE TABLE_NAME = 'audit_logs')
+ALTER TABLE audit_logs DROP FOREIGN KEY fk_audit_user;
+ALTER TABLE audit_logs DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at);
+
+-- 3. Monthly partitions (TIMESTAMP columns only allow UNIX_TIMESTAMP() as partition function).
+--    maintain_audit.py creates the following months by splitting pmax
+ALTER TABLE audit_logs PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+  PARTITION p_history VALUES LESS THAN (UNIX_TIMESTAMP('2026-01-01 00:00:00')),
+  PARTITION p202601 VALUES LESS THAN (UNIX_TIMESTAMP('2026-02-01 00:00:00')),
+  PARTITION p202602 VALUES LESS THAN (UNIX_TIMESTAMP('2026-03-01 00:00:00')),
+  PARTITION p202603 VALUES LESS THAN (UNIX_TIMESTAMP('2026-04-01 00:00:00')),
+  PARTITION p202604 VALUES LESS THAN (UNIX_TIMESTAMP('2026-05-01 00:00:00')),
+  PARTITION p202605 VALUES LESS THAN (UNIX_TIMESTAMP('2026-06-01 00:00:00')),
+  PARTITION p202606 VALUES LESS THAN (UNIX_TIMESTAMP('2026-07-01 00:00:00')),
+  PARTITION p202607 VALUES LESS THAN (UNIX_TIMESTAMP('2026-08-01 00:00:00')),
+  PARTITION p202608 VALUES LESS THAN (UNIX_TIMESTAMP('2026-09-01 00:00:00')),
+  PARTITION p202609 VALUES LESS THAN (UNIX_TIMESTAMP('2026-10-01 00:00:00')),
+  PARTITION p202610 VALUES LESS THAN (UNIX_TIMESTAMP('2026-11-01 00:00:00')),
+  PARTITION p202611 VALUES LESS THAN (UNIX_TIMESTAMP('2026-12-01 00:00:00')),
+  PARTITION p202612 VALUES LESS THAN (UNIX_TIMESTAMP('2027-01-01 00:00:00')),
+  PARTITION pmax VALUES LESS THAN MAXVALUE
+);
@@ -0,0 +1,24 @@
+"""
+Recalcula los add-ons precalculados (tabla product_addons).
+Pensado para ejecutarse periódicamente (cron), por ejemplo cada hora:
+
+    0 * * * * cd /ruta/backend && python refresh_addons.py
+"""
+import asyncio
+from app.database import async_session_maker, engine
+from app.services.recommendation_service import RecommendationService
+
+async def refresh_addons():
+    async with async_session_maker() as session:
+        try:
+            rows = await RecommendationService.refresh_addons(session)
+            await session.commit()
+            print(f"✅ {rows} add-ons recalculados")
+        except Exception as e:
+            await session.rollback()
+            print(f"❌ Error recalculando add-ons: {e}")
+            raise
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(refresh_addons())
@@ -0,0 +1,25 @@
+"""
+Recalcula los feeds del home (tabla product_feeds): más vendidos 7/30 días,
+novedades y por precio. Pensado para ejecutarse periódicamente (cron):
+
+    */10 * * * * cd /ruta/backend && python refresh_feeds.py
+"""
+import asyncio
+from app.database import async_session_maker, engine
+from app.services.feed_service import FeedService
+
+async def refresh_feeds():
+    async with async_session_maker() as session:
+        try:
+            written = await FeedService.refresh_feeds(session, force=True)
+            await session.commit()
+            for group, rows in written.items():
+                print(f"✅ {group}: {rows} filas")
+        except Exception as e:
+            await session.rollback()
+            print(f"❌ Error recalculando feeds: {e}")
+            raise
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(refresh_feeds())
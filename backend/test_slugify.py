@@ -0,0 +1,61 @@
+"""
+Pruebas de propiedades de slugify con textos aleatorios (semilla fija).
+
+    python -m pytest -q test_slugify.py
+"""
+import random
+import re
+
+import pytest
+
+from app.utils.helpers import slugify
+
+SLUG = re.compile(r"^[a-z0-9]+(-[a-z0-9]+)*$")
+
+# ASCII, acentos, letras sin descomposición NFKD, separadores raros, emojis y ancho completo
+ALPHABET = (
+    "abcxyzABCXYZ0189 -_.,!?¿¡'\"/&%\t\n"
+    "áéíóúñüÁÉÍÓÚÑÜàèçâêîôûëïÿ"
+    "ßæœøđðþłıħŧŋÆŒØ"
+    "İẞ —　ｆｕｌｌ😀漢字"
+)
+
+
+def random_texts(count: int, seed: int = 39):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 24)))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Crème brûlée", "creme-brulee"),
+    ("Electrónica y Tecnología", "electronica-y-tecnologia"),
+    ("Rosas   Rojas -- x12", "rosas-rojas-x12"),
+    ("Straße Øresund", "strasse-oresund"),
+    ("  --¡Oferta!--  ", "oferta"),
+    ("😀", ""),
+    ("", ""),
+])
+def test_examples(text, expected):
+    assert slugify(text) == expected
+
+
+def test_output_is_a_slug_or_empty():
+    for text in random_texts(20000):
+        slug = slugify(text)
+        assert slug == "" or SLUG.match(slug), (text, slug)
+
+
+def test_idempotent():
+    for text in random_texts(20000, seed=40):
+        slug = slugify(text)
+        assert slugify(slug) == slug, (text, slug)
+
+
+def test_ascii_letters_and_digits_are_kept_in_order():
+    # Subsecuencia: los caracteres ASCII alfanuméricos del texto aparecen en el
+    # slug en el mismo orden (entre ellos puede haber letras transliteradas)
+    for text in random_texts(5000, seed=41):
+        ascii_alnum = [c for c in text.lower() if c.isascii() and c.isalnum()]
+        remaining = iter(slugify(text).replace("-", ""))
+        assert all(c in remaining for c in ascii_alnum), (text, slugify(text))
@@ -0,0 +1,32 @@
+"""
+Worker de jobs en segundo plano (tabla jobs): thumbnails, borrado de archivos, etc.
+Permite procesar jobs fuera del proceso web (JOBS_INPROCESS_WORKERS=0):
+
+    python worker.py --concurrency 4
+"""
+import argparse
+import asyncio
+import logging
+import signal
+from app.database import engine
+from app.services.job_queue import JOBS_INPROCESS_WORKERS, JobWorker
+import app.services.job_handlers  # registra los handlers de jobs
+
+async def run_worker(concurrency: int):
+    worker = JobWorker(concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    print(f"✅ Worker de jobs iniciado ({worker.concurrency} tareas). Ctrl+C para detener.")
+    try:
+        await worker.run()
+    finally:
+        await engine.dispose()
+    print("👋 Worker detenido")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker de jobs en segundo plano")
+    parser.add_argument("--concurrency", type=int, default=max(JOBS_INPROCESS_WORKERS, 2))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker(args.concurrency))